@@ -1,29 +1,49 @@
 import os, sys
 
-import datetime, csv, json, mimetypes, random
-import argparse, configparser, logging
-import magic, pickle
+import datetime
+import argparse, atexit, configparser, logging
 
 from enum import Enum
-from logging.handlers import RotatingFileHandler
 
 from entity_engine import Entity, EntityTypes
 from entity_engine import EntityOption, OptionTypes, EntityOptionListFlag
 from entity_engine import EntityGraph, EntityFactory, EntityTracker
 from entity_engine import Person, Location, Organization, GeoPoliticalEntity
-
-from tests.test_graph import *
+from entity_engine import stream_world, get_factory, get_entity_writer
+from entity_engine import IdAllocator, set_id_allocator
+from entity_engine import load_options_file, CatalogCache, GenerationScheduler, get_registry
+from entity_engine import LOGGING_DEFAULTS, get_logging_settings, start_logging, log_entities
+from entity_engine import Metrics, ProfileCapture, set_metrics, timed
 
 class InputOptionsFileFormat(Enum):
     CSV = "text/csv"
     JSON = "application/json" 
+    JSONL = "application/x-ndjson"
+
+# The extensions of the MIME types of the input and output file formats
+MIME_EXTENSIONS: dict[str, str] = {
+    "text/csv": ".csv",
+    "application/json": ".json",
+    "application/x-ndjson": ".jsonl",
+    "text/markdown": ".md",
+    "text/html": ".html"
+}
 
 class OutputResultsFileFormat(Enum):
     CSV = "text/csv"
     JSON = "application/json" 
+    JSONL = "application/x-ndjson"
     MD = "text/markdown"
     HTML = "text/html"
 
+# The entity writer format --batch streams each results file format in; JSON is streamed as JSON Lines
+BATCH_OUTPUT_FORMATS: dict[OutputResultsFileFormat, str] = {
+    OutputResultsFileFormat.CSV: "CSV",
+    OutputResultsFileFormat.JSON: "JSONL",
+    OutputResultsFileFormat.JSONL: "JSONL",
+    OutputResultsFileFormat.MD: "MD"
+}
+
 class OutputMode(Enum):
     CONSOLE = "console"
     FILE = "file"
@@ -56,6 +76,8 @@ def main():
     locations_to_queue: int = 0
     organizations_to_queue: int = 0
     gpes_to_queue: int = 0
+    workers: int = 1
+    seed: int = None
 
     is_config_updated: bool = False
     is_results_output_mode_updated: bool = False
@@ -66,32 +88,27 @@ def main():
     tracker: EntityTracker = EntityTracker()
     entities: EntityGraph = EntityGraph()
 
-    options_list: list[EntityOption] = get_default_options_list()
-
-    '''Setup Logging'''
-    logger = logging.getLogger(__name__)
-    
-    #Create logging handlers
-    console_handler = logging.StreamHandler()
-    rotating_file_handler = RotatingFileHandler("app.log", maxBytes=2000)
-
-    #Set handler logging levels
-    console_handler.setLevel(logging.WARNING)
-    rotating_file_handler.setLevel(logging.ERROR)
-
-    logging_format = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-    console_handler.setFormatter(logging_format)
-    rotating_file_handler.setFormatter(logging_format)
-
-    logger.addHandler(console_handler)
-    logger.addHandler(rotating_file_handler)
-
+    options_list: list[EntityOption] = None
 
     '''Setup Config File Parsing'''
     # Read config file (if it exists)
     config = configparser.ConfigParser()
     config.read('config.ini')
 
+    '''Setup Logging'''
+    logger = logging.getLogger(__name__)
+
+    # Records go through a queue to the console and rotating file handlers of a listener thread
+    if 'logging' not in config:
+        config['logging'] = LOGGING_DEFAULTS
+        is_config_updated = True
+    try:
+        log_listener = start_logging(get_logging_settings(config))
+    except ValueError as e:
+        log_listener = start_logging()
+        logger.warning(f"Invalid logging configuration; continuing with default options: {e}")
+    atexit.register(log_listener.stop)
+
     # Add missing default sections to config
     if 'main' not in config:
         config['main'] = {}
@@ -208,10 +225,22 @@ def main():
     # TODO: Add autosave option that when "on" keeps the load and save options in its own [autosave] section of the config
     parser.add_argument('--load', type=str, help='Name of a saved object file to load')
     parser.add_argument('--save', type=str, help='Name to save the generated object file to')
+    parser.add_argument('-w', '--workers', type=int, default=1, help='Number of worker processes to generate entities with')
+    parser.add_argument('--seed', type=int, help='World seed; the same seed regenerates the same entities regardless of --workers')
+    parser.add_argument('--no_cache', action='store_true', help='Rebuilds the options catalog instead of loading it from the compiled cache')
+    parser.add_argument('--batch', action='store_true', help='Generates the requested entities, streams them to stdout (or --outfile_name) in the outfile format, and exits')
+    parser.add_argument('--edges', action='store_true', help='Also streams the relationship edges between entities in --batch mode')
+    parser.add_argument('--profile', action='store_true', help='Records timings per stage and entity type and prints a summary table on exit')
+    parser.add_argument('--profile_json', type=str, help='Also dumps the --profile metrics to this JSON file')
+    parser.add_argument('--profile_capture', type=str, choices=['cprofile', 'tracemalloc', 'all'], 
+                        help='Also captures a cProfile profile and/or tracemalloc snapshot of the run into data/log/')
 
     # Parse arguments
     args = parser.parse_args()
 
+    if args.profile or args.profile_json or args.profile_capture:
+        start_profiling(args.profile_json, args.profile_capture)
+
     # Access parsed arguments
     if args.save_config and args.reset_config:
         e = Exception ("Save config and reset config flags are mutually exclusive.")
@@ -249,25 +278,32 @@ def main():
 
     # Main arguments NOT in config
     if args.file:
-        input_file_path = args.file
-        if is_valid_input_options_file(input_file_path):
-            try:
-                # TODO: Create an import file to test the options list with
-                read_input_options_file(input_file_path, options_list)
-            except Exception as e:
-                logger.error(f"Error: {e}")
-                return None
+        if is_valid_input_options_file(args.file):
+            input_file_path = args.file
         else:
             w = Exception ("Invalid input file format; continuing with standard options.")
             logger.warning(f"Exception: {w}")
+    try:
+        # TODO: Create an import file to test the options list with
+        options_list = get_options_list(input_file_path, object_output_dir, not args.no_cache)
+    except Exception as e:
+        logger.error(f"Error: {e}")
+        return None
 
     if args.outfile_name:
         # Parse args.outfile_name and strip extension (if any) from file name
         temp_file_name: str =  os.path.splitext(args.outfile_name)[0]
-        file_format: str = get_extension_from_mime(results_outfile_format.value)
+        file_format: str = get_extension_from_mime(results_outfile_format.value).strip(".")
         # Append chosen format file extension and assign to variable
         results_output_file_path = f"{temp_file_name}.{file_format}"
         
+    if args.workers and args.workers > 1:
+        workers = args.workers
+
+    if args.seed is not None:
+        seed = args.seed
+        set_id_allocator(IdAllocator(seed=seed))
+
     if args.save:
         object_output_file_path = get_datetime_filename("objects", "pkl")
         should_object_save = True
@@ -278,6 +314,8 @@ def main():
         if load.lower == "y":
             try:
                 entities, loaded_options_list = load_previously_generated_entities(object_output_dir) 
+                if entities:
+                    entities.reserve_ids()
                 if loaded_options_list:
                     options_list = loaded_options_list
 
@@ -296,8 +334,6 @@ def main():
             persons_to_queue = value
             config['objects']['person'] = str(persons_to_queue)
             is_config_updated = True
-    for i in range(0, persons_to_queue):
-        tracker.entity_stack.append(Person)
 
     if args.location:
         has_commandline_object_args = True
@@ -306,8 +342,6 @@ def main():
             locations_to_queue = value
             config['objects']['location'] = str(locations_to_queue)
             is_config_updated = True
-    for i in range(0, locations_to_queue):
-        tracker.entity_stack.append(Location)
 
     if args.organization:
         has_commandline_object_args = True
@@ -316,8 +350,6 @@ def main():
             organizations_to_queue = value
             config['objects']['organization'] = str(organizations_to_queue)
             is_config_updated = True
-    for i in range(0, organizations_to_queue):
-        tracker.entity_stack.append(Organization)
         
     if args.geopolitical:
         has_commandline_object_args = True
@@ -326,17 +358,29 @@ def main():
             gpes_to_queue = value
             config['objects']['geopolitical'] = str(gpes_to_queue)
             is_config_updated = True
-    for i in range(0, gpes_to_queue):
-        tracker.entity_stack.append(GeoPoliticalEntity)
     
     if args.save_config and is_config_updated:
         # Write updated config to file
         with open('config.ini', 'w') as configfile:
             config.write(configfile)
 
+    tracker.queue(Person, persons_to_queue)
+    tracker.queue(Location, locations_to_queue)
+    tracker.queue(Organization, organizations_to_queue)
+    tracker.queue(GeoPoliticalEntity, gpes_to_queue)
+
+    if args.batch:
+        # Stream the entities out as they are generated instead of collecting them in the graph
+        batch_output_file_path = results_output_file_path if args.outfile_name else None
+        try:
+            run_batch(tracker, options_list, results_outfile_format, batch_output_file_path, seed, args.edges, workers)
+        except ValueError as e:
+            logger.error(f"Error: {e}")
+        return None
+
     # Process entities stack populated by command line or config parsing 
     # by popping off the top factory and creating an entity that is added to the graph
-    process_entities_stack(entities, tracker, options_list)
+    process_entities_stack(entities, tracker, options_list, workers, seed)
     if should_object_save:
         save_object_data(entities, f"entity_{object_output_file_path}")
         save_object_data(options_list, f"option_{object_output_file_path}")
@@ -363,7 +407,7 @@ def main():
                 elif choice == "2":
                     menu_page = "entity_view"
                 elif choice == "3":
-                    process_entities_stack(entities, tracker, options_list)
+                    process_entities_stack(entities, tracker, options_list, workers, seed)
                     menu_page = "main"
                 elif choice == "4":
                     menu_page = "config"
@@ -379,6 +423,8 @@ def main():
                     if load.lower == "y":
                         try:
                             entities, loaded_options_list = load_previously_generated_entities(object_output_dir) 
+                            if entities:
+                                entities.reserve_ids()
                             if loaded_options_list:
                                 options_list = loaded_options_list
 
@@ -395,6 +441,8 @@ def main():
                     input("Press any key to continue...")
             case "test":
                 if choice == "1":
+                    # Imported on demand, so that startup does not pay for importing unittest
+                    from tests.test_graph import test_graph_with_person
                     test_graph_with_person()
                     input("Press any key to continue...")
                 elif choice == "2":
@@ -405,50 +453,42 @@ def main():
             case "entity_create":
                 if choice == "1":
                     num_person = input("How many Person entities would you like to create? ")
-                    for i in range(0, int(num_person)):
-                        tracker.entity_stack.append(Person)
+                    tracker.queue(Person, int(num_person))
                 elif choice == "2":
                     num_location = input("How many Location entities would you like to create? ")
-                    for i in range(0, int(num_location)):
-                        tracker.entity_stack.append(Location)
+                    tracker.queue(Location, int(num_location))
                 elif choice == "3":
                     num_org = input("How many Organization entities would you like to create? ")
-                    for i in range(0, int(num_org)):
-                        tracker.entity_stack.append(Organization)
+                    tracker.queue(Organization, int(num_org))
                 elif choice == "4":
                     num_gpe = input("How many Geopolitical entities would you like to create? ")
-                    for i in range(0, int(num_gpe)):
-                        tracker.entity_stack.append(GeoPoliticalEntity)
+                    tracker.queue(GeoPoliticalEntity, int(num_gpe))
                 else:
                     print("Invalid choice. Please try again.")
             case "entity_view":
                 if choice == "1":
                     print(f"------------------------------------------------------------------------------------------\n")
-                    for entity in entities.graph.keys():
-                        if isinstance(entity, Person):
-                            display_person(entity)
-                            print("------------------------------")
+                    for entity in entities.iter_type(EntityTypes.PERSON):
+                        display_person(entity)
+                        print("------------------------------")
                     input("Press any key to continue...")
                 elif choice == "2":
-                    for entity in entities.graph.keys():
-                        if isinstance(entity, Location):
-                            display_location(entity)
-                            print("------------------------------")
+                    for entity in entities.iter_type(EntityTypes.LOCATION):
+                        display_location(entity)
+                        print("------------------------------")
                     input("Press any key to continue...")
                 elif choice == "3":
-                    for entity in entities.graph.keys():
-                        if isinstance(entity, Organization):
-                            display_organization(entity)
-                            print("------------------------------")
+                    for entity in entities.iter_type(EntityTypes.ORGANIZATION):
+                        display_organization(entity)
+                        print("------------------------------")
                     input("Press any key to continue...")
                 elif choice == "4":
-                    for entity in entities.graph.keys():
-                        if isinstance(entity, GeoPoliticalEntity):
-                            display_gpe(entity)
-                            print("------------------------------")
+                    for entity in entities.iter_type(EntityTypes.GPE):
+                        display_gpe(entity)
+                        print("------------------------------")
                     input("Press any key to continue...")
                 elif choice == "5":
-                    for entity in entities.graph.keys():
+                    for entity in entities.iter_type():
                         display_entity(entity)
                         print("------------------------------")
                     input("Press any key to continue...")
@@ -464,7 +504,7 @@ def main():
             case _:
                 pass
         
-def generate_menu(entities: Graph, tracker: EntityTracker, page: str=None) -> str:
+def generate_menu(entities: EntityGraph, tracker: EntityTracker, page: str=None) -> str:
     print("")
     print("==============================" + "< Fictional Entity Generator >" + "==============================" + "\n")
 
@@ -474,7 +514,7 @@ def generate_menu(entities: Graph, tracker: EntityTracker, page: str=None) -> st
         f"Organization= {entities.count(EntityTypes.ORGANIZATION)}; "
         f"Geopolitical= {entities.count(EntityTypes.GPE)}")
 
-    if tracker.entity_stack:
+    if tracker.count():
         print(f"Entities Queued:  {tracker.count()}\t| "
             f"Person= {tracker.count(EntityTypes.PERSON)}; "
             f"Location= {tracker.count(EntityTypes.LOCATION)}; " 
@@ -506,13 +546,13 @@ def generate_menu(entities: Graph, tracker: EntityTracker, page: str=None) -> st
 
     return input("\nEnter your choice: ")
 
-def generate_menu_config(entities: Graph, tracker: EntityTracker) -> None:
+def generate_menu_config(entities: EntityGraph, tracker: EntityTracker) -> None:
     print(f"------------------------------------------------------------------------------------------\n")
     print("Configuration Menu:\n")
     print("1. Save Current Parameters to Configuration")
     print("2. Reset Configuration")
 
-def generate_menu_entity_create(entities: Graph, tracker: EntityTracker) -> None:
+def generate_menu_entity_create(entities: EntityGraph, tracker: EntityTracker) -> None:
     print(f"------------------------------------------------------------------------------------------\n")
     print("Create Entity Menu:\n")
     print("1. Person")
@@ -520,7 +560,7 @@ def generate_menu_entity_create(entities: Graph, tracker: EntityTracker) -> None
     print("3. Organization")
     print("4. Geopolitical Entity")
 
-def generate_menu_entity_view(entities: Graph, tracker: EntityTracker) -> None:
+def generate_menu_entity_view(entities: EntityGraph, tracker: EntityTracker) -> None:
     print(f"------------------------------------------------------------------------------------------\n")
     print("View Entity Menu:\n")
     print("1. Person")
@@ -529,7 +569,7 @@ def generate_menu_entity_view(entities: Graph, tracker: EntityTracker) -> None:
     print("4. Geopolitical Entity")
     print("5. All")
 
-def generate_menu_main(entities: Graph, tracker: EntityTracker) -> None:
+def generate_menu_main(entities: EntityGraph, tracker: EntityTracker) -> None:
     print(f"------------------------------------------------------------------------------------------\n")
     print("Main Menu:\n")
     print("1. Queue New Entities")
@@ -540,12 +580,47 @@ def generate_menu_main(entities: Graph, tracker: EntityTracker) -> None:
     print("6. Load Previously Generated Entities")
     print("7. Export Generated Entities")
 
-def generate_menu_test(entities: Graph, tracker: EntityTracker) -> None:
+def generate_menu_test(entities: EntityGraph, tracker: EntityTracker) -> None:
     print(f"------------------------------------------------------------------------------------------\n")
     print("Test Menu:\n")
     print("1. Test Graph with Person objects")
     print("2. Create Random Person")
 
+def get_options_list(input_file_path: str, object_output_dir: str, use_cache: bool = True) -> list[EntityOption]:
+    """
+    Builds the options list of the run: the default options plus those of the input options 
+    file, if any. The compiled list and its sampling index are cached in object_output_dir, 
+    keyed by the contents of this file (which holds the default options) and of the input 
+    options file, so later runs with the same sources skip parsing and indexing them.
+
+    args:
+        input_file_path: Path to the input options file, or None.
+        object_output_dir: The directory the compiled catalog cache is kept in.
+        use_cache: Whether to use the compiled catalog cache.
+
+    returns:
+        The options list.
+
+    raises:
+        FileNotFoundError: If the input options file does not exist.
+        ValueError: If the input options file cannot be parsed.
+    """
+    def build_options_list() -> list[EntityOption]:
+        options_list = get_default_options_list()
+        if input_file_path:
+            read_input_options_file(input_file_path, options_list)
+        return options_list
+
+    if not use_cache:
+        return build_options_list()
+
+    sources = [os.path.abspath(__file__)] + ([input_file_path] if input_file_path else [])
+    with timed("io", "catalog"):
+        options_list, sampling_index = CatalogCache(object_output_dir).get_options_list(sources, build_options_list)
+    # Let the factories share the cached sampling index instead of compiling their own
+    get_registry().set_sampling_index(options_list, sampling_index)
+    return options_list
+
 def get_default_options_list() -> list[EntityOption]:
     """
     Returns an EntityOptions list populated with the hardcoded default options
@@ -787,6 +862,7 @@ def get_default_options_list() -> list[EntityOption]:
 
 def is_valid_input_options_file(input_file_path:str) -> bool:
     if os.path.exists(input_file_path):
+        import magic
         mime = magic.from_file(input_file_path, mime = True)
     else:
         raise FileNotFoundError (f"Input options file not found at {input_file_path}.")
@@ -794,201 +870,23 @@ def is_valid_input_options_file(input_file_path:str) -> bool:
         
 def read_input_options_file(input_file_path: str, options_list: list[EntityOption], flag:str = EntityOptionListFlag.ADD) -> None:
     """
-    Reads input options from a CSV or JSON file and populates the `options_list`
-    with `EntityOption` instances.
+    Streams input options from a CSV, JSON, or JSON Lines file and populates the 
+    `options_list` with `EntityOption` instances, logging the progress as it goes.
 
     args:
         input_file_path: Path to the input options file.
+        options_list: The list of EntityOption objects to populate, in place.
+        flag: Whether to add to or override the options list.
 
     raises:
         FileNotFoundError: If the specified file does not exist.
         ValueError: If the file format is invalid or the data cannot be parsed.
     """
-    # TODO: Change read_input_options_file function to load and save the random 
-    # options into the options list from the default or passed file, using a flag 
-    # to determine whether to add to or override the default options list.  
-    
-    if flag == EntityOptionListFlag.OVERRIDE:
-        options_list: list[EntityOption] = []
-    elif not options_list:
-        options_list: list[EntityOption] = []
-    
-    try:
-        if input_file_path.endswith(".csv"):
-            with open(input_file_path, 'r') as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    try:
-                        #Parse row data from the CSV file to the local EntityOption member variables
-                        option_type = OptionTypes[row['type']]
-                        option_name = row['name']
-                        description = row.get('description', ''),
-                        weight = float(row.get('weight', 1.0)),
-                        min = int(row.get('min', 1))
-                        max = int(row.get('max', 1))
-
-                        exclusive_options: list[EntityOption] = []
-                        if 'exclusive' in row and row['exclusive']:
-                            for exclusive_option in row['exclusive'].split(','):
-                                # Search for the exclusive option in the global options list 
-                                existing_exclusive_option_index = index_in_options_list(EntityOption(name=exclusive_option), options_list)
-                                if existing_exclusive_option_index is not None:
-                                    exclusive_options.append(options_list[existing_exclusive_option_index])
-                                else:
-                                    exclusive_options.append(EntityOption(name=exclusive_option))
-
-                        requirements: list[str] = []
-                        if 'requirements' in row and row['requirements']:
-                            requirements = row['requirements'].split(',')
-
-                        specializations: list[EntityOption] = []
-                        if 'specializations' in row and row['specializations']:
-                            for specialization in row['specializations'].split(','):
-                                # Search for the specialization option in the global options list 
-                                existing_specialization_index = index_in_options_list(EntityOption(name=specialization, type=OptionTypes.SPECIALIZATION), options_list)
-                                if existing_specialization_index is not None:
-                                    specializations.append(options_list[existing_specialization_index])
-                                else:
-                                    specializations.append(EntityOption(name=specialization, type=OptionTypes.SPECIALIZATION))
-                        
-                        # Find or create the EntityOption in the options_list using the local member variables
-                        upsert_entity_option(EntityOption(
-                            type = option_type,
-                            name = option_name,
-                            description = description,
-                            weight = weight,
-                            min = min,
-                            max = max,
-                            mutually_exclusive = exclusive_options,
-                            requirements = requirements,
-                            specilizations = specializations
-                            )
-                        )
-                    except KeyError as e:
-                        logger = logging.getLogger(__name__)
-                        err_msg = f"Invalid CSV header: {e}"
-                        logger.error(err_msg)
-                        raise ValueError(err_msg)
-                    except ValueError as e:
-                        logger = logging.getLogger(__name__)
-                        err_msg = f"Invalid data in CSV: {e}"
-                        logger.error(err_msg)
-                        raise ValueError(err_msg)
-
-        elif input_file_path.endswith(".json"):
-            with open(input_file_path, 'r') as file:
-                data = json.load(file)
-                for option_data in data:
-                    try:
-                        #Parse row data from the CSV file to the local EntityOption member variables
-                        option_type = OptionTypes[option_data['type']]
-                        option_name = option_data['name']
-                        description = option_data.get('description', '')
-                        weight = float(option_data.get('weight', 1.0))
-                        min = int(option_data.get('min', 1))
-                        max = int(option_data.get('max', 1))
-
-                        exclusive_options: list[EntityOption] = []
-                        if 'exclusive' in option_data:
-                            for exclusive_option in option_data.get('exclusive', []):
-                                # Search for the exclusive option in the global options list 
-                                existing_exclusive_option_index = index_in_options_list(EntityOption(name=exclusive_option), options_list)
-                                if existing_exclusive_option_index is not None:
-                                    exclusive_options.append(options_list[existing_exclusive_option_index])
-                                else:
-                                    exclusive_options.append(EntityOption(name=exclusive_option))
-
-                        requirements: list[str] = option_data.get('requirements', [])
-
-                        specializations: list[EntityOption] = []
-                        if 'specializations' in option_data:
-                            for specialization in option_data.get('specializations', []):
-                                # Search for the specialization option in the global options list 
-                                existing_specialization_index = index_in_options_list(EntityOption(name=specialization, type=OptionTypes.SPECIALIZATION), options_list)
-                                if existing_specialization_index is not None:
-                                    specializations.append(options_list[existing_specialization_index])
-                                else:
-                                    specializations.append(EntityOption(name=specialization, type=OptionTypes.SPECIALIZATION))
-
-                        # Find or create the EntityOption in the options_list using the local member variables
-                        upsert_entity_option(EntityOption(
-                            type = option_type,
-                            name = option_name,
-                            description = description,
-                            weight = weight,
-                            min = min,
-                            max = max,
-                            mutually_exclusive = exclusive_options,
-                            requirements = requirements,
-                            specilizations = specializations
-                            )
-                        )
-                    except KeyError as e:
-                        logger = logging.getLogger(__name__)
-                        err_msg = f"Invalid JSON data: {e}"
-                        logger.error(err_msg)
-                        raise ValueError(err_msg)
-                    except ValueError as e:
-                        logger = logging.getLogger(__name__)
-                        err_msg = f"Invalid data in JSON: {e}"
-                        logger.error(err_msg)
-                        raise ValueError(err_msg)
-
-        else:
-            logger = logging.getLogger(__name__)
-            err_msg = f"Unsupported file format: {input_file_path}"
-            logger.error(err_msg)
-            raise ValueError(err_msg)
-
-    except FileNotFoundError as e:
-        raise FileNotFoundError(f"Input options file not found at {input_file_path}.")
-
-def index_in_options_list(option: EntityOption, options_list: list[EntityOption]) -> int:
-    # Find the index of the existing option in the options_list
-    if option.name is not None and option.type is not None:
-        try:
-            existing_option_index = next(i for i, opt in enumerate(options_list) 
-                                        if opt.type == option.type and opt.name == option.name)
-        except StopIteration:
-            existing_option_index = None
-    elif option.name is not None:
-        try:
-            existing_option_index = next(i for i, opt in enumerate(options_list) 
-                                        if opt.name == option.name)
-        except StopIteration:
-            existing_option_index = None
-    else:
-        existing_option_index = None
-    return existing_option_index
-
-def upsert_entity_option(option: EntityOption, options_list: list[EntityOption]) -> None:
-    option_type: OptionTypes = option.type
-    option_name: str = option.name
-    description: str = option.description
-    weight: float = option.weight
-    min: int = option.min
-    max: int = option.max
-    exclusive_options: list[EntityOption] = option.mutually_exclusive
-    requirements: list[str] = option.requirements
-    specializations: list[EntityOption] = option.specilizations
-
-    existing_option_index = index_in_options_list(EntityOption(name=option_name, type=option_type), options_list)
-
-    if existing_option_index is not None:
-        existing_option = options_list[existing_option_index]
-        # Update existing option with new values 
-        existing_option.description = description
-        existing_option.weight = weight
-        existing_option.min = min
-        existing_option.max = max
-        existing_option.mutually_exclusive.extend(exclusive_options)
-        existing_option.requirements += requirements
-        existing_option.specilizations.extend(specializations)
-        # Save it back to the existing option in the options_list
-        options_list[existing_option_index] = existing_option
-    else:   
-        # Append new EntityOption to the options_list
-        options_list.append(option)
+    logger = logging.getLogger(__name__)
+    def log_progress(records: int, bytes_read: int, total_bytes: int) -> None:
+        logger.info("Read %d options from %s (%d/%d bytes)", records, input_file_path, bytes_read, total_bytes)
+    with timed("io", "EntityOption"):
+        load_options_file(input_file_path, options_list, flag, progress=log_progress)
 
 def is_valid_results_output_mode(results_output_mode) -> bool:
     value, is_valid = is_valid_config_value(results_output_mode, str)
@@ -1014,16 +912,22 @@ def get_datetime_filename(file_type: str, file_format: str) -> str:
     # Create a filename with the formatted date and time
     return f"{file_type}_{formatted_datetime}.{file_format}"
 
-def get_extension_from_mime(mime_type):
-    try:
-        magic_instance = magic.Magic(mime=True)
-        file_type = magic_instance.from_buffer(mime_type)
-        extension = mimetypes.guess_extension(file_type)
-        return extension
-    except Exception as e:
-        logger = logging.getLogger(__name__)
-        logger.error(f"Error: {e}")
-        return None
+def get_extension_from_mime(mime_type: str) -> str:
+    """
+    Returns the file extension of a MIME type, from MIME_EXTENSIONS for the formats the program
+    reads and writes, and from the mimetypes module otherwise.
+
+    args:
+        mime_type: The MIME type, e.g. "text/markdown".
+
+    returns:
+        The extension including its leading dot, e.g. ".md", or None if the MIME type is unknown.
+    """
+    extension = MIME_EXTENSIONS.get(mime_type)
+    if extension is None:
+        import mimetypes
+        extension = mimetypes.guess_extension(mime_type)
+    return extension
 
 def is_valid_config_value(value, type) -> tuple[str | int | float | bool, bool]:
     try:
@@ -1054,11 +958,49 @@ def reset_config(defaults: dict) -> None:
     with open('config.ini', 'w') as configfile:
         config.write(configfile)
 
+def start_profiling(json_file_path: str = None, capture: str = None, log_dir: str = "data/log/") -> Metrics:
+    """
+    Turns on the instrumentation of the generation stages and registers an exit handler that 
+    prints the summary table, and optionally dumps the metrics as JSON and writes the 
+    cProfile/tracemalloc captures.
+
+    args:
+        json_file_path: Optional path of a JSON file to dump the metrics to.
+        capture: Optional capture to take: "cprofile", "tracemalloc", or "all".
+        log_dir: The directory to write the captures to.
+
+    returns:
+        The Metrics being recorded.
+    """
+    metrics = Metrics()
+    set_metrics(metrics)
+    profile_capture = None
+    if capture:
+        profile_capture = ProfileCapture(log_dir, cprofile=capture in ("cprofile", "all"), tracemalloc=capture in ("tracemalloc", "all"))
+        profile_capture.start()
+
+    def report() -> None:
+        set_metrics(None)
+        print(metrics.format_table(), file=sys.stderr)
+        if json_file_path:
+            metrics.write_json(json_file_path)
+            print(f"Metrics written to {json_file_path}", file=sys.stderr)
+        if profile_capture is not None:
+            for path in profile_capture.stop():
+                print(f"Capture written to {path}", file=sys.stderr)
+            if profile_capture.peak_bytes is not None:
+                print(f"Peak traced memory: {profile_capture.peak_bytes / 2**20:.1f} MiB", file=sys.stderr)
+
+    atexit.register(report)
+    return metrics
+
 def save_object_data(data, file_path: str) -> None:
     """Save object data to pickle """
 
+    import pickle
+
     # Open a file in binary write mode
-    with open(file_path, "wb") as file:
+    with timed("io", type(data).__name__), open(file_path, "wb") as file:
         # Dump the object to the file
         pickle.dump(data, file)
 
@@ -1077,10 +1019,11 @@ def load_object_data(file_path: str):
         Exception: If an error occurs during loading.
     """
 
+    import pickle
     logger = logging.getLogger(__name__)
 
     try:
-        with open(file_path, "rb") as file:
+        with timed("io", "load"), open(file_path, "rb") as file:
             return pickle.load(file)
     except FileNotFoundError:
         logger.error(f"File not found at {file_path}")
@@ -1180,108 +1123,47 @@ def load_previously_generated_entities(object_output_dir: str) -> tuple[EntityGr
     return entities, options_list
 
 def create_random_person(entities: EntityGraph, options_list: list[EntityOption]) -> Person:
-    logger = logging.getLogger(__name__)
-    logger.warning(f"Executing {create_random_person.__name__}...")
-    
-    applicable_option_types = {
-        OptionTypes.AGE: (1, 1),
-        OptionTypes.BACKGROUND: (1, 2),
-        OptionTypes.FAMILY_NAME: (1, 1),
-        OptionTypes.NAME: (1, 2),
-        OptionTypes.NICKNAME: (0, 2),
-        OptionTypes.PERSONALITY_TRAIT: (1, 3),
-        OptionTypes.PHYSICAL_TRAIT: (1, 3),
-        OptionTypes.PROFESSION: (1, 2),
-        OptionTypes.RACE: (1, 1),
-        OptionTypes.ROLE: (0, 3),
-        OptionTypes.RELATIONSHIP: (1, 10),
-        OptionTypes.SEX: (1, 1),
-        OptionTypes.SPECIALIZATION: (0, 2),
-        OptionTypes.SKILL: (1, 6),
-        OptionTypes.UNIQUE: (0, 2)
-    }
-
-    # Create an instance of the factory
-    factory: EntityFactory = EntityFactory(Person, applicable_option_types, options_list)
-    logger.warning(f"Factory will create entities of type: {factory.get_entity_type()}")
+    # Reuse the long-lived factory for the type
+    factory: EntityFactory = get_factory(Person, options_list)
 
     # Generate random person entity
     person: Person = factory.create_random_entity(options_list)
-    species: EntityOption = person.attributes[OptionTypes.RACE][0]
-    logger.warning(f"Person {person.id}: {person.name}, age={person.age}, species={species} sex={person.sex}")
-    #logger.warning(f"Attributes of created Person: {person.attributes}")
+    log_entities(logging.getLogger(__name__), (person,))
     entities.add(person)
 
     return person
 
 def create_random_location(entities: EntityGraph, options_list: list[EntityOption]) -> Location:
-    logger = logging.getLogger(__name__)
-    logger.warning(f"Executing {create_random_location.__name__}...")
-    
-    applicable_option_types = {
-        OptionTypes.NAME: (1, 1),
-        OptionTypes.TYPE: (1, 1),
-        OptionTypes.CLIMATE: (1, 1),
-        OptionTypes.RESOURCES: (1, 2),
-        OptionTypes.TERRAIN: (1, 2),
-        OptionTypes.UNIQUE: (0, 2)
-    }
-
-    # Create an instance of the factory
-    factory: EntityFactory = EntityFactory(Location, applicable_option_types, options_list)
-    logger.warning(f"Factory will create entities of type: {factory.get_entity_type()}")
+    # Reuse the long-lived factory for the type
+    factory: EntityFactory = get_factory(Location, options_list)
 
     # Generate random entities
     location: Location = factory.create_random_entity(options_list)
-    logger.warning(f"Attributes of created Location: {location.attributes}")
+    log_entities(logging.getLogger(__name__), (location,))
     entities.add(location)
 
     return location
 
 def create_random_organization(entities: EntityGraph, options_list: list[EntityOption]) -> Organization:
-    logger = logging.getLogger(__name__)
-    logger.warning(f"Executing {create_random_organization.__name__}...")
-    
-    applicable_option_types = {
-        OptionTypes.NAME: (1, 1),
-        OptionTypes.TYPE: (1, 1),
-        OptionTypes.RELATIONSHIP: (0, 5),
-        OptionTypes.ROLE: (1, 2),
-        OptionTypes.SPECIALIZATION: (0, 2),
-        OptionTypes.UNIQUE: (0, 2)
-    }
-
-    # Create an instance of the factory
-    factory: EntityFactory = EntityFactory(Organization, applicable_option_types, options_list)
-    logger.warning(f"Factory will create entities of type: {factory.get_entity_type()}")
+    # Reuse the long-lived factory for the type
+    factory: EntityFactory = get_factory(Organization, options_list)
 
     # Generate random entities
     organization: Organization = factory.create_random_entity(options_list)
-    logger.warning(f"Attributes of created Organization: {organization.attributes}")
+    log_entities(logging.getLogger(__name__), (organization,))
     entities.add(organization)
 
     return organization
 
 def create_random_gpe(entities: EntityGraph, options_list: list[EntityOption]) -> GeoPoliticalEntity:
-    logger = logging.getLogger(__name__)
-    logger.warning(f"Executing {create_random_gpe.__name__}...")
-    
-    applicable_option_types = {
-        OptionTypes.NAME: (1, 1),
-        OptionTypes.RELATIONSHIP: (0, 10),
-        OptionTypes.TYPE: (1, 1),
-        OptionTypes.UNIQUE: (0, 2)
-    }
-    
-    # Create an instance of the factory
-    factory: EntityFactory = EntityFactory(GeoPoliticalEntity, applicable_option_types, options_list)
-    logger.warning(f"Factory will create entities of type: {factory.get_entity_type()}")
+    # Reuse the long-lived factory for the type
+    factory: EntityFactory = get_factory(GeoPoliticalEntity, options_list)
 
     # Generate random entities
     location = create_random_location(entities, options_list)
     organization = create_random_organization(entities, options_list)
     gpe: GeoPoliticalEntity = factory.create_random_entity(options_list, location= location, organization= organization)
-    logger.warning(f"Attributes of created Location: {gpe.attributes}")
+    log_entities(logging.getLogger(__name__), (gpe,))
     entities.add(gpe)
     entities.add_edge(location, organization)
     entities.add_edge(location, gpe)
@@ -1310,37 +1192,80 @@ def display_entity(entity: Entity) -> None:
     print(f"Entity {entity.id}: {entity.name}")
     print(f"Attributes of created Entity: {entity.attributes}")
 
-def process_entities_stack(entities: EntityGraph, tracker: EntityTracker, options_list: list[EntityOption]) -> None:
+def run_batch(tracker: EntityTracker, options_list: list[EntityOption], results_outfile_format: OutputResultsFileFormat,
+              output_file_path: str = None, seed: int = None, include_edges: bool = False, workers: int = 1) -> int:
     """
-    Processes the tracker's entity stack by popping the top entity class off and creating a random instance 
-    of an entity using the passed in options list and adding it to the graph for each entity type within 
-    until the stack is empty.
+    Generates the entities queued in the tracker and streams every entity (and optionally every
+    edge) through a buffered writer as soon as its chunk is generated. Nothing is
+    kept once written, so memory stays flat no matter how many entities are requested.
+
+    args:
+        tracker: The EntityTracker holding the queued work.
+        options_list: A list of EntityOption objects to use for randomization.
+        results_outfile_format: The format to write: CSV, JSON (written as JSON Lines), JSON Lines, or Markdown.
+        output_file_path: Path of the file to write to; defaults to stdout.
+        seed: Optional world seed; the same seed streams the same entities.
+        include_edges: Whether to write the relationship edges between the entities as well.
+        workers: The number of worker processes to shard each chunk across.
+
+    returns:
+        The number of entities written.
+
+    raises:
+        ValueError: If the results file format cannot be streamed.
+    """
+    if results_outfile_format not in BATCH_OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported batch output format: {results_outfile_format.value}")
+
+    if output_file_path:
+        file = open(output_file_path, "w", buffering=1 << 20, encoding="utf-8", newline="")
+    else:
+        file = open(sys.stdout.fileno(), "w", buffering=1 << 20, encoding="utf-8", newline="", closefd=False)
+
+    writer = get_entity_writer(BATCH_OUTPUT_FORMATS[results_outfile_format], file)
+    try:
+        for generated, edges in stream_world(tracker, options_list, seed=seed, workers=workers):
+            with timed("io", "write", len(generated)):
+                writer.write_entities(generated, edges if include_edges else None)
+        with timed("io", "write", 0):
+            file.flush()
+    except BrokenPipeError:
+        # The reader of a pipeline (e.g. head) exited early; stop quietly, and point stdout at 
+        # devnull so the interpreter does not fail flushing it again on exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+    finally:
+        try:
+            file.close()
+        except BrokenPipeError:
+            pass
+    return writer.entity_count
+
+def process_entities_stack(entities: EntityGraph, tracker: EntityTracker, options_list: list[EntityOption], workers: int = 1, seed: int = None) -> None:
+    """
+    Processes the tracker's work queue by taking all of the queued (entity class, count) work off 
+    it and creating that many random instances of each type using the passed in options list, 
+    along with the related entities they require, adding them to the graph.
 
     args:
         entities: An instance of the EntityGraph class to add the created entities to.
-        tracker: An instance of the EntityTracker class to manage the entity stack.
+        tracker: An instance of the EntityTracker class holding the queued work.
         options: A list of EntityOption objects to use for randomization.
+        workers: The number of worker processes to shard the queued entities across.
+        seed: Optional world seed to generate each entity from its own reproducible random stream.
 
     returns:
         none
     """
-    # TODO: Evalute the necessary relationships to other entities and add them to the graph as well if they are not already present
-    while tracker.entity_stack:
-        entity_type = tracker.entity_stack.pop()
-        if entity_type == Person:    
-            person = create_random_person(entities, options_list)
-            
-        elif entity_type == Location:
-            location = create_random_location(entities, options_list)
-            
-        elif entity_type == Organization:
-            organization = create_random_organization(entities, options_list)
-            
-        elif entity_type == GeoPoliticalEntity:
-            gpe = create_random_gpe(entities, options_list)
-            
-        else:
-            raise TypeError(f"Invalid entity type: {entity_type}")
+    queued_counts: dict[type[Entity], int] = tracker.drain()
+
+    # The scheduler also creates the entities the queued ones depend on (e.g. the location and 
+    # organization of a GeoPoliticalEntity), reusing those already in the graph where it can
+    logger = logging.getLogger(__name__)
+    logger.info("Generating %d entities across %d workers...", sum(queued_counts.values()), workers)
+    created_counts = GenerationScheduler().run(entities, queued_counts, options_list, workers=workers, seed=seed, offsets=tracker.generated_counts)
+    for entity_type, count in created_counts.items():
+        tracker.record_generated(entity_type, count)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
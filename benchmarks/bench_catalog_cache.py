@@ -0,0 +1,46 @@
+"""
+Measures the compiled catalog cache. Writes a synthetic CSV options file with the given number 
+of rows and times building its options list and sampling index from scratch against loading 
+them from a CatalogCache entry.
+
+usage: python -m benchmarks.bench_catalog_cache [--rows 100000]
+"""
+import argparse, os, tempfile, time
+
+from entity_engine import CatalogCache, OptionCatalog, OptionSamplingIndex, load_options_file
+
+from .bench_options_loader import get_records, write_csv
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compiled catalog cache load time")
+    parser.add_argument('--rows', type=int, default=100_000, help='Number of option rows in the options file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "options.csv")
+        write_csv(csv_path, get_records(args.rows))
+        cache = CatalogCache(os.path.join(directory, "obj"))
+
+        def build() -> list:
+            options_list: list = []
+            load_options_file(csv_path, options_list)
+            return options_list
+
+        start = time.perf_counter()
+        options_list = build()
+        OptionSamplingIndex(options_list, OptionCatalog())
+        build_seconds = time.perf_counter() - start
+
+        # Fresh catalogs stand in for the empty catalog of a new process
+        cache.get_options_list([csv_path], build, OptionCatalog())
+        start = time.perf_counter()
+        cached_list, _ = cache.get_options_list([csv_path], build, OptionCatalog())
+        cached_seconds = time.perf_counter() - start
+
+        key = cache.get_key([csv_path])
+        print(f"{'rows':>10} {'cache MiB':>10} {'build s':>10} {'cached s':>10} {'speedup':>8}")
+        print(f"{len(cached_list):>10} {os.path.getsize(cache.get_path(key)) / 2**20:>10.1f} {build_seconds:>10.3f} "
+              f"{cached_seconds:>10.3f} {build_seconds / cached_seconds:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Benchmarks EntityGraph build time as the number of nodes grows. With the id index, building 
+an N-entity graph should scale linearly, i.e. the time per node should stay flat across sizes.
+
+usage: python -m benchmarks.bench_entity_graph [--max-nodes 1000000]
+"""
+import argparse, time
+
+from entity_engine import EntityGraph, EntityOption, Location, OptionTypes
+
+def make_locations(n: int) -> list[Location]:
+    name = EntityOption(name="Bron", type=OptionTypes.NAME)
+    return [Location(attributes={OptionTypes.NAME: [name]}) for _ in range(n)]
+
+def bench_build(nodes: list[Location]) -> float:
+    """
+    Returns the seconds taken to add the nodes to an empty graph one at a time and look each of them up by id.
+    """
+    start = time.perf_counter()
+    entities = EntityGraph()
+    for node in nodes:
+        entities.add(node)
+    for node in nodes:
+        entities.get_by_id(node.id)
+    return time.perf_counter() - start
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="EntityGraph build scaling benchmark")
+    parser.add_argument('--max-nodes', type=int, default=1_000_000, help='Largest graph size to build')
+    args = parser.parse_args()
+
+    print(f"{'nodes':>10} {'seconds':>10} {'us/node':>10}")
+    n = 1_000
+    while n <= args.max_nodes:
+        seconds = bench_build(make_locations(n))
+        print(f"{n:>10} {seconds:>10.3f} {seconds / n * 1e6:>10.2f}")
+        n *= 10
+
+if __name__ == "__main__":
+    main()
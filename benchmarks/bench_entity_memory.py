@@ -0,0 +1,72 @@
+"""
+Reports the memory held per generated entity, measured with tracemalloc. The options list is 
+built before measuring, so only the entities themselves (and anything they do not share) count. 
+Compact entities are compared with entities holding a dictionary of attributes (compact=False) 
+and with the entities of the tree before slots and compact attributes, whose sizes are recorded 
+in LEGACY_BYTES_PER_ENTITY; the target is a TARGET_REDUCTION times smaller entity. The last 
+column is the cost of the compact entities once appended to a columnar EntityStore.
+
+usage: python -m benchmarks.bench_entity_memory [--count 20000]
+"""
+import argparse, gc, sys, tracemalloc
+
+from entity_engine import EntityFactory, EntityStore, Location, Organization, Person
+from entity_engine import LOCATION_OPTION_TYPES, ORGANIZATION_OPTION_TYPES, PERSON_OPTION_TYPES
+
+from benchmarks.common import get_default_options_list
+
+# Bytes per entity of the unslotted entities with dictionaries of option lists and uuid4 ids, 
+# measured the same way (5k entities, default options, Python 3.11) before the compact representation
+LEGACY_BYTES_PER_ENTITY: dict[str, float] = {"Person": 3407.0, "Location": 1130.0, "Organization": 898.0}
+TARGET_REDUCTION: float = 3.0
+
+def bytes_per_entity(factory: EntityFactory, options_list: list, count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = [factory.create_random_entity(options_list) for _ in range(count)]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del entities
+    return (after - before) / count
+
+def bytes_per_stored_entity(factory: EntityFactory, options_list: list, count: int) -> float:
+    entities = [factory.create_random_entity(options_list) for _ in range(count)]
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = EntityStore()
+    store.extend(entities)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del store, entities
+    return (after - before) / count
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bytes-per-entity report")
+    parser.add_argument('--count', type=int, default=20_000, help='Number of entities of each type to generate')
+    args = parser.parse_args()
+
+    options_list = get_default_options_list()
+    print(f"{'entity':>14} {'compact':>10} {'dict':>10} {'vs dict':>8} {'legacy':>10} {'vs legacy':>10} {'stored':>10}")
+    missed: list[str] = []
+    for entity_type, applicable_option_types in ((Person, PERSON_OPTION_TYPES), (Location, LOCATION_OPTION_TYPES), 
+                                                 (Organization, ORGANIZATION_OPTION_TYPES)):
+        factory = EntityFactory(entity_type, applicable_option_types, options_list)
+        compact = bytes_per_entity(factory, options_list, args.count)
+        plain = bytes_per_entity(EntityFactory(entity_type, applicable_option_types, options_list, compact=False), options_list, args.count)
+        legacy = LEGACY_BYTES_PER_ENTITY[entity_type.__name__]
+        if legacy / compact < TARGET_REDUCTION:
+            missed.append(entity_type.__name__)
+        print(f"{entity_type.__name__:>14} {compact:>10.0f} {plain:>10.0f} {plain / compact:>7.1f}x {legacy:>10.0f} {legacy / compact:>9.1f}x "
+              f"{bytes_per_stored_entity(factory, options_list, args.count):>10.0f}")
+
+    if missed:
+        print(f"Below the {TARGET_REDUCTION:.0f}x reduction target: {', '.join(missed)}")
+        sys.exit(1)
+    print(f"Every entity type meets the {TARGET_REDUCTION:.0f}x reduction target")
+
+if __name__ == "__main__":
+    main()
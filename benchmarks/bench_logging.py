@@ -0,0 +1,64 @@
+"""
+Measures the overhead of logging on bulk generation. Times generating a world of persons and
+GeoPoliticalEntity objects with logging disabled, with the queued logging pipeline at its
+default levels, and with debug logging of sampled entity events to a rotating file, reporting
+the best of --repeat interleaved runs of each.
+
+usage: python -m benchmarks.bench_logging [--count 20000] [--repeat 5] [--sample_rate 1000]
+"""
+import argparse, gc, logging, os, tempfile, time
+
+from entity_engine import EntityGraph, GenerationScheduler, GeoPoliticalEntity, Person, start_logging
+
+from .common import get_default_options_list
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Logging overhead of bulk generation")
+    parser.add_argument('--count', type=int, default=20_000, help='Number of persons to generate per run')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of runs per configuration')
+    parser.add_argument('--sample_rate', type=int, default=1000, help='Log one in this many entity events at debug level')
+    args = parser.parse_args()
+
+    options_list = get_default_options_list()
+    counts = {Person: args.count, GeoPoliticalEntity: args.count // 10}
+    scheduler = GenerationScheduler()
+    scheduler.run(EntityGraph(), counts, options_list)
+
+    def time_run() -> float:
+        gc.collect()
+        start = time.perf_counter()
+        scheduler.run(EntityGraph(), counts, options_list)
+        return time.perf_counter() - start
+
+    root = logging.getLogger()
+    with tempfile.TemporaryDirectory() as directory:
+        configurations = (("off", None),
+                          ("default", {"file": os.path.join(directory, "default.log")}),
+                          ("debug", {"level": "CRITICAL", "file": os.path.join(directory, "debug.log"), "file_level": "DEBUG",
+                                     "sample_rate": str(args.sample_rate)}))
+        # Interleave the configurations so drift in the machine's speed affects them alike
+        seconds: dict[str, list[float]] = {name: [] for name, _ in configurations}
+        for _ in range(args.repeat):
+            for name, settings in configurations:
+                listener = start_logging(settings) if settings is not None else None
+                try:
+                    seconds[name].append(time_run())
+                finally:
+                    if listener is not None:
+                        listener.stop()
+                        for handler in list(root.handlers):
+                            root.removeHandler(handler)
+                        root.setLevel(logging.WARNING)
+
+        debug_lines = sum(1 for _ in open(os.path.join(directory, "debug.log")))
+
+    results = [(name, min(seconds[name])) for name, _ in configurations]
+    entity_count = sum(scheduler.plan(counts).values())
+    baseline = results[0][1]
+    print(f"{'logging':>8} {'entities':>9} {'best s':>9} {'overhead':>9}")
+    for name, best in results:
+        print(f"{name:>8} {entity_count:>9} {best:>9.3f} {(best / baseline - 1) * 100:>8.2f}%")
+    print(f"debug log lines over {args.repeat} runs: {debug_lines}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Measures options file loading throughput. Writes synthetic CSV, JSON, and JSON Lines options 
+files with the given number of rows (a fifth of them referring to exclusive options and 
+specializations) and times load_options_file on each, along with the peak memory it allocates.
+
+usage: python -m benchmarks.bench_options_loader [--rows 100000]
+"""
+import argparse, csv, json, os, tempfile, time, tracemalloc
+
+from entity_engine import OptionTypes, load_options_file
+
+FIELDS = ["type", "name", "description", "weight", "min", "max", "exclusive", "requirements", "specializations"]
+
+def get_records(rows: int) -> list[dict]:
+    option_types = [option_type.name for option_type in OptionTypes]
+    records: list[dict] = []
+    for i in range(rows):
+        record = {"type": option_types[i % len(option_types)], "name": f"Option {i}", "description": f"Synthetic option {i}",
+                  "weight": (i % 100) + 1, "min": 1, "max": 100}
+        if i % 5 == 0:
+            record["exclusive"] = [f"Option {(i + 7) % rows}"]
+            record["specializations"] = [f"Option {(i * 3) % rows}"]
+        records.append(record)
+    return records
+
+def write_csv(path: str, records: list[dict]) -> None:
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        for record in records:
+            writer.writerow({key: ",".join(value) if isinstance(value, list) else value for key, value in record.items()})
+
+def time_load(path: str) -> tuple[float, int, int]:
+    options_list: list = []
+    start = time.perf_counter()
+    count = load_options_file(path, options_list)
+    seconds = time.perf_counter() - start
+
+    # Measure the peak in a separate run, since tracing slows the load down
+    options_list = []
+    tracemalloc.start()
+    load_options_file(path, options_list)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, count, peak
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Options file loading throughput")
+    parser.add_argument('--rows', type=int, default=100_000, help='Number of option rows per file')
+    args = parser.parse_args()
+
+    records = get_records(args.rows)
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "options.csv")
+        json_path = os.path.join(directory, "options.json")
+        jsonl_path = os.path.join(directory, "options.jsonl")
+        write_csv(csv_path, records)
+        with open(json_path, "w") as file:
+            json.dump(records, file)
+        with open(jsonl_path, "w") as file:
+            file.writelines(json.dumps(record) + "\n" for record in records)
+
+        print(f"{'format':>8} {'rows':>10} {'MiB':>8} {'seconds':>10} {'rows/s':>12} {'peak MiB':>10}")
+        for file_format, path in (("CSV", csv_path), ("JSON", json_path), ("JSONL", jsonl_path)):
+            seconds, count, peak = time_load(path)
+            print(f"{file_format:>8} {count:>10} {os.path.getsize(path) / 2**20:>8.1f} {seconds:>10.3f} "
+                  f"{count / seconds:>12.0f} {peak / 2**20:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Measures composite world generation. Times creating GeoPoliticalEntity objects one at a time
+with the command line program's create_random_gpe (each with its location and organization,
+added to the graph edge by edge) against the GenerationScheduler, which also gives every
+organization a headquarters and a leader.
+
+usage: python -m benchmarks.bench_scheduler [--count 5000] [--workers 1]
+"""
+import argparse, logging, time
+
+from entity_engine import EntityGraph, GenerationScheduler, GeoPoliticalEntity
+
+from .common import load_cli_module
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Composite world generation time")
+    parser.add_argument('--count', type=int, default=5000, help='Number of GeoPoliticalEntity objects to generate')
+    parser.add_argument('--workers', type=int, default=1, help='Number of worker processes for the scheduler')
+    args = parser.parse_args()
+
+    # The inline path logs every entity it creates
+    logging.disable(logging.CRITICAL)
+    cli = load_cli_module()
+    options_list = cli.get_default_options_list()
+
+    entities = EntityGraph()
+    start = time.perf_counter()
+    for _ in range(args.count):
+        cli.create_random_gpe(entities, options_list)
+    inline_seconds = time.perf_counter() - start
+    inline_count = entities.count()
+
+    entities = EntityGraph()
+    start = time.perf_counter()
+    GenerationScheduler().run(entities, {GeoPoliticalEntity: args.count}, options_list, workers=args.workers)
+    scheduled_seconds = time.perf_counter() - start
+
+    print(f"{'GPEs':>8} {'path':>10} {'entities':>10} {'seconds':>10} {'per GPE us':>11}")
+    print(f"{args.count:>8} {'inline':>10} {inline_count:>10} {inline_seconds:>10.3f} {inline_seconds / args.count * 1e6:>11.1f}")
+    print(f"{args.count:>8} {'scheduler':>10} {entities.count():>10} {scheduled_seconds:>10.3f} {scheduled_seconds / args.count * 1e6:>11.1f}")
+
+if __name__ == "__main__":
+    main()
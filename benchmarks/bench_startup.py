@@ -0,0 +1,38 @@
+"""
+Measures CLI startup latency: the time to import entity_engine in a fresh interpreter, and the 
+time for `python <repo> -p 1` to start, generate its first entity, and exit from the menu. Each 
+command runs in a new process from a scratch working directory; the first CLI run is a warm-up 
+that also fills the compiled catalog cache.
+
+usage: python -m benchmarks.bench_startup [--runs 10]
+"""
+import argparse, os, statistics, subprocess, sys, tempfile, time
+
+from .common import REPO_DIR
+
+def time_command(command: list[str], cwd: str, stdin: str = "") -> float:
+    start = time.perf_counter()
+    subprocess.run(command, cwd=cwd, input=stdin, text=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="CLI startup latency")
+    parser.add_argument('--runs', type=int, default=10, help='Number of timed runs per command')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.makedirs(os.path.join(directory, "data", "obj"))
+        commands = {
+            "python (baseline)": ([sys.executable, "-c", "pass"], REPO_DIR, ""),
+            "import entity_engine": ([sys.executable, "-c", "import entity_engine"], REPO_DIR, ""),
+            "first entity (CLI)": ([sys.executable, REPO_DIR, "-p", "1", "-l", "0", "-o", "0", "-gpe", "0"], directory, "X\n"),
+        }
+
+        print(f"{'command':>22} {'min ms':>10} {'median ms':>10}")
+        for name, (command, cwd, stdin) in commands.items():
+            time_command(command, cwd, stdin)
+            times = [time_command(command, cwd, stdin) for _ in range(args.runs)]
+            print(f"{name:>22} {min(times) * 1000:>10.1f} {statistics.median(times) * 1000:>10.1f}")
+
+if __name__ == "__main__":
+    main()
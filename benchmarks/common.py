@@ -0,0 +1,15 @@
+import importlib.util, os
+
+REPO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+
+def load_cli_module():
+    """
+    Imports the command line program (the repository's __main__.py) as a module without running main().
+    """
+    spec = importlib.util.spec_from_file_location("fictional_entity_generator", os.path.join(REPO_DIR, "__main__.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def get_default_options_list() -> list:
+    return load_cli_module().get_default_options_list()
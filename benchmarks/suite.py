@@ -0,0 +1,316 @@
+"""
+Runs the benchmark suite: entity generation throughput per type, EntityGraph build, query, and
+traversal times as the graph grows, options file load time, and world save/load time and size.
+The results are written as JSON (to stdout, or --output) and compared against a stored baseline;
+the run fails with exit code 1 if any metric regressed by more than its threshold. A baseline
+recorded with another Python version or on another machine only warns about regressions.
+
+usage: python -m benchmarks.suite [--full] [--repeat 5] [--runs 1] [--output results.json]
+                                  [--baseline benchmarks/baseline.json] [--threshold 0.3] [--save_baseline]
+"""
+import argparse, json, os, pickle, platform, random, statistics, sys, tempfile, time
+
+from entity_engine import (EntityGraph, GenerationScheduler, GeoPoliticalEntity, Location, Organization, Person,
+                           generate_entities, load_options_file)
+from entity_engine.traversal import breadth_first_search, k_hop_neighborhood
+
+from .bench_entity_graph import make_locations
+from .bench_options_loader import get_records, write_csv
+from .common import REPO_DIR, get_default_options_list
+
+SUITE_VERSION: int = 2
+DEFAULT_BASELINE_PATH: str = os.path.join(REPO_DIR, "benchmarks", "baseline.json")
+# Graph sizes of a quick run; --full adds FULL_GRAPH_SIZE
+GRAPH_SIZES: tuple[int, ...] = (1_000, 10_000, 100_000)
+FULL_GRAPH_SIZE: int = 1_000_000
+# The allowed regression of metrics that do not depend on the speed of the machine
+SIZE_THRESHOLD: float = 0.05
+# The allowed regression of metrics whose calls take less than MICRO_SECONDS, which stay noisier 
+# than longer runs even when measured over many calls
+MICRO_THRESHOLD: float = 1.0
+MICRO_SECONDS: float = 0.01
+# The allowed regression of random lookups, which are bound by cache misses and vary up to 4x 
+# between processes on a shared machine; a lookup that stopped being O(1) is still far past it
+LOOKUP_THRESHOLD: float = 4.0
+# The shortest time of one measurement; faster calls are repeated in a loop until it is reached
+MIN_MEASURE_SECONDS: float = 0.1
+# The keys of the results that describe where they were measured
+ENVIRONMENT_KEYS: tuple[str, ...] = ("python", "implementation", "machine", "cpu_count")
+
+def get_metric(name: str, value: float, unit: str, better: str = "lower", threshold: float = None) -> dict:
+    """
+    Builds one metric record of the results.
+
+    args:
+        name: The dotted name of the metric.
+        value: The measured value.
+        unit: The unit of the value.
+        better: "lower" or "higher", whichever direction is an improvement.
+        threshold: Optional regression threshold of the metric, overriding the one of the run.
+
+    returns:
+        The metric record.
+    """
+    metric = {"name": name, "value": value, "unit": unit, "better": better}
+    if threshold is not None:
+        metric["threshold"] = threshold
+    return metric
+
+def best_of(repeat: int, run) -> float:
+    """
+    Returns the fastest time of one call of run, in seconds. Calls faster than MIN_MEASURE_SECONDS
+    are timed in a loop of as many calls as it takes to reach it, and each of the repeat 
+    measurements counts the mean time of its loop.
+    """
+    start = time.perf_counter()
+    run()
+    first = time.perf_counter() - start
+    number = 1 if first >= MIN_MEASURE_SECONDS else min(10_000, int(MIN_MEASURE_SECONDS / max(first, 1e-7)) + 1)
+
+    seconds = []
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        for _ in range(number):
+            run()
+        seconds.append((time.perf_counter() - start) / number)
+    return min(seconds)
+
+def get_timing_threshold(seconds: float) -> float:
+    """
+    Returns the regression threshold of a timing metric whose call took seconds, or None for the 
+    threshold of the run.
+    """
+    return MICRO_THRESHOLD if seconds < MICRO_SECONDS else None
+
+def bench_generation(options_list: list, count: int, repeat: int) -> list[dict]:
+    metrics: list[dict] = []
+    for entity_type in (Person, Location, Organization):
+        generate_entities(entity_type, 100, options_list)
+        seconds = best_of(repeat, lambda: generate_entities(entity_type, count, options_list))
+        metrics.append(get_metric(f"generate.{entity_type.__name__}", count / seconds, "entities/s", "higher"))
+
+    # GeoPoliticalEntity objects only exist along with the entities they depend on
+    scheduler = GenerationScheduler()
+    gpe_count = count // 10
+    seconds = best_of(repeat, lambda: scheduler.run(EntityGraph(), {GeoPoliticalEntity: gpe_count}, options_list))
+    metrics.append(get_metric("generate.GeoPoliticalEntity", gpe_count / seconds, "entities/s", "higher"))
+    return metrics
+
+def bench_graph(sizes: tuple[int, ...], repeat: int) -> list[dict]:
+    metrics: list[dict] = []
+    for n in sizes:
+        nodes = make_locations(n)
+        rng = random.Random(n)
+        # A ring with two random chords per node keeps every node reachable
+        edges = [(nodes[i], nodes[(i + 1) % n]) for i in range(n)] + [(nodes[i], nodes[rng.randrange(n)]) for i in range(n) for _ in range(2)]
+
+        def build() -> EntityGraph:
+            entities = EntityGraph()
+            entities.add_nodes(nodes)
+            entities.add_edges(edges)
+            return entities
+
+        seconds = best_of(repeat, build)
+        metrics.append(get_metric(f"graph.{n}.build", seconds, "s", threshold=get_timing_threshold(seconds)))
+        entities = build()
+
+        ids = [nodes[rng.randrange(n)].id for _ in range(10_000)]
+        seconds = best_of(repeat, lambda: [entities.get_by_id(id) for id in ids])
+        metrics.append(get_metric(f"graph.{n}.get_by_id", seconds / len(ids) * 1e6, "us/query", threshold=LOOKUP_THRESHOLD))
+        seconds = best_of(repeat, lambda: breadth_first_search(entities, nodes[0]))
+        metrics.append(get_metric(f"graph.{n}.bfs", seconds, "s", threshold=get_timing_threshold(seconds)))
+        seconds = best_of(repeat, lambda: k_hop_neighborhood(entities, nodes[0], 3))
+        metrics.append(get_metric(f"graph.{n}.k_hop_3", seconds * 1e6, "us", threshold=get_timing_threshold(seconds)))
+    return metrics
+
+def bench_options_load(directory: str, rows: int, repeat: int) -> list[dict]:
+    records = get_records(rows)
+    csv_path = os.path.join(directory, "options.csv")
+    jsonl_path = os.path.join(directory, "options.jsonl")
+    write_csv(csv_path, records)
+    with open(jsonl_path, "w") as file:
+        for record in records:
+            file.write(json.dumps(record) + "\n")
+
+    metrics: list[dict] = []
+    for name, path in (("csv", csv_path), ("jsonl", jsonl_path)):
+        metrics.append(get_metric(f"options_load.{name}", best_of(repeat, lambda: load_options_file(path, [])), "s"))
+    return metrics
+
+def bench_save_load(directory: str, options_list: list, count: int, repeat: int) -> list[dict]:
+    entities = EntityGraph()
+    GenerationScheduler().run(entities, {Person: count, GeoPoliticalEntity: count // 10}, options_list, seed=0)
+    path = os.path.join(directory, "entities.pkl")
+
+    def save() -> None:
+        with open(path, "wb") as file:
+            pickle.dump(entities, file)
+
+    def load() -> None:
+        with open(path, "rb") as file:
+            pickle.load(file)
+
+    save_seconds = best_of(repeat, save)
+    return [get_metric("save_load.save", save_seconds, "s"),
+            get_metric("save_load.load", best_of(repeat, load), "s"),
+            get_metric("save_load.size", os.path.getsize(path) / entities.count(), "bytes/entity", threshold=SIZE_THRESHOLD)]
+
+def get_environment() -> dict:
+    """
+    Describes the interpreter and machine of the run.
+
+    returns:
+        The python version and implementation, the platform, and the number of CPUs.
+    """
+    return {"python": platform.python_version(), "implementation": platform.python_implementation(),
+            "machine": platform.platform(), "cpu_count": os.cpu_count()}
+
+def compare_environments(results: dict, baseline: dict) -> list[str]:
+    """
+    Compares where results and a baseline were measured. Python versions are compared by major and 
+    minor version only.
+
+    args:
+        results: The results of run_suite.
+        baseline: The results of an earlier run.
+
+    returns:
+        A description of every difference; timings are only comparable when there are none.
+    """
+    differences: list[str] = []
+    for key in ENVIRONMENT_KEYS:
+        value, base = results.get(key), baseline.get(key)
+        if key == "python" and value and base:
+            value, base = ".".join(str(value).split(".")[:2]), ".".join(str(base).split(".")[:2])
+        if value != base:
+            differences.append(f"{key}: {results.get(key)} vs baseline {baseline.get(key)}")
+    return differences
+
+def run_suite(sizes: tuple[int, ...] = GRAPH_SIZES, repeat: int = 5, count: int = 20_000, rows: int = 50_000) -> dict:
+    """
+    Runs every benchmark of the suite.
+
+    args:
+        sizes: The EntityGraph sizes to benchmark.
+        repeat: The number of measurements per metric; the fastest one counts.
+        count: The number of entities per generation and save/load benchmark.
+        rows: The number of rows of the options files.
+
+    returns:
+        The results: the suite version, the environment of get_environment, and the metric records.
+    """
+    options_list = get_default_options_list()
+    metrics: list[dict] = []
+    metrics.extend(bench_generation(options_list, count, repeat))
+    metrics.extend(bench_graph(sizes, repeat))
+    with tempfile.TemporaryDirectory() as directory:
+        metrics.extend(bench_options_load(directory, rows, repeat))
+        metrics.extend(bench_save_load(directory, options_list, count, repeat))
+    return {"suite_version": SUITE_VERSION, **get_environment(), "metrics": metrics}
+
+def merge_runs(runs: list[dict]) -> dict:
+    """
+    Merges the results of several runs of the suite into the median value per metric, which keeps
+    a baseline from resting on one unusually fast or slow run of a shared machine.
+
+    args:
+        runs: The results of run_suite, in order.
+
+    returns:
+        The results of the first run, with the median value of every metric over the runs.
+    """
+    values: dict[str, list[float]] = {}
+    for run in runs:
+        for metric in run["metrics"]:
+            values.setdefault(metric["name"], []).append(metric["value"])
+    return {**runs[0], "runs": len(runs), 
+            "metrics": [{**metric, "value": statistics.median(values[metric["name"]])} for metric in runs[0]["metrics"]]}
+
+def compare_results(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Compares results against a baseline. Metrics missing from either side are skipped.
+
+    args:
+        results: The results of run_suite.
+        baseline: The results of an earlier run.
+        threshold: The allowed regression as a fraction of the baseline value, unless a metric
+                   has a threshold of its own.
+
+    returns:
+        A description of every metric that regressed past its threshold.
+    """
+    baseline_metrics = {metric["name"]: metric for metric in baseline.get("metrics", [])}
+    regressions: list[str] = []
+    for metric in results["metrics"]:
+        base = baseline_metrics.get(metric["name"])
+        if base is None or not base["value"]:
+            continue
+        allowed = metric.get("threshold", threshold)
+        if metric["better"] == "higher":
+            change = base["value"] / metric["value"] - 1 if metric["value"] else float("inf")
+        else:
+            change = metric["value"] / base["value"] - 1
+        if change > allowed:
+            regressions.append(f"{metric['name']}: {metric['value']:.6g} {metric['unit']} vs baseline {base['value']:.6g} "
+                               f"({change:+.0%} worse, allowed {allowed:.0%})")
+    return regressions
+
+def format_results(results: dict, baseline: dict = None) -> str:
+    baseline_metrics = {metric["name"]: metric for metric in (baseline or {}).get("metrics", [])}
+    lines = [f"{'metric':<32} {'value':>14} {'unit':<14} {'baseline':>14}"]
+    for metric in results["metrics"]:
+        base = baseline_metrics.get(metric["name"])
+        base_value = f"{base['value']:.6g}" if base else "-"
+        lines.append(f"{metric['name']:<32} {metric['value']:>14.6g} {metric['unit']:<14} {base_value:>14}")
+    return "\n".join(lines)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark suite with baseline regression checks")
+    parser.add_argument('--full', action='store_true', help=f'Also benchmarks a graph of {FULL_GRAPH_SIZE} nodes')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of measurements per metric; the fastest one counts')
+    parser.add_argument('--runs', type=int, default=1, help='Number of runs of the suite; the median of every metric counts. '
+                                                             'Use several when saving a baseline')
+    parser.add_argument('--output', type=str, help='Path to write the JSON results to; defaults to stdout')
+    parser.add_argument('--baseline', type=str, default=DEFAULT_BASELINE_PATH, help='Path of the baseline results')
+    parser.add_argument('--threshold', type=float, default=0.3, help='Allowed regression against the baseline, as a fraction')
+    parser.add_argument('--save_baseline', action='store_true', help='Stores the results as the new baseline instead of comparing')
+    args = parser.parse_args()
+
+    sizes = GRAPH_SIZES + ((FULL_GRAPH_SIZE,) if args.full else ())
+    results = merge_runs([run_suite(sizes, args.repeat) for _ in range(max(1, args.runs))])
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+        return
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    print(format_results(results, baseline), file=sys.stderr)
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save_baseline to store one", file=sys.stderr)
+        return
+
+    regressions = compare_results(results, baseline, args.threshold)
+    differences = compare_environments(results, baseline)
+    if differences:
+        # Timings of another interpreter or machine are no evidence of a regression
+        print(f"WARNING the baseline was recorded elsewhere ({'; '.join(differences)}); regressions are not enforced. "
+              f"Run with --save_baseline here to gate on them.", file=sys.stderr)
+    for regression in regressions:
+        print(f"{'WARNING' if differences else 'REGRESSION'} {regression}", file=sys.stderr)
+    if regressions and not differences:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,17 @@
 from .entity import Entity
 from .entity_graph import EntityGraph
+from .entity_store import EntityStore
 from .entity_option import EntityOption, OptionTypes, EntityOptionListFlag
 from .entity_factory import EntityFactory
+from .factory_registry import FactoryRegistry
+from .entity_id import IdAllocator, get_id_allocator, get_stream_id, set_id_allocator
+from .entity_rng import get_entity_rng, get_entity_seed
+from .option_catalog import OptionCatalog, get_default_catalog
+from .option_index import OptionSamplingIndex
+from .catalog_cache import CatalogCache
+from .metrics import Metrics, StageStats, ProfileCapture, get_metrics, set_metrics, timed, METRIC_STAGES
+from .log_config import EntityEventSampler, get_entity_sampler, set_entity_sampler, log_entities, get_logging_settings, start_logging, LOGGING_DEFAULTS
+from .option_loader import load_options_file, load_option_records, iter_option_records, upsert_entity_option
 from .entity_tracker import EntityTracker, EntityTypes
 from .species import Species
 from .person import Person
@@ -9,3 +19,8 @@ from .location import Location
 from .organization import Organization
 from .gpe import GeoPoliticalEntity
 
+from .generation import generate_entities, generate_entity, generate_gpes, generate_world, stream_world, iter_entities, get_factory, get_registry, APPLICABLE_OPTION_TYPES
+from .generation import PERSON_OPTION_TYPES, LOCATION_OPTION_TYPES, ORGANIZATION_OPTION_TYPES, GPE_OPTION_TYPES
+from .scheduler import GenerationScheduler, EntityDependency, ENTITY_DEPENDENCIES
+from .entity_export import EntityWriter, get_entity_writer, get_entity_record, ENTITY_WRITER_FORMATS
+from .traversal import breadth_first_search, depth_first_search, shortest_path, k_hop_neighborhood, ego_network
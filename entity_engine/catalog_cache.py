@@ -0,0 +1,164 @@
+import gc, hashlib, logging, os, pickle
+from typing import Callable, Iterable
+
+from .entity_option import EntityOption
+from .option_catalog import OptionCatalog
+from .option_index import OptionSamplingIndex
+
+# Bump when the layout of the cache files changes in a way the module sources do not reveal
+CATALOG_CACHE_FORMAT: int = 1
+
+# Modules whose classes are pickled into, or whose logic produces, the cached catalogs
+CATALOG_CACHE_MODULES: tuple[str, ...] = ("entity_option.py", "option_catalog.py", "option_index.py", "option_loader.py")
+
+_code_version: str = None
+
+def get_code_version() -> str:
+    """
+    Returns the version of the code that compiles catalogs: a hash of the cache format and of
+    the sources of the modules involved, so editing any of them invalidates every cache file.
+
+    returns:
+        A hex digest.
+    """
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.blake2b(str(CATALOG_CACHE_FORMAT).encode(), digest_size=16)
+        package_dir = os.path.dirname(os.path.abspath(__file__))
+        for module in CATALOG_CACHE_MODULES:
+            with open(os.path.join(package_dir, module), 'rb') as file:
+                digest.update(file.read())
+        _code_version = digest.hexdigest()
+    return _code_version
+
+class CatalogCache:
+    def __init__(self, directory: str = "data/obj/") -> None:
+        """
+        Caches compiled options lists on disk: the parsed options, interned in catalog order,
+        together with the sampling index compiled from them. Entries are keyed by the content
+        hash of their sources plus the code version, and are read back with a single read and
+        unpickle, skipping the parsing and indexing of the sources.
+
+        args:
+            directory: The directory the cache files are kept in.
+        """
+        self.directory: str = directory
+
+    def get_key(self, sources: Iterable[str | bytes]) -> str:
+        """
+        Returns the cache key of the passed sources.
+
+        args:
+            sources: Paths of the files the options list is built from, or raw bytes standing in 
+                     for sources that are not files.
+
+        returns:
+            A hex digest of the code version and the contents of the sources.
+        """
+        digest = hashlib.blake2b(get_code_version().encode(), digest_size=16)
+        for source in sources:
+            if isinstance(source, bytes):
+                digest.update(source)
+            else:
+                with open(source, 'rb') as file:
+                    while chunk := file.read(1 << 20):
+                        digest.update(chunk)
+            # Separate the sources, so moving bytes from one to the next changes the key
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get_path(self, key: str) -> str:
+        """
+        Returns the path of the cache file for the passed key.
+
+        args:
+            key: The cache key.
+
+        returns:
+            The path of the cache file.
+        """
+        return os.path.join(self.directory, f"catalog_{key}.pkl")
+
+    def load(self, key: str, catalog: OptionCatalog = None) -> tuple[list[EntityOption], OptionSamplingIndex] | None:
+        """
+        Loads the options list and sampling index cached under the passed key, interning the 
+        options in the passed catalog.
+
+        args:
+            key: The cache key.
+            catalog: The OptionCatalog to intern the options in; defaults to the process-wide catalog.
+
+        returns:
+            A tuple of the options list and its sampling index, or None if there is no valid 
+            cache file for the key.
+        """
+        # Unpickling and interning allocate only long-lived objects, so cyclic garbage collection
+        # passes over the growing heap would find nothing to free and dominate the load time
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with open(self.get_path(key), 'rb') as file:
+                code_version, options_list, options, cum_weights = pickle.loads(file.read())
+            if code_version != get_code_version():
+                return None
+            return options_list, OptionSamplingIndex.from_compiled(options, cum_weights, catalog)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger = logging.getLogger(__name__)
+            logger.warning(f"Ignoring unreadable catalog cache {self.get_path(key)}: {e}")
+            return None
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def save(self, key: str, options_list: list[EntityOption], sampling_index: OptionSamplingIndex) -> None:
+        """
+        Caches an options list and its sampling index under the passed key. The file is written
+        to a temporary path and moved into place, so readers never see a partial file.
+
+        args:
+            key: The cache key.
+            options_list: The options list to cache.
+            sampling_index: The sampling index compiled from options_list.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.get_path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'wb') as file:
+                pickle.dump((get_code_version(), options_list, *sampling_index.get_compiled()), file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        finally:
+            # Only left behind if writing or moving it failed
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def get_options_list(self, sources: Iterable[str | bytes], build: Callable[[], list[EntityOption]], 
+                         catalog: OptionCatalog = None) -> tuple[list[EntityOption], OptionSamplingIndex]:
+        """
+        Returns the options list built from the passed sources, from the cache when it holds a
+        valid entry for them, and otherwise by calling build and caching its result.
+
+        args:
+            sources: Paths of the files the options list is built from, or raw bytes standing in 
+                     for sources that are not files.
+            build: Builds the options list from the sources on a cache miss.
+            catalog: The OptionCatalog to intern the options in; defaults to the process-wide catalog.
+
+        returns:
+            A tuple of the options list and its sampling index.
+        """
+        key = self.get_key(sources)
+        cached = self.load(key, catalog)
+        if cached is not None:
+            return cached
+
+        options_list = build()
+        sampling_index = OptionSamplingIndex(options_list, catalog)
+        try:
+            self.save(key, options_list, sampling_index)
+        except OSError as e:
+            logger = logging.getLogger(__name__)
+            logger.warning(f"Could not write catalog cache {self.get_path(key)}: {e}")
+        return options_list, sampling_index
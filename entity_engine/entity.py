@@ -1,7 +1,9 @@
-import uuid
-from dataclasses import dataclass, field
+import random
+from collections.abc import Mapping
+from dataclasses import dataclass, field, InitVar
 from enum import Enum
 
+from .entity_id import get_id_allocator
 from .entity_option import OptionTypes
 
 class RelationshipType(Enum):
@@ -31,20 +33,29 @@ class RelationshipType(Enum):
     SUBORDINATE = 23
     GUILDMATE = 24
 
-@dataclass(frozen=True, kw_only=True)
+@dataclass(frozen=True, kw_only=True, slots=True)
 class Entity():
-    id: uuid.UUID = field(default=None)
+    id: int = field(default=None)
     name: str = field(init=False)
     notes: str = field(default=None)
-    attributes: dict[OptionTypes, list[str]] = field(default_factory=dict)
-    applicable_option_types: dict[OptionTypes, tuple[int, int]] = field(default_factory=dict)
+    attributes: Mapping[OptionTypes, tuple[str, ...]] = field(default_factory=dict)
+    # Shared between entities: the factory passes the same mapping to every entity it creates
+    applicable_option_types: Mapping[OptionTypes, tuple[int, int]] = field(default_factory=dict)
+    _hash: int = field(default=None, init=False, repr=False, compare=False)
+    rng: InitVar[random.Random] = None
 
-    def __post_init__(self):
-        object.__setattr__(self, "id", uuid.uuid4())
+    def __post_init__(self, rng: random.Random = None):
+        if self.id is None:
+            # Seeded worlds pass the id of the entity's (stream, index) instead, see get_stream_id
+            object.__setattr__(self, "id", get_id_allocator().allocate())
+        # Hash on the id alone, which unlike names is stable across processes, so the cached value survives pickling.
+        # An integer id is usually its own hash, in which case the id object is stored rather than an equal copy
+        id_hash = hash(self.id)
+        object.__setattr__(self, "_hash", self.id if type(self.id) is int and id_hash == self.id else id_hash)
 
         if OptionTypes.NAME in self.attributes:
             object.__setattr__(self, "name", self.attributes[OptionTypes.NAME][0])
 
     def __hash__(self):
-        return hash((self.id, self.name)) 
+        return self._hash
 
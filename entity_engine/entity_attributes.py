@@ -0,0 +1,120 @@
+from array import array
+from collections.abc import Mapping
+from typing import Iterable
+
+from .entity_option import EntityOption, OptionTypes
+from .option_catalog import OptionCatalog, get_default_catalog
+
+class AttributeLayout:
+    __slots__ = ("option_types", "positions", "catalog")
+
+    def __init__(self, option_types: tuple[OptionTypes, ...], catalog: OptionCatalog = None) -> None:
+        """
+        The order of the option types in a set of EntityAttributes. A layout is shared by every
+        entity an EntityFactory creates, so the entities themselves only store their values.
+
+        args:
+            option_types: The option types, in the order the attributes should be listed in.
+            catalog: The OptionCatalog the option ids of the attributes refer to; defaults to 
+                     the process-wide catalog.
+        """
+        self.option_types: tuple[OptionTypes, ...] = option_types
+        self.positions: dict[OptionTypes, int] = {option_type: i for i, option_type in enumerate(option_types)}
+        self.catalog: OptionCatalog = catalog if catalog is not None else get_default_catalog()
+
+class EntityAttributes(Mapping):
+    __slots__ = ("_layout", "_values", "_counts")
+
+    def __init__(self, layout: AttributeLayout, values: Iterable[int], counts: list[int]) -> None:
+        """
+        A compact, read-only mapping of OptionTypes to the tuple of options an entity has of that
+        type. Rather than a dictionary of lists, the options of all types are held as one flat
+        buffer of 16-bit option ids from the layout's OptionCatalog, with the number of options 
+        per type alongside it; the ids are resolved back to EntityOption objects on access.
+
+        args:
+            layout: The shared layout giving the option types in order.
+            values: The option ids of every type as a sequence, concatenated in layout order.
+            counts: The number of options of each type, in layout order.
+        """
+        self._layout: AttributeLayout = layout
+        # A bytes object is a single allocation, where an array keeps its items in a second one
+        try:
+            self._values: bytes | array = array('H', values).tobytes()
+        except OverflowError:   # More than 65536 options in the catalog
+            self._values = array('I', values)
+        try:
+            self._counts: bytes | tuple[int, ...] = bytes(counts)
+        except ValueError:   # More than 255 options of a type
+            self._counts = tuple(counts)
+
+    @classmethod
+    def from_options(cls, layout: AttributeLayout, attributes: Mapping[OptionTypes, Iterable[EntityOption]]) -> "EntityAttributes":
+        """
+        Builds EntityAttributes from options, interning them in the layout's catalog.
+
+        args:
+            layout: The shared layout giving the option types in order; it must list the same 
+                    option types as attributes, in the same order.
+            attributes: The options per option type.
+
+        returns:
+            The EntityAttributes.
+        """
+        intern = layout.catalog.intern
+        values: list[int] = []
+        counts: list[int] = []
+        for options in attributes.values():
+            values.extend(intern(option) for option in options)
+            counts.append(len(options))
+        return cls(layout, values, counts)
+
+    def __getitem__(self, option_type: OptionTypes) -> tuple[EntityOption, ...]:
+        return self._layout.catalog.resolve_all(self.get_ids(option_type))
+
+    def get_ids(self, option_type: OptionTypes) -> array:
+        """
+        Returns the ids of the options of the passed type without resolving them.
+
+        args:
+            option_type: The OptionTypes to look up.
+
+        returns:
+            An array of option ids.
+        """
+        position = self._layout.positions[option_type]
+        start = sum(self._counts[:position])
+        return self.__get_values()[start:start + self._counts[position]]
+
+    def __get_values(self) -> array:
+        values = self._values
+        if isinstance(values, bytes):
+            ids = array('H')
+            ids.frombytes(values)
+            return ids
+        return values
+
+    def __eq__(self, other):
+        # Attributes sharing a catalog are compared by their option ids alone
+        if isinstance(other, EntityAttributes) and other._layout.catalog is self._layout.catalog:
+            return (self.__get_values() == other.__get_values() and self._layout.option_types == other._layout.option_types 
+                    and tuple(self._counts) == tuple(other._counts))
+        return Mapping.__eq__(self, other)
+
+    def __contains__(self, option_type: OptionTypes) -> bool:
+        return option_type in self._layout.positions
+
+    def __iter__(self):
+        return iter(self._layout.option_types)
+
+    def __len__(self) -> int:
+        return len(self._layout.option_types)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def __getstate__(self):
+        return (self._layout, self._values, self._counts)
+
+    def __setstate__(self, state):
+        self._layout, self._values, self._counts = state
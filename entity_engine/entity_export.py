@@ -0,0 +1,165 @@
+import csv, json
+from abc import ABC, abstractmethod
+from typing import TextIO
+
+from .entity import Entity
+from .entity_option import OptionTypes
+
+# The formats entities can be streamed in, by name
+ENTITY_WRITER_FORMATS: tuple[str, ...] = ("JSONL", "CSV", "MD")
+
+def get_entity_record(entity: Entity) -> dict:
+    """
+    Converts an entity into a plain record for exporting.
+
+    args:
+        entity: The entity to convert.
+
+    returns:
+        A dictionary with the id, type, and name of the entity, its age when it has one, and its
+        attributes (option type value -> list of option names).
+    """
+    name = getattr(entity, "name", None)
+    record = {"id": entity.id, "type": type(entity).__name__, "name": str(name) if name is not None else None}
+    age = getattr(entity, "age", None)
+    if age is not None:
+        record["age"] = age
+    record["attributes"] = {option_type.value: [option.name for option in options] for option_type, options in entity.attributes.items()}
+    return record
+
+class EntityWriter(ABC):
+    def __init__(self, file: TextIO) -> None:
+        """
+        Streams entities and the edges between them to a text file one record at a time, so
+        that exporting N entities needs no more memory than exporting one.
+
+        args:
+            file: The file to write to, e.g. sys.stdout or a buffered file opened for writing.
+        """
+        self.file: TextIO = file
+        self.entity_count: int = 0
+        self.edge_count: int = 0
+
+    def write_entity(self, entity: Entity) -> None:
+        """
+        Writes an entity.
+
+        args:
+            entity: The entity to write.
+        """
+        self._write_entity_record(get_entity_record(entity))
+        self.entity_count += 1
+
+    def write_edge(self, source: Entity, target: Entity) -> None:
+        """
+        Writes the edge between two entities.
+
+        args:
+            source: The entity the edge starts at.
+            target: The entity the edge ends at.
+        """
+        self._write_edge_record(source.id, target.id)
+        self.edge_count += 1
+
+    def write_entities(self, entities: list[Entity], edges: list[tuple[Entity, Entity]] = None) -> None:
+        """
+        Writes a chunk of entities followed by the edges between them.
+
+        args:
+            entities: The entities to write.
+            edges: Optional edges to write after the entities.
+        """
+        for entity in entities:
+            self.write_entity(entity)
+        for source, target in edges or ():
+            self.write_edge(source, target)
+
+    def flush(self) -> None:
+        self.file.flush()
+
+    @abstractmethod
+    def _write_entity_record(self, record: dict) -> None:
+        """
+        Writes the record of an entity in the format of the writer.
+
+        args:
+            record: The record of get_entity_record.
+        """
+
+    @abstractmethod
+    def _write_edge_record(self, source_id: int, target_id: int) -> None:
+        """
+        Writes an edge in the format of the writer.
+
+        args:
+            source_id: The id of the entity the edge starts at.
+            target_id: The id of the entity the edge ends at.
+        """
+
+class JsonLinesEntityWriter(EntityWriter):
+    """
+    Writes one JSON object per line; edges are objects with a "type" of "Edge".
+    """
+    def _write_entity_record(self, record: dict) -> None:
+        self.file.write(json.dumps(record))
+        self.file.write("\n")
+
+    def _write_edge_record(self, source_id: int, target_id: int) -> None:
+        self.file.write(json.dumps({"type": "Edge", "source": source_id, "target": target_id}))
+        self.file.write("\n")
+
+class CsvEntityWriter(EntityWriter):
+    """
+    Writes one row per entity or edge, with a column per option type holding the comma-separated
+    option names; edge rows have the type "Edge" and only their source and target filled in.
+    """
+    FIELDS: tuple[str, ...] = ("id", "type", "name", "age", "source", "target") + tuple(option_type.value for option_type in OptionTypes)
+
+    def __init__(self, file: TextIO) -> None:
+        super().__init__(file)
+        self.__writer = csv.writer(file)
+        self.__writer.writerow(self.FIELDS)
+
+    def _write_entity_record(self, record: dict) -> None:
+        attributes = record["attributes"]
+        self.__writer.writerow([record["id"], record["type"], record["name"], record.get("age"), None, None]
+                               + [",".join(attributes[option_type.value]) if option_type.value in attributes else None
+                                  for option_type in OptionTypes])
+
+    def _write_edge_record(self, source_id: int, target_id: int) -> None:
+        self.__writer.writerow([None, "Edge", None, None, source_id, target_id])
+
+class MarkdownEntityWriter(EntityWriter):
+    """
+    Writes a heading per entity (with its age, if any) followed by a bullet list of its 
+    attributes; edges are bullet points.
+    """
+    def _write_entity_record(self, record: dict) -> None:
+        heading = f"## {record['type']} {record['id']}: {record['name']}"
+        if "age" in record:
+            heading += f" (age {record['age']})"
+        lines = [heading, ""]
+        lines.extend(f"- **{option_type}**: {', '.join(names)}" for option_type, names in record["attributes"].items())
+        self.file.write("\n".join(lines) + "\n\n")
+
+    def _write_edge_record(self, source_id: int, target_id: int) -> None:
+        self.file.write(f"- **Edge**: {source_id} -- {target_id}\n")
+
+def get_entity_writer(file_format: str, file: TextIO) -> EntityWriter:
+    """
+    Returns a writer streaming entities to the passed file in the passed format.
+
+    args:
+        file_format: One of ENTITY_WRITER_FORMATS.
+        file: The file to write to.
+
+    returns:
+        The EntityWriter.
+
+    raises:
+        ValueError: If the format is not supported.
+    """
+    writers: dict[str, type[EntityWriter]] = {"JSONL": JsonLinesEntityWriter, "CSV": CsvEntityWriter, "MD": MarkdownEntityWriter}
+    if file_format not in writers:
+        raise ValueError(f"Unsupported entity output format: {file_format}")
+    return writers[file_format](file)
@@ -1,16 +1,34 @@
-import random
+import random, time
+from itertools import chain
 
 from .entity import Entity
+from .entity_attributes import AttributeLayout, EntityAttributes
 from .entity_option import EntityOption, OptionTypes
+from .metrics import get_metrics
+from .option_catalog import OptionCatalog, get_default_catalog
+from .option_index import OptionSamplingIndex
+from .optional_imports import get_numpy
+
+# The smallest unseeded batch create_random_entities samples with NumPy
+MIN_VECTORIZED_BATCH: int = 64
 
 class EntityFactory:
-    def __init__(self, entity_type: Entity | str, applicable_option_types: dict[OptionTypes, tuple[int, int]], options_list: list[EntityOption]) -> None:
+    def __init__(self, entity_type: Entity | str, applicable_option_types: dict[OptionTypes, tuple[int, int]], options_list: list[EntityOption], 
+                 compact: bool = True, catalog: OptionCatalog = None, sampling_index: OptionSamplingIndex = None) -> None:
         """
         Initializes the EntityFactory with the desired entity type.
 
         args:
             entity_type: The type of entity to create (e.g., Person, Location, 
                          Organization, GeoPoliticalEntity) or the name of the class as a string.
+            applicable_option_types: The (min, max) occurrences of each option type the entities are generated from.
+            options_list: A list of EntityOption objects to draw from.
+            compact: Whether to store the created entities' attributes as compact EntityAttributes 
+                     sharing one layout per factory, rather than as a dictionary of tuples.
+            catalog: The OptionCatalog assigning the option ids the attributes are stored as; 
+                     defaults to the process-wide catalog.
+            sampling_index: Optional sampling index already compiled from options_list (e.g. 
+                            loaded from a cache) to use instead of compiling a new one.
         """
         if isinstance(entity_type, str):
             try:
@@ -24,9 +42,12 @@ class EntityFactory:
             raise TypeError(f"{self.__entity_type} does not inherit from Entity.")
         
         self.__applicable_option_types = applicable_option_types
-        self.__options_list = options_list
+        self.__compact = compact
+        self.__catalog: OptionCatalog = catalog if catalog is not None else get_default_catalog()
+        self.__layouts: dict[tuple[OptionTypes, ...], AttributeLayout] = {}
+        self.set_options_list(options_list, sampling_index)
 
-    def create_random_entity(self, options: list[EntityOption]=None, **kwargs) -> Entity:
+    def create_random_entity(self, options: list[EntityOption]=None, rng: random.Random=None, **kwargs) -> Entity:
         """
         Creates a random instance of the specified entity type using parameters 
         obtained by randomly selecting appropriate categories of the option types passed in 
@@ -34,32 +55,28 @@ class EntityFactory:
 
         args:
             options: A list of EntityOption objects to use for randomization.
+            rng: The random number generator of the entity's own random stream, which is also 
+                 passed on to the entity constructor; defaults to the global random module.
             **kwargs: Additional keyword arguments to pass to the entity constructor.
 
         returns:
             An instance of the specified entity type.
         """
-        if not issubclass(self.__entity_type, Entity):
-            raise TypeError(f"{self.__entity_type} does not inherit from Entity.")
-        
-        entity_kwargs: dict[OptionTypes, list[EntityOption]]  = {}
+        metrics = get_metrics()
+        if metrics is not None:
+            start = time.perf_counter()
+        entity_kwargs: dict[OptionTypes, list[int]]  = {}
+        sampling_index = self.get_sampling_index()
+        randint = (rng or random).randint
  
-        # Handle EntityOptions
-        if options:
-            # Determine the number of values to select for each option type
-            option_counts: dict[OptionTypes, int] = {}
-            for option in options:
-                if option.type in self.__applicable_option_types:
-                    min_occurrences, max_occurrences = self.__applicable_option_types[option.type]
-                    option_counts[option.type] = random.randint(min_occurrences, max_occurrences)
+        # Determine the number of values to select for each option type
+        option_counts: dict[OptionTypes, int] = {}
+        for option_type, (min_occurrences, max_occurrences) in self.__get_occurrence_ranges(options).items():
+            option_counts[option_type] = randint(min_occurrences, max_occurrences)
         
         # If OptionType.AGE is in option_counts, randomly generate the age trait first 
         if OptionTypes.AGE in option_counts.keys():
-            option_type = OptionTypes.AGE
-            entity_kwargs[option_type] = []
-            selected_options = [opt for opt in self.__options_list if opt.type == option_type] 
-            selected_option = random.choices(selected_options, weights=[opt.weight for opt in selected_options], k=1)[0]
-            entity_kwargs[option_type].append(selected_option)
+            entity_kwargs[OptionTypes.AGE] = sampling_index.sample_ids(OptionTypes.AGE, k=1, rng=rng)
         
         # TODO: limit what else is generated based on that age
         # TODO: limit what else is generated based what is defined in mutually_exclusive (probably make this its own function)
@@ -68,18 +85,98 @@ class EntityFactory:
 
         # Select random values for each option type
         for option_type, count in option_counts.items():
-            selected_options = [opt for opt in self.__options_list if opt.type == option_type] 
             if option_type != OptionTypes.AGE:   # Don't process AGE a second time
-                entity_kwargs[option_type] = []  # Initialize an empty list for each option type
-                if selected_options:
-                    for _ in range(count):
-                        selected_option = random.choices(selected_options, weights=[opt.weight for opt in selected_options], k=1)[0]
-                        entity_kwargs[option_type].append(selected_option)
+                entity_kwargs[option_type] = sampling_index.sample_ids(option_type, k=count, rng=rng)
+
+        if metrics is not None:
+            sampled = time.perf_counter()
+            metrics.record("sample", self.__entity_type.__name__, sampled - start)
                 
         #Create the entity instance
-        entity = self.__entity_type(attributes=entity_kwargs, applicable_option_types=self.__applicable_option_types, **kwargs)
+        entity = self.__entity_type(attributes=self.__build_attributes(entity_kwargs), applicable_option_types=self.__applicable_option_types, 
+                                    rng=rng, **kwargs)
+
+        if metrics is not None:
+            metrics.record("construct", self.__entity_type.__name__, time.perf_counter() - sampled)
 
         return entity
+
+    def create_random_entities(self, n: int, options: list[EntityOption]=None, seed: int=None, **kwargs) -> list[Entity]:
+        """
+        Creates n random instances of the specified entity type. The occurrence counts and 
+        option picks for all n entities are sampled at once as NumPy arrays of option indices 
+        per option type before the entities are materialized, following the same distribution 
+        as create_random_entity. Falls back to calling create_random_entity n times when NumPy 
+        is not installed, or for unseeded batches smaller than MIN_VECTORIZED_BATCH. With a seed
+        the entity constructors draw from a random.Random derived from it as well, so the same 
+        seed creates the same batch, with the same ids if the IdAllocator of the world is in the
+        same state.
+
+        args:
+            n: The number of entities to create.
+            options: A list of EntityOption objects to use for randomization.
+            seed: Seed for the batch; drawn from the global random module if omitted.
+            **kwargs: Additional keyword arguments to pass to every entity constructor.
+
+        returns:
+            A list of n instances of the specified entity type.
+        """
+        if n <= 0:
+            return []
+        # Small unseeded batches are not worth importing NumPy and setting up its arrays for, and 
+        # NumPy is optional; without it batches fall back to the single-entity path
+        np = get_numpy() if seed is not None or n >= MIN_VECTORIZED_BATCH else None
+        if np is None:
+            entity_rng = random.Random(seed) if seed is not None else None
+            return [self.create_random_entity(options, rng=entity_rng, **kwargs) for _ in range(n)]
+
+        metrics = get_metrics()
+        if metrics is not None:
+            start = time.perf_counter()
+        rng = np.random.default_rng(seed if seed is not None else random.getrandbits(64))
+        # What the constructors draw themselves (e.g. ages) comes from the seeded generator too
+        entity_rng = random.Random(int(rng.integers(1 << 63))) if seed is not None else None
+        sampling_index = self.get_sampling_index()
+
+        # Sample the picks of every entity for each option type as one flat array, 
+        # with offsets marking where each entity's slice begins and ends
+        option_picks: dict[OptionTypes, tuple[list[int], list[int]]] = {}
+        for option_type, (min_occurrences, max_occurrences) in self.__get_occurrence_ranges(options).items():
+            if option_type == OptionTypes.AGE:   # AGE is always a single trait
+                counts = np.ones(n, dtype=np.int64)
+            else:
+                counts = rng.integers(min_occurrences, max_occurrences, size=n, endpoint=True)
+            offsets = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(counts, out=offsets[1:])
+
+            option_ids = np.asarray(sampling_index.get_ids(option_type), dtype=np.int64)
+            if not len(option_ids):
+                # A type only the passed options have gets no picks, as in create_random_entity
+                option_picks[option_type] = ([], [0] * (n + 1))
+                continue
+            cum_weights = np.asarray(sampling_index.get_cum_weights(option_type), dtype=np.float64)
+            if cum_weights[-1] <= 0:
+                raise ValueError("Total of weights must be greater than zero")
+            draws = rng.random(int(offsets[-1])) * cum_weights[-1]
+            indices = np.minimum(np.searchsorted(cum_weights, draws, side="right"), len(option_ids) - 1)
+            option_picks[option_type] = (option_ids[indices].tolist(), offsets.tolist())
+
+        if metrics is not None:
+            sampled = time.perf_counter()
+            metrics.record("sample", self.__entity_type.__name__, sampled - start, n)
+
+        # Materialize the entities from their slices of the sampled picks
+        entities: list[Entity] = []
+        for i in range(n):
+            entity_kwargs: dict[OptionTypes, list[int]] = {
+                option_type: picks[offsets[i]:offsets[i + 1]] for option_type, (picks, offsets) in option_picks.items()
+            }
+            entities.append(self.__entity_type(attributes=self.__build_attributes(entity_kwargs), 
+                                               applicable_option_types=self.__applicable_option_types, rng=entity_rng, **kwargs))
+
+        if metrics is not None:
+            metrics.record("construct", self.__entity_type.__name__, time.perf_counter() - sampled, n)
+        return entities
     
     def get_entity_type(self):
         """
@@ -106,4 +203,78 @@ class EntityFactory:
         returns:
             The options_list member variable.
         """
-        return self.__options_list   
+        return self.__options_list
+
+    def set_options_list(self, options_list: list[EntityOption], sampling_index: OptionSamplingIndex = None) -> None:
+        """
+        Replaces the options list for the EntityFactory and recompiles its sampling index, 
+        unless a sampling index compiled from the same options into the same catalog is passed.
+
+        args:
+            options_list: A list of EntityOption objects to draw from.
+            sampling_index: Optional sampling index already compiled from options_list.
+        """
+        self.__options_list = options_list
+        if sampling_index is not None and sampling_index.catalog is self.__catalog and len(sampling_index) == len(options_list):
+            self.__sampling_index = sampling_index
+        else:
+            self.__sampling_index = OptionSamplingIndex(options_list, self.__catalog)
+
+    def refresh_sampling_index(self) -> None:
+        """
+        Recompiles the sampling index from the current options list. Call this after 
+        modifying the options list (or the weights of its options) in place.
+        """
+        self.__sampling_index.build(self.__options_list)
+
+    def __build_attributes(self, entity_kwargs: dict[OptionTypes, list[int]]) -> EntityAttributes | dict[OptionTypes, tuple[EntityOption, ...]]:
+        """
+        Packs the selected options of an entity into its attributes.
+
+        args:
+            entity_kwargs: The catalog ids of the selected options per option type.
+
+        returns:
+            EntityAttributes in compact mode, otherwise a dictionary of OptionTypes to tuples of options.
+        """
+        if not self.__compact:
+            return self.__catalog.decode(entity_kwargs)
+
+        option_types = tuple(entity_kwargs)
+        layout = self.__layouts.get(option_types)
+        if layout is None:
+            layout = self.__layouts[option_types] = AttributeLayout(option_types, self.__catalog)
+        values = list(chain.from_iterable(entity_kwargs.values()))
+        return EntityAttributes(layout, values, [len(selected_ids) for selected_ids in entity_kwargs.values()])
+
+    def __get_occurrence_ranges(self, options: list[EntityOption]) -> dict[OptionTypes, tuple[int, int]]:
+        """
+        Returns the (min, max) occurrences of each applicable option type that has options in 
+        the passed options list.
+
+        args:
+            options: A list of EntityOption objects to use for randomization.
+
+        returns:
+            A dictionary of OptionTypes to (min, max) occurrence tuples.
+        """
+        if not options:
+            return {}
+        if options is self.__options_list:
+            option_types = self.get_sampling_index().get_option_types()
+        else:
+            option_types = {option.type for option in options}
+        return {option_type: occurrences for option_type, occurrences in self.__applicable_option_types.items() 
+                if option_type in option_types}
+
+    def get_sampling_index(self) -> OptionSamplingIndex:
+        """
+        Returns the compiled sampling index for the options list, rebuilding it first 
+        if options have been added to or removed from the list since it was compiled.
+
+        returns:
+            The sampling_index member variable.
+        """
+        if len(self.__sampling_index) != len(self.__options_list):
+            self.refresh_sampling_index()
+        return self.__sampling_index
@@ -1,13 +1,42 @@
+import time
+from collections.abc import Mapping
+from typing import Iterable, Iterator
+
 from .graph import Graph
 from .entity import Entity
+from .entity_id import STREAM_ID_BITS, IdAllocator, get_id_allocator
+from .entity_option import OptionTypes
+from .entity_store import EntityStore
+from .metrics import get_metrics
 from .entity_tracker import EntityTypes
 
 class EntityGraph(Graph):
 
-    def __init__(self) -> None:
+    def __init__(self, index_attributes: bool = False, store: EntityStore = None) -> None:
+        """
+        Initializes an empty EntityGraph.
+
+        With a store the graph sits on top of a columnar EntityStore: every entity is kept in the 
+        store, and only the entities that take part in relationships are materialized as nodes of 
+        the graph. Counts, lookups, iteration, and attribute filters then run over the store.
+
+        args:
+            index_attributes: Whether to maintain the inverted attribute index used by 
+                              find_by_attributes; it can also be enabled later.
+            store: Optional EntityStore to keep the entities in.
+        """
         super().__init__()
-        self.graph: dict[Entity: list] = {}
+        self.graph: dict[Entity: dict[Entity: None]] = {}
         self.metadata: dict[tuple[Entity, Entity]: dict] = {}
+        self.metadata_keys: dict[Entity: dict[tuple[Entity, Entity]: None]] = {}
+        self.id_index: dict[int: Entity] = {}
+        # Membership of each concrete entity class, kept as insertion-ordered sets
+        self.type_index: dict[type[Entity]: dict[Entity: None]] = {}
+        # Inverted index of (option type, option name) -> entities, or None when disabled
+        self.attribute_index: dict[tuple[OptionTypes, str]: dict[Entity: None]] = None
+        self.store: EntityStore = store
+        if index_attributes:
+            self.enable_attribute_index()
     
     def add(self, node: Entity) -> Entity:
         if not isinstance(node, Entity):
@@ -21,17 +50,84 @@ class EntityGraph(Graph):
         self.add_pair(node1, node2, metadata1, metadata2)
 
     def add_node(self, node: Entity) -> Entity:
+        metrics = get_metrics()
+        if metrics is None:
+            return self.__add_node(node)
+        start = time.perf_counter()
+        node = self.__add_node(node)
+        metrics.record("graph_insert", type(node).__name__, time.perf_counter() - start)
+        return node
+
+    def __add_node(self, node: Entity) -> Entity:
         if not isinstance(node, Entity):
             raise TypeError("Node must be an instance of Entity")
         
-        existing_node = self.get_node_by_identifier(node)
+        existing_node = self.id_index.get(node.id)
         if existing_node:
             return existing_node  # Return the existing node
 
-        self.graph[node] = []
+        if self.store is not None:
+            self.store.append(node)
+        self.graph[node] = {}
+        self.__index_node(node)
 
         return node
 
+    def add_nodes(self, nodes: list[Entity]) -> None:
+        """
+        Adds newly created entities to the graph in bulk, skipping the per-node identifier 
+        lookup of add_node. With a store the entities are only appended to the store; they are 
+        materialized as nodes once they take part in an edge.
+
+        args:
+            nodes: A list of entities that are not yet in the graph.
+        """
+        metrics = get_metrics()
+        if metrics is not None and nodes:
+            start = time.perf_counter()
+            self.__add_nodes(nodes)
+            metrics.record("graph_insert", type(nodes[0]).__name__, time.perf_counter() - start, len(nodes))
+        else:
+            self.__add_nodes(nodes)
+
+    def __add_nodes(self, nodes: list[Entity]) -> None:
+        if self.store is not None:
+            for node in nodes:
+                if not isinstance(node, Entity):
+                    raise TypeError("Node must be an instance of Entity")
+            self.store.extend(nodes)
+            return
+
+        for node in nodes:
+            if not isinstance(node, Entity):
+                raise TypeError("Node must be an instance of Entity")
+            if node.id not in self.id_index:
+                self.graph[node] = {}
+                self.__index_node(node)
+
+    def add_edges(self, edges: list[tuple[Entity, Entity]]) -> None:
+        """
+        Adds undirected edges between entities that are already in the graph in bulk.
+
+        args:
+            edges: A list of (node1, node2) entity pairs.
+        """
+        metrics = get_metrics()
+        if metrics is not None and edges:
+            start = time.perf_counter()
+            self.__add_edges(edges)
+            metrics.record("graph_insert", "Edge", time.perf_counter() - start, len(edges))
+        else:
+            self.__add_edges(edges)
+
+    def __add_edges(self, edges: list[tuple[Entity, Entity]]) -> None:
+        if self.store is not None:
+            edges = [(self.__add_node(node1), self.__add_node(node2)) for node1, node2 in edges]
+
+        for node1, node2 in edges:
+            self.graph[node1][node2] = None
+            self.graph[node2][node1] = None
+
     def add_edge(self, node1: Entity, node2: Entity) -> None:
         if not isinstance(node1, Entity) or not isinstance(node2, Entity):
             raise TypeError("Both nodes must be instances of Entity")
@@ -44,32 +140,19 @@ class EntityGraph(Graph):
         if not isinstance(node1, Entity) or not isinstance(node2, Entity):
             raise TypeError("Both nodes must be instances of Entity")
         
-        if metadata is not None:
-            if (node1, node2) not in self.metadata:
-                self.metadata[(node1, node2)] = metadata
-            else:
-                self.metadata[(node1, node2)].update(metadata)
+        super().add_metadata(node1, node2, metadata)
 
     def add_metadata2(self, node1: Entity, node2: Entity, metadata1: dict = None, metadata2: dict = None) -> None:
         if not isinstance(node1, Entity) or not isinstance(node2, Entity):
             raise TypeError("Both nodes must be instances of Entity")
         
-        if metadata1 is not None:
-            if (node1, node2) not in self.metadata:
-                self.add_metadata(node1, node2, metadata1)
-        if metadata2 is not None:
-            if (node2, node1) not in self.metadata:
-                self.add_metadata(node2, node1, metadata2)
+        super().add_metadata2(node1, node2, metadata1, metadata2)
 
     def add_metadata_reciprocal(self, node1: Entity, node2: Entity, metadata: dict) -> None:
         if not isinstance(node1, Entity) or not isinstance(node2, Entity):
             raise TypeError("Both nodes must be instances of Entity")
         
-        if metadata is not None:
-            if (node1, node2) not in self.metadata:
-                self.metadata[(node1, node2)] = metadata
-            if (node2, node1) not in self.metadata:
-                self.metadata[(node2, node2)] = metadata
+        super().add_metadata_reciprocal(node1, node2, metadata)
 
     def add_pair(self, node1: Entity, node2: Entity, metadata1: dict = None, metadata2: dict = None) -> None:
         if not isinstance(node1, Entity) or not isinstance(node2, Entity):
@@ -101,19 +184,40 @@ class EntityGraph(Graph):
             self.add_metadata_reciprocal(node1, node2, metadata)
 
     def count(self, type: EntityTypes = None) -> int:
+        if self.store is not None:
+            return self.store.count(type)
         if type:
-            count:int = 0
-            for node in self.graph.keys():
-                if isinstance(node, type.value):
-                    count += 1
-            return count
+            return sum(len(nodes) for entity_class, nodes in self.type_index.items() if issubclass(entity_class, type.value))
         else:
             return len(self.graph)
 
+    def iter_type(self, type: EntityTypes = None) -> Iterator[Entity]:
+        """
+        Iterates over the entities in the graph that are instances of the passed entity type, 
+        touching only the matching nodes. With a store the entities are materialized one at a 
+        time, in the order they were stored.
+
+        args:
+            type: The EntityTypes member to iterate over; defaults to every entity.
+
+        returns:
+            An iterator of the matching entities, grouped by their concrete class.
+        """
+        if self.store is not None:
+            for row in self.store.iter_rows(type):
+                yield self.__get_store_entity(row)
+            return
+
+        for entity_class, nodes in list(self.type_index.items()):
+            if type is None or issubclass(entity_class, type.value):
+                yield from nodes
+
     def exists(self, node: Entity) -> bool:
         if not isinstance(node, Entity):
             raise TypeError("Node must be an instance of Entity")
         
+        if self.store is not None:
+            return node.id in self.id_index or node.id in self.store
         return self.get_node_by_identifier(node) is not None
 
     def edge_exists(self, node1: Entity, node2: Entity) -> bool:
@@ -130,13 +234,35 @@ class EntityGraph(Graph):
         
         return self.graph[node]
     
+    def get_by_id(self, id: int) -> Entity:
+        """
+        Returns the entity in the graph with the passed id in O(1).
+
+        args:
+            id: The id of the entity to look up.
+
+        returns:
+            The entity with that id, or None if the graph has no such entity.
+        """
+        existing_node = self.id_index.get(id)
+        if existing_node is None and self.store is not None:
+            return self.store.get_by_id(id)
+        return existing_node
+
+    def reserve_ids(self, allocator: IdAllocator = None) -> None:
+        """
+        Moves an id allocator past every id in the graph, so entities created after loading a 
+        saved graph cannot reuse its ids.
+
+        args:
+            allocator: The IdAllocator to advance; defaults to the allocator of the current world.
+        """
+        allocator = allocator or get_id_allocator()
+        ids = (self.store.get_id(row) for row in self.store.iter_rows()) if self.store is not None else self.id_index
+        allocator.observe(max((id for id in ids if isinstance(id, int) and id < 1 << STREAM_ID_BITS), default=0))
+
     def get_node_by_identifier(self, node:Entity) -> Entity:
-        for existing_node in self.graph.keys():
-            # Assuming 'name' is the identifier
-            # #TODO: why does the name comparison not work for org, it should indeed have a name at this point? and why is it using the eq method of EntityOption
-            if existing_node.id == node.id:  
-                return existing_node
-        return None
+        return self.get_by_id(node.id)
     
     def get_adjacent_nodes(self, node: Entity) -> list:
         if not isinstance(node, Entity):
@@ -148,37 +274,113 @@ class EntityGraph(Graph):
         if not isinstance(node, Entity):
             raise TypeError("Node must be an instance of Entity")
         
-        metadata = []
-        for key, value in self.metadata.items():
-            if node in key:
-                metadata.append((key, value))
-        return metadata
+        return super().get_metadata(node)
     
+    def enable_attribute_index(self) -> None:
+        """
+        Builds the inverted attribute index from the entities already in the graph; from then on 
+        it is maintained incrementally as entities are added and removed.
+        """
+        self.attribute_index = {}
+        for node in self.graph:
+            self.__index_attributes(node)
+
+    def disable_attribute_index(self) -> None:
+        """
+        Drops the inverted attribute index.
+        """
+        self.attribute_index = None
+
+    def find_by_attributes(self, criteria: dict[OptionTypes, str | Iterable[str]], type: EntityTypes = None) -> list[Entity]:
+        """
+        Finds the entities that have every one of the passed attribute options, e.g. 
+        {OptionTypes.PROFESSION: "Blacksmith", OptionTypes.RACE: "Dwarf"}. With the attribute 
+        index enabled the posting lists of the criteria are intersected, starting from the 
+        smallest; otherwise every entity's attributes are scanned.
+
+        args:
+            criteria: The option names an entity must have per option type; pass several names 
+                      for a type to require all of them.
+            type: Optional EntityTypes member to restrict the results to.
+
+        returns:
+            A list of the matching entities.
+        """
+        if self.store is not None:
+            return [self.__get_store_entity(row) for row in self.store.find_rows(criteria, type)]
+
+        keys: list[tuple[OptionTypes, str]] = []
+        for option_type, names in criteria.items():
+            for name in ([names] if isinstance(names, str) else names):
+                keys.append((option_type, name))
+
+        if self.attribute_index is None:
+            candidates = self.iter_type(type) if type else self.graph
+            matches: list[Entity] = []
+            for node in candidates:
+                keys_of_node = self.__get_attribute_keys(node)
+                if all(key in keys_of_node for key in keys):
+                    matches.append(node)
+            return matches
+
+        if not keys:
+            return list(self.iter_type(type) if type else self.graph)
+
+        postings = sorted((self.attribute_index.get(key, {}) for key in keys), key=len)
+        smallest, others = postings[0], postings[1:]
+        return [node for node in smallest 
+                if all(node in posting for posting in others) and (type is None or isinstance(node, type.value))]
+
+    def __get_store_entity(self, row: int) -> Entity:
+        # Prefer the node already materialized in the graph so identity is preserved
+        existing_node = self.id_index.get(self.store.get_id(row))
+        return existing_node if existing_node is not None else self.store.get(row)
+
+    def __index_node(self, node: Entity) -> None:
+        self.id_index[node.id] = node
+        self.type_index.setdefault(type(node), {})[node] = None
+        if self.attribute_index is not None:
+            self.__index_attributes(node)
+
+    def __unindex_node(self, node: Entity) -> None:
+        del self.id_index[node.id]
+        self.type_index[type(node)].pop(node, None)
+        if self.attribute_index is not None:
+            for key in self.__get_attribute_keys(node):
+                posting = self.attribute_index.get(key)
+                if posting is not None:
+                    posting.pop(node, None)
+                    if not posting:
+                        del self.attribute_index[key]
+
+    def __index_attributes(self, node: Entity) -> None:
+        for key in self.__get_attribute_keys(node):
+            self.attribute_index.setdefault(key, {})[node] = None
+
+    def __get_attribute_keys(self, node: Entity) -> set[tuple[OptionTypes, str]]:
+        # Only option-typed attributes are indexed; some entity types reuse `attributes` for other flags
+        keys: set[tuple[OptionTypes, str]] = set()
+        if isinstance(node.attributes, Mapping):
+            for option_type, options in node.attributes.items():
+                if isinstance(option_type, OptionTypes):
+                    for option in options:
+                        keys.add((option_type, getattr(option, "name", option)))
+        return keys
+
     def remove(self, node: Entity) -> None:
         if not isinstance(node, Entity):
             raise TypeError("Node must be an instance of Entity")
         
-        if self.exists(node):
-            del self.graph[node]
-        for key, value in self.graph.items():
-            if node in value:
-                value.remove(node)
-        for key, value in self.metadata.items():
-            if node in key:
-                del self.metadata[key]
+        if self.store is not None:
+            self.store.remove(node.id)
+
+        existing_node = self.id_index.get(node.id)
+        if existing_node is not None:
+            self.__unindex_node(existing_node)
+            super().remove(existing_node)
 
     def remove_edge(self, node1: Entity, node2: Entity) -> None:
         if not isinstance(node1, Entity) or not isinstance(node2, Entity):
             raise TypeError("Both nodes must be instances of Entity")
         
-        if self.exists(node1):
-            self.graph[node1].remove(node2)
-        if self.exists(node2):
-            self.graph[node2].remove(node1)
-        for key in self.metadata.items():
-            if node1 in key:
-                del self.metadata[key]
-            if node2 in key:
-                del self.metadata[key]
-
-    
\ No newline at end of file
+        super().remove_edge(node1, node2)
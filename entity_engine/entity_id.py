@@ -0,0 +1,126 @@
+import hashlib, uuid
+
+# Ids of the entities of a seeded world are (stream, index) pairs packed as the stream's code above
+# STREAM_ID_BITS bits of index, so they do not depend on the order or the process entities are
+# generated in. Code 0 is the counter of the IdAllocator, so its ids never collide with them.
+STREAM_ID_BITS: int = 56
+STREAM_CODES: dict[str, int] = {
+    "Person": 1,
+    "Location": 2,
+    "Organization": 3,
+    "GeoPoliticalEntity": 4,
+    "Species": 5,
+    "Structure": 6,
+    # The location and organization a GeoPoliticalEntity is generated with by generate_world
+    "GeoPoliticalEntity.Location": 7,
+    "GeoPoliticalEntity.Organization": 8
+}
+
+def get_stream_id(stream: str, index: int) -> int:
+    """
+    Returns the id of the entity at an index of a random stream of a seeded world.
+
+    args:
+        stream: The name of the stream, one of STREAM_CODES, e.g. "Person".
+        index: The index of the entity within the stream.
+
+    returns:
+        A 63-bit integer id.
+
+    raises:
+        ValueError: If the stream has no code or the index does not fit in STREAM_ID_BITS bits.
+    """
+    code = STREAM_CODES.get(stream)
+    if code is None:
+        raise ValueError(f"No id stream named {stream}")
+    if not 0 <= index < 1 << STREAM_ID_BITS:
+        raise ValueError(f"Index {index} of stream {stream} is out of range")
+    return code << STREAM_ID_BITS | index
+
+class IdAllocator:
+    __slots__ = ("next_id", "seed")
+
+    def __init__(self, start: int = 1, seed: int = None) -> None:
+        """
+        Allocates entity ids from a monotonic 64-bit counter, which is far cheaper than uuid4
+        and makes the ids of a world reproducible: regenerating the same entities in the same
+        order yields the same ids.
+
+        args:
+            start: The first id to allocate.
+            seed: The seed of the world, used for the deterministic UUID view of the ids.
+        """
+        self.next_id: int = start
+        self.seed: int = seed
+
+    def allocate(self) -> int:
+        """
+        Allocates the next id.
+
+        returns:
+            The id.
+        """
+        id = self.next_id
+        self.next_id = id + 1
+        return id
+
+    def reserve(self, count: int) -> int:
+        """
+        Reserves a block of consecutive ids, e.g. for a worker process to allocate from.
+
+        args:
+            count: The number of ids to reserve.
+
+        returns:
+            The first id of the block.
+        """
+        start = self.next_id
+        self.next_id = start + count
+        return start
+
+    def observe(self, id: int) -> None:
+        """
+        Moves the counter past an id that is already in use, e.g. by an entity loaded from a file.
+
+        args:
+            id: The id in use; ids that are not integers, and ids of seeded streams (see 
+                get_stream_id), are ignored.
+        """
+        if isinstance(id, int) and self.next_id <= id < 1 << STREAM_ID_BITS:
+            self.next_id = id + 1
+
+    def to_uuid(self, id: int) -> uuid.UUID:
+        """
+        Returns a UUID view of an id, derived deterministically from the world seed and the id.
+
+        args:
+            id: The id to convert.
+
+        returns:
+            A version 4 UUID.
+        """
+        digest = hashlib.blake2b(f"{self.seed}:{id}".encode(), digest_size=16).digest()
+        return uuid.UUID(bytes=digest, version=4)
+
+# The allocator entities draw their ids from unless they are given one
+_id_allocator: IdAllocator = IdAllocator()
+
+def get_id_allocator() -> IdAllocator:
+    """
+    Returns the IdAllocator of the current world.
+
+    returns:
+        The IdAllocator.
+    """
+    return _id_allocator
+
+def set_id_allocator(allocator: IdAllocator) -> None:
+    """
+    Replaces the IdAllocator of the current world, e.g. when starting a new world or inside a
+    worker process that was given a block of ids to allocate from.
+
+    args:
+        allocator: The IdAllocator to use from now on.
+    """
+    global _id_allocator
+    _id_allocator = allocator
@@ -23,6 +23,10 @@ class OptionTypes(Enum):
     TERRAIN = "Terrain"
     TYPE = "Type"
     UNIQUE = "Unique Trait"
+
+    # Members are singletons compared by identity, so the C-level identity hash is consistent with 
+    # equality and spares the Python-level Enum.__hash__ call on every (type, name) dictionary lookup
+    __hash__ = object.__hash__
     
 class EntityOptionListFlag(Enum):
     ADD = "add"
@@ -40,6 +44,8 @@ class EntityOption:
     mutually_exclusive: list[Self] = field(default_factory=list)
     requirements: list[str] = field(default_factory=list)
     specilizations: list[Self] = field(default_factory=list)
+    # The id assigned by the OptionCatalog the option was last interned in
+    id: int = field(default=None, repr=False)
 
     def __post_init__(self):
         if self.min and self.max:
@@ -51,10 +57,13 @@ class EntityOption:
             raise ValueError(f"Weight cannot be greater than 100: {self.weight}")
         
     def __eq__(self, other: Self):
-        return self.name == other.name and self.type == other.type
+        if self is other:
+            return True
+        return self.name == other.name and self.type is other.type
 
     def __hash__(self):
-        return hash((self.name, self.type))
+        # Equal options share a name, and the hash of a str is cached on the str itself
+        return hash(self.name)
     
     def __str__(self):
         return f"{self.name}"
@@ -75,5 +84,5 @@ class EntityOption:
         return self.weight >= other.weight
     
     def __ne__(self, other: Self):    
-        return self.name != other.name or self.type != other.type
+        return not self.__eq__(other)
     
\ No newline at end of file
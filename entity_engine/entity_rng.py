@@ -0,0 +1,33 @@
+import hashlib, random
+
+def get_entity_seed(world_seed: int, stream: str, index: int) -> int:
+    """
+    Derives the seed of an entity's random stream from the world seed, the name of the stream 
+    (usually the entity class name), and the entity's index within that stream. The derivation 
+    is counter-based, so any entity's stream can be recreated in O(1) regardless of the order 
+    entities are generated in.
+
+    args:
+        world_seed: The seed of the world the entity belongs to.
+        stream: The name of the stream, e.g. "Person".
+        index: The index of the entity within the stream.
+
+    returns:
+        A 64-bit integer seed.
+    """
+    digest = hashlib.blake2b(f"{world_seed}:{stream}:{index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+def get_entity_rng(world_seed: int, stream: str, index: int) -> random.Random:
+    """
+    Returns a random number generator seeded for an entity's own random stream.
+
+    args:
+        world_seed: The seed of the world the entity belongs to.
+        stream: The name of the stream, e.g. "Person".
+        index: The index of the entity within the stream.
+
+    returns:
+        A random.Random instance.
+    """
+    return random.Random(get_entity_seed(world_seed, stream, index))
@@ -0,0 +1,392 @@
+from array import array
+from collections.abc import Mapping
+from typing import Iterable, Iterator
+
+from .entity import Entity
+from .entity_attributes import AttributeLayout, EntityAttributes
+from .entity_option import EntityOption, OptionTypes
+from .optional_imports import get_numpy
+from .option_catalog import OptionCatalog, get_default_catalog
+from .entity_tracker import EntityTypes
+from .gpe import GeoPoliticalEntity
+
+_NO_AGE = -1
+_NO_ROW = -1
+
+class EntityStore:
+    def __init__(self, catalog: OptionCatalog = None) -> None:
+        """
+        A columnar (struct-of-arrays) store of entities for million-scale worlds. Instead of one
+        Python object per entity, each row is spread over compact typed arrays: the id, a code for
+        the entity class, a code for the layout of its option types, and per OptionTypes an offsets
+        array into an array of option ids. Entities are only materialized as objects on access.
+
+        Stored per entity: its class, id, notes, attributes, age (for Species and Person), and the
+        location and organization of a GeoPoliticalEntity (stored as rows of their own).
+
+        args:
+            catalog: The OptionCatalog assigning the option ids the attributes are stored as; 
+                     defaults to the process-wide catalog.
+        """
+        self.catalog: OptionCatalog = catalog if catalog is not None else get_default_catalog()
+
+        # Entity classes and the applicable option types shared by the entities of each class
+        self.__classes: list[type[Entity]] = []
+        self.__class_codes: dict[type[Entity], int] = {}
+        self.__class_option_types: list[Mapping[OptionTypes, tuple[int, int]]] = []
+        self.__class_counts: list[int] = []
+
+        # Option types present on an entity, in order, shared between rows
+        self.__layouts: list[AttributeLayout] = []
+        self.__layout_codes: dict[tuple[OptionTypes, ...], int] = {}
+
+        # Row columns
+        self.__type_codes = array('B')
+        self.__ids = array('Q')
+        self.__row_layouts = array('H')
+        self.__ages = array('q')
+        self.__deleted = bytearray()
+        self.__offsets: dict[OptionTypes, array] = {}
+        self.__values: dict[OptionTypes, array] = {}
+        self.__references: dict[str, array] = {}
+        self.__notes: dict[int, str] = {}
+
+        # Lazily built id -> row index
+        self.__row_index: dict[int, int] = None
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __contains__(self, id: int) -> bool:
+        return self.get_row(id) is not None
+
+    def __getitem__(self, row: int) -> Entity:
+        return self.get(row)
+
+    def append(self, entity: Entity) -> int:
+        """
+        Appends an entity to the store, unless an entity with the same id is already stored.
+
+        args:
+            entity: The entity to store.
+
+        returns:
+            The row of the entity.
+
+        raises:
+            TypeError: If the entity has attributes that are not EntityOption values keyed by OptionTypes.
+            ValueError: If the id, age, class, or attribute layout of the entity does not fit its column.
+        """
+        existing_row = self.get_row(entity.id)
+        if existing_row is not None:
+            return existing_row
+
+        # Store the related entities of a GeoPoliticalEntity first so the references can point at their rows
+        references: dict[str, int] = {}
+        if isinstance(entity, GeoPoliticalEntity):
+            references["location"] = self.append(entity.location) if entity.location is not None else _NO_ROW
+            references["organization"] = self.append(entity.organization) if entity.organization is not None else _NO_ROW
+
+        row = len(self.__type_codes)
+        attributes = entity.attributes or {}
+        option_ids: dict[OptionTypes, list[int]] = {}
+        for option_type in attributes:
+            if not isinstance(option_type, OptionTypes):
+                raise TypeError(f"{type(entity).__name__} attributes keyed by {option_type!r} cannot be stored")
+            option_ids[option_type] = self.__get_option_ids(attributes, option_type)
+        layout_code = self.__get_layout_code(tuple(attributes))
+
+        class_code = self.__get_class_code(entity)
+        age = getattr(entity, "age", None)
+        age = age if age is not None else _NO_AGE
+        # Check that every value fits its column before appending to any of them, so an entity 
+        # that cannot be stored does not leave the columns with different lengths
+        for column, value in ((self.__type_codes, class_code), (self.__ids, entity.id), (self.__row_layouts, layout_code), (self.__ages, age)):
+            try:
+                array(column.typecode, (value,))
+            except (OverflowError, TypeError) as e:
+                raise ValueError(f"{type(entity).__name__} {entity.id} cannot be stored: {e}")
+
+        self.__type_codes.append(class_code)
+        self.__ids.append(entity.id)
+        self.__row_layouts.append(layout_code)
+        self.__ages.append(age)
+        self.__deleted.append(0)
+        for option_type, offsets in self.__offsets.items():
+            values = self.__values[option_type]
+            values.extend(option_ids.get(option_type, ()))
+            offsets.append(len(values))
+        for name, rows in self.__references.items():
+            rows.append(references.get(name, _NO_ROW))
+        for name, referenced_row in references.items():
+            if name not in self.__references:
+                self.__references[name] = array('q', [_NO_ROW] * row)
+                self.__references[name].append(referenced_row)
+        if entity.notes is not None:
+            self.__notes[row] = entity.notes
+
+        self.__class_counts[class_code] += 1
+        if self.__row_index is not None:
+            self.__row_index[entity.id] = row
+        return row
+
+    def extend(self, entities: Iterable[Entity]) -> None:
+        """
+        Appends entities to the store in bulk.
+
+        args:
+            entities: The entities to store.
+        """
+        for entity in entities:
+            self.append(entity)
+
+    def remove(self, id: int) -> None:
+        """
+        Marks the row of the entity with the passed id as deleted. The row keeps its place in the
+        arrays but is skipped by counts, scans, and lookups.
+
+        args:
+            id: The id of the entity to remove.
+        """
+        row = self.get_row(id)
+        if row is not None:
+            self.__deleted[row] = 1
+            self.__class_counts[self.__type_codes[row]] -= 1
+            del self.__row_index[id]
+
+    def count(self, type: EntityTypes = None) -> int:
+        """
+        Counts the stored entities, optionally only those of the passed entity type, in
+        O(number of entity classes).
+
+        args:
+            type: Optional EntityTypes member to count.
+
+        returns:
+            The number of entities.
+        """
+        return sum(count for code, count in enumerate(self.__class_counts)
+                   if type is None or issubclass(self.__classes[code], type.value))
+
+    def get_row(self, id: int) -> int:
+        """
+        Returns the row of the entity with the passed id.
+
+        args:
+            id: The id of the entity.
+
+        returns:
+            The row, or None if no such entity is stored.
+        """
+        if self.__row_index is None:
+            self.__row_index = {}
+            for row in range(len(self.__type_codes)):
+                if not self.__deleted[row]:
+                    self.__row_index[self.__ids[row]] = row
+        return self.__row_index.get(id)
+
+    def get_id(self, row: int) -> int:
+        """
+        Returns the id of the entity in the passed row without materializing it.
+
+        args:
+            row: The row of the entity.
+
+        returns:
+            The id of the entity.
+        """
+        return self.__ids[row]
+
+    def get_by_id(self, id: int) -> Entity:
+        """
+        Materializes the entity with the passed id.
+
+        args:
+            id: The id of the entity.
+
+        returns:
+            The entity, or None if no such entity is stored.
+        """
+        row = self.get_row(id)
+        return self.get(row) if row is not None else None
+
+    def get(self, row: int) -> Entity:
+        """
+        Materializes the entity in the passed row as a new object, equal to the one stored.
+
+        args:
+            row: The row of the entity.
+
+        returns:
+            The entity.
+        """
+        if self.__deleted[row]:
+            raise KeyError(f"Row {row} has been removed from the store")
+
+        entity_class = self.__classes[self.__type_codes[row]]
+        kwargs = {
+            "id": self.get_id(row),
+            "attributes": self.get_attributes(row),
+            "applicable_option_types": self.__class_option_types[self.__type_codes[row]],
+        }
+        if row in self.__notes:
+            kwargs["notes"] = self.__notes[row]
+        if self.__ages[row] != _NO_AGE:
+            kwargs["age"] = self.__ages[row]
+        for name, rows in self.__references.items():
+            if rows[row] != _NO_ROW:
+                kwargs[name] = self.get(rows[row])
+        return entity_class(**kwargs)
+
+    def get_attributes(self, row: int) -> EntityAttributes:
+        """
+        Rebuilds the attributes of the entity in the passed row without materializing the entity.
+
+        args:
+            row: The row of the entity.
+
+        returns:
+            The attributes as EntityAttributes.
+        """
+        layout = self.__layouts[self.__row_layouts[row]]
+        values: list[int] = []
+        counts: list[int] = []
+        for option_type in layout.option_types:
+            offsets = self.__offsets[option_type]
+            start, stop = offsets[row], offsets[row + 1]
+            values.extend(self.__values[option_type][start:stop])
+            counts.append(stop - start)
+        return EntityAttributes(layout, values, counts)
+
+    def iter_rows(self, type: EntityTypes = None) -> Iterator[int]:
+        """
+        Iterates over the rows of the stored entities, optionally only those of the passed type.
+
+        args:
+            type: Optional EntityTypes member to iterate over.
+
+        returns:
+            An iterator of rows.
+        """
+        codes = self.__get_matching_class_codes(type)
+        for row, class_code in enumerate(self.__type_codes):
+            if class_code in codes and not self.__deleted[row]:
+                yield row
+
+    def iter_entities(self, type: EntityTypes = None) -> Iterator[Entity]:
+        """
+        Materializes the stored entities one at a time, optionally only those of the passed type.
+
+        args:
+            type: Optional EntityTypes member to iterate over.
+
+        returns:
+            An iterator of entities.
+        """
+        for row in self.iter_rows(type):
+            yield self.get(row)
+
+    def find_rows(self, criteria: dict[OptionTypes, str | Iterable[str]], type: EntityTypes = None) -> list[int]:
+        """
+        Finds the rows of the entities that have every one of the passed attribute options by
+        scanning the option arrays directly, with NumPy when it is installed.
+
+        args:
+            criteria: The option names an entity must have per option type; pass several names
+                      for a type to require all of them.
+            type: Optional EntityTypes member to restrict the results to.
+
+        returns:
+            A list of the matching rows, in ascending order.
+        """
+        matches: set[int] = None
+        for option_type, names in criteria.items():
+            for name in ([names] if isinstance(names, str) else names):
+                id = self.catalog.find_id(option_type, name)
+                rows = self.__find_rows_with_option(option_type, id) if option_type in self.__values and id is not None else set()
+                matches = rows if matches is None else matches & rows
+                if not matches:
+                    return []
+
+        codes = self.__get_matching_class_codes(type)
+        candidates = matches if matches is not None else range(len(self.__type_codes))
+        return sorted(row for row in candidates if self.__type_codes[row] in codes and not self.__deleted[row])
+
+    def iter_records(self, type: EntityTypes = None) -> Iterator[dict]:
+        """
+        Iterates over the stored entities as plain records for exporting, read straight from the
+        arrays without materializing the entities.
+
+        args:
+            type: Optional EntityTypes member to export.
+
+        returns:
+            An iterator of dictionaries with the id, type, and attributes (option type value ->
+            list of option names) of each entity, plus its age when it has one.
+        """
+        for row in self.iter_rows(type):
+            layout = self.__layouts[self.__row_layouts[row]]
+            attributes: dict[str, list[str]] = {}
+            for option_type in layout.option_types:
+                offsets = self.__offsets[option_type]
+                ids = self.__values[option_type][offsets[row]:offsets[row + 1]]
+                attributes[option_type.value] = [option.name for option in self.catalog.resolve_all(ids)]
+            record = {"id": self.get_id(row), "type": self.__classes[self.__type_codes[row]].__name__, "attributes": attributes}
+            if self.__ages[row] != _NO_AGE:
+                record["age"] = self.__ages[row]
+            yield record
+
+    def __find_rows_with_option(self, option_type: OptionTypes, id: int) -> set[int]:
+        offsets = self.__offsets[option_type]
+        values = self.__values[option_type]
+        # NumPy is optional; without it scans fall back to pure Python loops over the arrays
+        np = get_numpy()
+        if np is not None:
+            positions = np.flatnonzero(np.frombuffer(values, dtype=np.uint32) == id)
+            rows = np.searchsorted(np.frombuffer(offsets, dtype=np.uint32), positions, side="right") - 1
+            return set(rows.tolist())
+
+        rows: set[int] = set()
+        row = 0
+        for position, value in enumerate(values):
+            if value == id:
+                while offsets[row + 1] <= position:
+                    row += 1
+                rows.add(row)
+        return rows
+
+    def __get_matching_class_codes(self, type: EntityTypes) -> set[int]:
+        return {code for code, entity_class in enumerate(self.__classes) if type is None or issubclass(entity_class, type.value)}
+
+    def __get_class_code(self, entity: Entity) -> int:
+        entity_class = entity.__class__
+        code = self.__class_codes.get(entity_class)
+        if code is None:
+            code = self.__class_codes[entity_class] = len(self.__classes)
+            self.__classes.append(entity_class)
+            self.__class_option_types.append(entity.applicable_option_types)
+            self.__class_counts.append(0)
+        return code
+
+    def __get_layout_code(self, option_types: tuple[OptionTypes, ...]) -> int:
+        code = self.__layout_codes.get(option_types)
+        if code is None:
+            code = self.__layout_codes[option_types] = len(self.__layouts)
+            self.__layouts.append(AttributeLayout(option_types, self.catalog))
+        return code
+
+    def __get_option_ids(self, attributes: Mapping, option_type: OptionTypes) -> list[int]:
+        if isinstance(attributes, EntityAttributes) and attributes._layout.catalog is self.catalog:
+            ids = attributes.get_ids(option_type).tolist()   # Already ids in this store's catalog
+        else:
+            ids = []
+            for option in attributes[option_type]:
+                if not isinstance(option, EntityOption):
+                    raise TypeError(f"Attribute value {option!r} is not an EntityOption and cannot be stored")
+                ids.append(self.catalog.intern(option))
+
+        if option_type not in self.__values:
+            # First option of this type: start its columns, with every earlier row holding no values
+            self.__offsets[option_type] = array('I', [0] * (len(self.__type_codes) + 1))
+            self.__values[option_type] = array('I')
+        return ids
@@ -1,3 +1,4 @@
+from collections import deque
 from enum import Enum
 
 from .entity import Entity
@@ -19,21 +20,114 @@ class EntityTypes(Enum):
 
 class EntityTracker:
     def __init__(self):
-        self.entity_stack: list[Entity] = []
+        """
+        Tracks the entities queued for generation as a work queue of [entity class, remaining 
+        count] pairs, so queueing N entities takes constant memory, and keeps running totals per
+        class so counting the queue is O(1).
+        """
+        self.work_queue: deque[list[type[Entity] | int]] = deque()
+        self.__queued_counts: dict[type[Entity], int] = {}
+        self.__queued_total: int = 0
+        # Number of entities generated so far per entity class; the next index of each class in a seeded world
+        self.generated_counts: dict[type[Entity], int] = {}
+
+    def __len__(self) -> int:
+        return self.__queued_total
 
     def count(self, type: EntityTypes = None) -> int:
+        """
+        Returns the number of queued entities.
+
+        args:
+            type: Optional EntityTypes member to count the queued entities of.
+
+        returns:
+            The number of queued entities (of the passed type).
+        """
         if type:
-            count:int = 0
-            for i in range (0, len(self.entity_stack)):
-                if type.value == self.entity_stack[i]:
-                    count += 1
-            return count
+            return self.__queued_counts.get(type.value, 0)
+        return self.__queued_total
+
+    def queue(self, entity_type: type[Entity], count: int = 1) -> None:
+        """
+        Queues entities for generation, merging them into the last work item if it is of the same class.
+
+        args:
+            entity_type: The class of the entities to queue.
+            count: The number of entities to queue.
+        """
+        if count <= 0:
+            return
+        if self.work_queue and self.work_queue[-1][0] is entity_type:
+            self.work_queue[-1][1] += count
         else:
-            return len(self.entity_stack)
-        
-    def add(self, entity: Entity) -> None:
-        self.entity_stack.append(entity)
+            self.work_queue.append([entity_type, count])
+        self.__queued_counts[entity_type] = self.__queued_counts.get(entity_type, 0) + count
+        self.__queued_total += count
 
-    def clear(self) -> None:
-        self.entity_stack.clear()
+    def add(self, entity: type[Entity]) -> None:
+        """
+        Queues one entity of the passed class.
+
+        args:
+            entity: The class of the entity to queue.
+        """
+        self.queue(entity)
+
+    def take(self, max_count: int = None) -> tuple[type[Entity], int] | None:
+        """
+        Takes work off the front of the queue: up to max_count entities of the class of the first 
+        work item.
 
+        args:
+            max_count: The most entities to take; defaults to the whole work item.
+
+        returns:
+            A tuple of the entity class and the number of entities taken, or None if the queue is empty.
+        """
+        if not self.work_queue:
+            return None
+        work_item = self.work_queue[0]
+        entity_type, remaining = work_item
+        count = remaining if max_count is None else min(remaining, max_count)
+        if count == remaining:
+            self.work_queue.popleft()
+        else:
+            work_item[1] = remaining - count
+        self.__queued_counts[entity_type] -= count
+        if not self.__queued_counts[entity_type]:
+            del self.__queued_counts[entity_type]
+        self.__queued_total -= count
+        return entity_type, count
+
+    def drain(self) -> dict[type[Entity], int]:
+        """
+        Takes all queued work off the queue.
+
+        returns:
+            The number of queued entities per entity class, in the order the classes were first queued.
+        """
+        counts: dict[type[Entity], int] = {}
+        while (work := self.take()) is not None:
+            entity_type, count = work
+            counts[entity_type] = counts.get(entity_type, 0) + count
+        return counts
+
+    def record_generated(self, entity_type: type[Entity], count: int) -> None:
+        """
+        Records that entities of the passed class were generated, advancing the index the next 
+        entity of the class has in a seeded world.
+
+        args:
+            entity_type: The class of the generated entities.
+            count: The number of entities generated.
+        """
+        self.generated_counts[entity_type] = self.generated_counts.get(entity_type, 0) + count
+
+    def clear(self) -> None:
+        """
+        Empties the queue.
+        """
+        self.work_queue.clear()
+        self.__queued_counts.clear()
+        self.__queued_total = 0
@@ -0,0 +1,90 @@
+from .entity import Entity
+from .entity_factory import EntityFactory
+from .entity_option import EntityOption, OptionTypes
+from .option_catalog import OptionCatalog, get_default_catalog
+from .option_index import OptionSamplingIndex
+
+class FactoryRegistry:
+    def __init__(self, applicable_option_types: dict[type[Entity], dict[OptionTypes, tuple[int, int]]], catalog: OptionCatalog = None) -> None:
+        """
+        Keeps one long-lived EntityFactory per entity type, so the factory setup and its
+        compiled sampling state are paid for once per run rather than once per entity. Factories
+        are keyed by entity type and catalog version: a factory is reused for as long as it is 
+        asked for the same options list, and recompiled when the catalog version changes.
+
+        args:
+            applicable_option_types: The (min, max) occurrences of each option type per entity class.
+            catalog: The OptionCatalog the factories intern their options in; defaults to the
+                     process-wide catalog.
+        """
+        self.__applicable_option_types = applicable_option_types
+        self.__catalog: OptionCatalog = catalog if catalog is not None else get_default_catalog()
+        # entity type -> (catalog version, factory)
+        self.__factories: dict[type[Entity], tuple[int, EntityFactory]] = {}
+        # A sampling index compiled ahead of time (e.g. loaded from a cache) and the options list it was compiled from
+        self.__sampling_index: tuple[list[EntityOption], OptionSamplingIndex] = None
+
+    def get_catalog(self) -> OptionCatalog:
+        """
+        Returns the OptionCatalog the factories intern their options in.
+
+        returns:
+            The OptionCatalog.
+        """
+        return self.__catalog
+
+    def set_sampling_index(self, options_list: list[EntityOption], sampling_index: OptionSamplingIndex) -> None:
+        """
+        Hands the registry a sampling index already compiled from options_list, which factories
+        built for that options list then share instead of compiling their own.
+
+        args:
+            options_list: The list of EntityOption objects the index was compiled from.
+            sampling_index: The compiled OptionSamplingIndex.
+        """
+        self.__sampling_index = (options_list, sampling_index)
+
+    def get_factory(self, entity_type: type[Entity], options_list: list[EntityOption]) -> EntityFactory:
+        """
+        Returns the factory for the passed entity type, building it only if there is none yet
+        for the options list, and recompiling its sampling index if the catalog version changed.
+
+        args:
+            entity_type: The class of entity the factory creates.
+            options_list: A list of EntityOption objects to draw from.
+
+        returns:
+            The EntityFactory.
+
+        raises:
+            TypeError: If entity_type has no applicable option types.
+        """
+        entry = self.__factories.get(entity_type)
+        if entry is not None:
+            version, factory = entry
+            if factory.get_options_list() is options_list:
+                if version != self.__catalog.version:
+                    # Options were added or replaced since the factory compiled its sampling index
+                    factory.refresh_sampling_index()
+                    self.__factories[entity_type] = (self.__catalog.version, factory)
+                return factory
+
+        if entity_type not in self.__applicable_option_types:
+            raise TypeError(f"Invalid entity type: {entity_type}")
+
+        sampling_index = None
+        if self.__sampling_index is not None and self.__sampling_index[0] is options_list:
+            sampling_index = self.__sampling_index[1]
+        factory = EntityFactory(entity_type, self.__applicable_option_types[entity_type], options_list, catalog=self.__catalog,
+                                sampling_index=sampling_index)
+        # Read the version after building, since compiling the sampling index interns the options
+        self.__factories[entity_type] = (self.__catalog.version, factory)
+        return factory
+
+    def clear(self) -> None:
+        """
+        Drops every factory and precompiled sampling index, e.g. after the weights of options 
+        were changed in place.
+        """
+        self.__factories.clear()
+        self.__sampling_index = None
@@ -0,0 +1,466 @@
+import logging, random
+from concurrent.futures import Executor
+from contextlib import nullcontext
+from typing import Iterable, Iterator, Mapping
+
+from .entity import Entity
+from .entity_factory import EntityFactory
+from .entity_id import IdAllocator, get_id_allocator, get_stream_id, set_id_allocator
+from .entity_graph import EntityGraph
+from .entity_option import EntityOption, OptionTypes
+from .factory_registry import FactoryRegistry
+from .entity_rng import get_entity_rng
+from .entity_tracker import EntityTracker
+from .log_config import log_entities
+from .metrics import Metrics, get_metrics, set_metrics
+from .gpe import GeoPoliticalEntity
+from .location import Location
+from .organization import Organization
+from .person import Person
+
+# The option types each kind of entity is generated from, with the (min, max) number of
+# occurrences of each type per entity
+PERSON_OPTION_TYPES: dict[OptionTypes, tuple[int, int]] = {
+    OptionTypes.AGE: (1, 1),
+    OptionTypes.BACKGROUND: (1, 2),
+    OptionTypes.FAMILY_NAME: (1, 1),
+    OptionTypes.NAME: (1, 2),
+    OptionTypes.NICKNAME: (0, 2),
+    OptionTypes.PERSONALITY_TRAIT: (1, 3),
+    OptionTypes.PHYSICAL_TRAIT: (1, 3),
+    OptionTypes.PROFESSION: (1, 2),
+    OptionTypes.RACE: (1, 1),
+    OptionTypes.ROLE: (0, 3),
+    OptionTypes.RELATIONSHIP: (1, 10),
+    OptionTypes.SEX: (1, 1),
+    OptionTypes.SPECIALIZATION: (0, 2),
+    OptionTypes.SKILL: (1, 6),
+    OptionTypes.UNIQUE: (0, 2)
+}
+
+LOCATION_OPTION_TYPES: dict[OptionTypes, tuple[int, int]] = {
+    OptionTypes.NAME: (1, 1),
+    OptionTypes.TYPE: (1, 1),
+    OptionTypes.CLIMATE: (1, 1),
+    OptionTypes.RESOURCES: (1, 2),
+    OptionTypes.TERRAIN: (1, 2),
+    OptionTypes.UNIQUE: (0, 2)
+}
+
+ORGANIZATION_OPTION_TYPES: dict[OptionTypes, tuple[int, int]] = {
+    OptionTypes.NAME: (1, 1),
+    OptionTypes.TYPE: (1, 1),
+    OptionTypes.RELATIONSHIP: (0, 5),
+    OptionTypes.ROLE: (1, 2),
+    OptionTypes.SPECIALIZATION: (0, 2),
+    OptionTypes.UNIQUE: (0, 2)
+}
+
+GPE_OPTION_TYPES: dict[OptionTypes, tuple[int, int]] = {
+    OptionTypes.NAME: (1, 1),
+    OptionTypes.RELATIONSHIP: (0, 10),
+    OptionTypes.TYPE: (1, 1),
+    OptionTypes.UNIQUE: (0, 2)
+}
+
+APPLICABLE_OPTION_TYPES: dict[type[Entity], dict[OptionTypes, tuple[int, int]]] = {
+    Person: PERSON_OPTION_TYPES,
+    Location: LOCATION_OPTION_TYPES,
+    Organization: ORGANIZATION_OPTION_TYPES,
+    GeoPoliticalEntity: GPE_OPTION_TYPES
+}
+
+# The factories every generation function (and the CLI) draws from, built once per run
+default_registry: FactoryRegistry = FactoryRegistry(APPLICABLE_OPTION_TYPES)
+
+def get_factory(entity_type: type[Entity], options_list: list[EntityOption]) -> EntityFactory:
+    """
+    Returns the long-lived EntityFactory for the passed entity type from the default registry.
+
+    args:
+        entity_type: The class of entity the factory creates.
+        options_list: A list of EntityOption objects to draw from.
+
+    returns:
+        The EntityFactory.
+    """
+    return default_registry.get_factory(entity_type, options_list)
+
+def get_registry() -> FactoryRegistry:
+    """
+    Returns the default FactoryRegistry.
+
+    returns:
+        The FactoryRegistry every generation function draws its factories from.
+    """
+    return default_registry
+
+def generate_entities(entity_type: type[Entity], count: int, options_list: list[EntityOption], seed: int = None) -> list[Entity]:
+    """
+    Generates a batch of random entities of a single, non-composite entity type using the
+    vectorized sampling of EntityFactory.create_random_entities.
+
+    args:
+        entity_type: The class of entity to generate (Person, Location or Organization).
+        count: The number of entities to generate.
+        options_list: A list of EntityOption objects to use for randomization.
+        seed: Optional seed for the batch sampler.
+
+    returns:
+        A list of the generated entities.
+
+    raises:
+        TypeError: If entity_type has no applicable option types or requires related entities.
+    """
+    if entity_type == GeoPoliticalEntity or entity_type not in APPLICABLE_OPTION_TYPES:
+        raise TypeError(f"Invalid entity type for batch generation: {entity_type}")
+
+    factory: EntityFactory = get_factory(entity_type, options_list)
+    return factory.create_random_entities(count, options_list, seed=seed)
+
+def generate_gpes(count: int, options_list: list[EntityOption], seed: int = None) -> tuple[list[Entity], list[tuple[Entity, Entity]]]:
+    """
+    Generates random GeoPoliticalEntity objects, each with the Location and Organization it 
+    is composed of.
+
+    args:
+        count: The number of GeoPoliticalEntity objects to generate.
+        options_list: A list of EntityOption objects to use for randomization.
+        seed: Optional seed for the batch sampler of the related entities and the GPEs.
+
+    returns:
+        A tuple of the generated entities (GPEs, locations, and organizations) and the edges 
+        connecting each GPE, location, and organization triple.
+    """
+    rng = random.Random(seed)
+    locations = generate_entities(Location, count, options_list, seed=rng.getrandbits(64))
+    organizations = generate_entities(Organization, count, options_list, seed=rng.getrandbits(64))
+
+    factory: EntityFactory = get_factory(GeoPoliticalEntity, options_list)
+    generated: list[Entity] = []
+    edges: list[tuple[Entity, Entity]] = []
+    for location, organization in zip(locations, organizations):
+        gpe = factory.create_random_entity(options_list, rng=rng, location=location, organization=organization)
+        generated.extend((location, organization, gpe))
+        edges.extend(((location, organization), (location, gpe), (organization, gpe)))
+
+    return generated, edges
+
+def generate_entity(entity_type: type[Entity], index: int, options_list: list[EntityOption], seed: int) -> Entity:
+    """
+    Regenerates a single entity of a seeded world from its own random stream, without 
+    generating any of the entities before it.
+
+    args:
+        entity_type: The class of the entity.
+        index: The index of the entity among the entities of its type in the world.
+        options_list: The list of EntityOption objects the world was generated with.
+        seed: The seed of the world.
+
+    returns:
+        The entity, identical to the one generate_world created at that index.
+    """
+    if entity_type not in APPLICABLE_OPTION_TYPES:
+        raise TypeError(f"Invalid entity type: {entity_type}")
+
+    generated, _ = _generate_seeded_range(entity_type, index, index + 1, options_list, seed)
+    return generated[-1]
+
+def generate_world(entities: EntityGraph, counts: dict[type[Entity], int], options_list: list[EntityOption], 
+                   workers: int = 1, seed: int = None, offsets: dict[type[Entity], int] = None) -> None:
+    """
+    Generates the requested number of entities of each type and merges them into the graph in 
+    bulk. With more than one worker the counts are sharded evenly across a ProcessPoolExecutor.
+
+    Without a seed each shard is generated in batches with its own independently seeded random 
+    streams, and worker processes allocate ids from blocks reserved up front so they cannot 
+    collide. With a seed every entity is generated from its own counter-based stream derived from 
+    (seed, entity type, index), so the world is identical no matter how many workers build it and 
+    any entity can be regenerated on its own with generate_entity.
+
+    args:
+        entities: An instance of the EntityGraph class to add the created entities to.
+        counts: The number of entities to generate per entity class.
+        options_list: A list of EntityOption objects to use for randomization.
+        workers: The number of worker processes to generate with.
+        seed: Optional seed of the world.
+        offsets: The index to start at per entity class, i.e. how many entities of that class 
+                 the seeded world already holds; defaults to 0.
+    """
+    for entity_type in counts:
+        if entity_type not in APPLICABLE_OPTION_TYPES:
+            raise TypeError(f"Invalid entity type: {entity_type}")
+
+    results = _generate_sharded(counts, options_list, workers, seed, offsets)
+
+    # Merge type by type in shard order so the graph is filled in the same order as a serial run
+    logger = logging.getLogger(__name__)
+    for entity_type in counts:
+        for result in results:
+            if entity_type in result:
+                generated, edges = result[entity_type]
+                log_entities(logger, generated)
+                metrics = get_metrics()
+                if metrics is not None:
+                    metrics.increment("generated", entity_type.__name__, len(generated))
+                entities.add_nodes(generated)
+                entities.add_edges(edges)
+
+def _generate_sharded(counts: dict[type[Entity], int], options_list: list[EntityOption], workers: int = 1, seed: int = None,
+                      offsets: dict[type[Entity], int] = None, 
+                      executor: Executor = None) -> list[dict[type[Entity], tuple[list[Entity], list[tuple[Entity, Entity]]]]]:
+    """
+    Splits the counts into one shard per worker and generates the shards, serially or across a
+    process pool.
+
+    args:
+        counts: The number of entities to generate per entity class.
+        options_list: A list of EntityOption objects to use for randomization.
+        workers: The number of worker processes.
+        seed: Optional seed of the world.
+        offsets: The index to start at per entity class; defaults to 0.
+        executor: Optional process pool of the caller to reuse across calls; a pool of workers
+                  processes is started for the call otherwise.
+
+    returns:
+        The results of _generate_shard, in shard order.
+    """
+    workers = max(1, workers)
+    offsets = offsets or {}
+    rng = random.Random(seed)
+
+    # Split each type's index range into one contiguous range per shard
+    shards: list[tuple[dict[type[Entity], tuple[int, int]], int]] = []
+    for shard in range(workers):
+        shard_ranges: dict[type[Entity], tuple[int, int]] = {}
+        for entity_type, count in counts.items():
+            offset = offsets.get(entity_type, 0)
+            shard_ranges[entity_type] = (offset + count * shard // workers, offset + count * (shard + 1) // workers)
+        if any(stop > start for start, stop in shard_ranges.values()):
+            shards.append((shard_ranges, rng.getrandbits(64)))
+
+    if workers == 1 or len(shards) == 1:
+        return [_generate_shard(shard_ranges, options_list, seed, shard_seed) for shard_ranges, shard_seed in shards]
+
+    # Imported here, since the process pool machinery is only needed by parallel runs
+    from concurrent.futures import ProcessPoolExecutor
+    allocator = get_id_allocator()
+    metrics = get_metrics()
+    with nullcontext(executor) if executor is not None else ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_generate_shard if metrics is None else _generate_profiled_shard, shard_ranges, options_list, seed, 
+                                   shard_seed, allocator.reserve(_count_shard_entities(shard_ranges)) if seed is None else None) 
+                   for shard_ranges, shard_seed in shards]
+        if metrics is None:
+            return [future.result() for future in futures]
+        results = []
+        for future in futures:
+            shard_results, shard_metrics = future.result()
+            metrics.merge(shard_metrics)
+            results.append(shard_results)
+        return results
+
+# A generation plan: an EntityTracker work queue, or the number of entities to generate per entity class
+GenerationPlan = EntityTracker | Mapping[type[Entity], int] | Iterable[tuple[type[Entity], int]]
+
+def stream_world(plan: GenerationPlan, options_list: list[EntityOption], seed: int = None, offsets: dict[type[Entity], int] = None, 
+                 chunk_size: int = 1000, workers: int = 1) -> Iterator[tuple[list[Entity], list[tuple[Entity, Entity]]]]:
+    """
+    Generates the entities of a plan in chunks, without adding them to a graph, so a caller that
+    writes out and drops each chunk uses the same memory for any count. Work is only taken off 
+    the plan as each chunk is generated; with an EntityTracker as the plan its queue and counts 
+    stay accurate while the stream is consumed, and its generated counts advance with it. 
+
+    Every chunk is expanded and wired by the GenerationScheduler, like process_entities_stack,
+    so composite entities come with the entities they depend on. Entities only reuse 
+    dependencies of their own chunk, since earlier chunks are not kept: a plan that fits in one
+    chunk streams the same world GenerationScheduler.run creates for the same seed and offsets,
+    while a larger one may create extra shared dependencies (e.g. organization leaders) per chunk.
+
+    args:
+        plan: An EntityTracker, a dictionary of entity class to count, or (entity class, count) pairs.
+        options_list: A list of EntityOption objects to use for randomization.
+        seed: Optional seed of the world.
+        offsets: The index to start at per entity class; defaults to the generated counts of an 
+                 EntityTracker plan, and to 0 otherwise.
+        chunk_size: The number of requested entities per chunk and worker, not counting the entities 
+                    they depend on.
+        workers: The number of worker processes to shard each chunk across.
+
+    returns:
+        An iterator of tuples of the generated entities of a chunk and the edges between them.
+
+    raises:
+        TypeError: If the plan holds an entity class that cannot be generated.
+    """
+    # Imported here, since the scheduler builds on the generation functions of this module
+    from .scheduler import GenerationScheduler
+
+    chunk_size = max(1, chunk_size)
+    tracker = plan if isinstance(plan, EntityTracker) else None
+    if offsets is None:
+        offsets = dict(tracker.generated_counts) if tracker is not None else {}
+    else:
+        offsets = dict(offsets)
+
+    scheduler = GenerationScheduler()
+    workers = max(1, workers)
+    # One process pool serves every chunk, which holds chunk_size entities per worker
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 else nullcontext() as executor:
+        for counts in _iter_chunks(plan, chunk_size * workers):
+            created, edges = scheduler.generate(counts, options_list, workers, seed, offsets, executor=executor)
+            generated: list[Entity] = []
+            metrics = get_metrics()
+            for entity_type, chunk_entities in created.items():
+                offsets[entity_type] = offsets.get(entity_type, 0) + len(chunk_entities)
+                if tracker is not None:
+                    tracker.record_generated(entity_type, len(chunk_entities))
+                if metrics is not None:
+                    metrics.increment("generated", entity_type.__name__, len(chunk_entities))
+                generated.extend(chunk_entities)
+            yield generated, edges
+
+def iter_entities(plan: GenerationPlan, options_list: list[EntityOption], seed: int = None, 
+                  offsets: dict[type[Entity], int] = None, chunk_size: int = 1000) -> Iterator[Entity]:
+    """
+    Lazily yields the entities of a plan one at a time as they are generated (see stream_world),
+    including the entities composite entities depend on, such as the locations and 
+    organizations GeoPoliticalEntity objects are composed of.
+
+    args:
+        plan: An EntityTracker, a dictionary of entity class to count, or (entity class, count) pairs.
+        options_list: A list of EntityOption objects to use for randomization.
+        seed: Optional seed of the world.
+        offsets: The index to start at per entity class.
+        chunk_size: The number of requested entities generated at a time.
+
+    returns:
+        An iterator of entities.
+    """
+    for generated, _ in stream_world(plan, options_list, seed, offsets, chunk_size):
+        yield from generated
+
+def _iter_chunks(plan: GenerationPlan, chunk_size: int) -> Iterator[dict[type[Entity], int]]:
+    """
+    Splits a plan into chunks of at most chunk_size entities, which may span several entity classes.
+    """
+    if isinstance(plan, EntityTracker):
+        tracker = plan
+    else:
+        tracker = EntityTracker()
+        for entity_type, count in (plan.items() if isinstance(plan, Mapping) else plan):
+            tracker.queue(entity_type, count)
+
+    while len(tracker):
+        counts: dict[type[Entity], int] = {}
+        taken = 0
+        while taken < chunk_size and (work := tracker.take(chunk_size - taken)) is not None:
+            entity_type, count = work
+            counts[entity_type] = counts.get(entity_type, 0) + count
+            taken += count
+        yield counts
+
+def _count_shard_entities(ranges: dict[type[Entity], tuple[int, int]]) -> int:
+    """
+    Counts the entities a shard creates; each GeoPoliticalEntity comes with a location and an organization.
+    """
+    return sum((stop - start) * (3 if entity_type == GeoPoliticalEntity else 1) for entity_type, (start, stop) in ranges.items())
+
+def _generate_shard(ranges: dict[type[Entity], tuple[int, int]], options_list: list[EntityOption], seed: int, 
+                    shard_seed: int, id_start: int = None) -> dict[type[Entity], tuple[list[Entity], list[tuple[Entity, Entity]]]]:
+    """
+    Generates one shard of a world, in the calling process or in a worker process of 
+    generate_world. Every batch of the shard is seeded from a random stream of its own, so the
+    global random module of the caller is left alone.
+
+    args:
+        ranges: The (start, stop) index range to generate per entity class.
+        options_list: A list of EntityOption objects to use for randomization.
+        seed: The seed of the world, or None to generate in batches.
+        shard_seed: The seed of the shard.
+        id_start: The first id of the block of ids reserved for the shard, when it runs in a 
+                  worker process and allocates ids from the counter.
+
+    returns:
+        The generated entities and the edges between them per entity class.
+    """
+    rng = random.Random(shard_seed)
+    if id_start is not None:
+        set_id_allocator(IdAllocator(start=id_start))
+    results: dict[type[Entity], tuple[list[Entity], list[tuple[Entity, Entity]]]] = {}
+    for entity_type, (start, stop) in ranges.items():
+        if stop <= start:
+            continue
+        if seed is not None:
+            results[entity_type] = _generate_seeded_range(entity_type, start, stop, options_list, seed)
+        elif entity_type == GeoPoliticalEntity:
+            results[entity_type] = generate_gpes(stop - start, options_list, seed=rng.getrandbits(64))
+        else:
+            results[entity_type] = (generate_entities(entity_type, stop - start, options_list, seed=rng.getrandbits(64)), [])
+
+    return results
+
+def _generate_profiled_shard(ranges: dict[type[Entity], tuple[int, int]], options_list: list[EntityOption], seed: int, shard_seed: int, 
+                             id_start: int = None) -> tuple[dict[type[Entity], tuple[list[Entity], list[tuple[Entity, Entity]]]], Metrics]:
+    """
+    Runs _generate_shard in a worker process while profiling is on. The Metrics of the parent 
+    process is out of reach of the worker, so the shard reports to a Metrics of its own, which
+    is returned for the parent to merge.
+
+    args:
+        ranges: The (start, stop) index range to generate per entity class.
+        options_list: A list of EntityOption objects to use for randomization.
+        seed: The seed of the world, or None to generate in batches.
+        shard_seed: The seed of the shard.
+        id_start: The first id of the block of ids reserved for the shard.
+
+    returns:
+        The results of _generate_shard and the Metrics of the shard.
+    """
+    metrics = Metrics()
+    set_metrics(metrics)
+    try:
+        return _generate_shard(ranges, options_list, seed, shard_seed, id_start), metrics
+    finally:
+        # Pool workers are reused by later calls, which may not profile
+        set_metrics(None)
+
+def _generate_seeded_range(entity_type: type[Entity], start: int, stop: int, options_list: list[EntityOption], 
+                           seed: int) -> tuple[list[Entity], list[tuple[Entity, Entity]]]:
+    """
+    Generates the entities of one type at the indices [start, stop) of a seeded world, each from 
+    its own random stream. A GeoPoliticalEntity's stream also drives its location and organization.
+
+    args:
+        entity_type: The class of entity to generate.
+        start: The index of the first entity to generate.
+        stop: The index after the last entity to generate.
+        options_list: A list of EntityOption objects to use for randomization.
+        seed: The seed of the world.
+
+    returns:
+        A tuple of the generated entities and the edges between them.
+    """
+    stream: str = entity_type.__name__
+    generated: list[Entity] = []
+    edges: list[tuple[Entity, Entity]] = []
+
+    if entity_type == GeoPoliticalEntity:
+        location_factory: EntityFactory = get_factory(Location, options_list)
+        organization_factory: EntityFactory = get_factory(Organization, options_list)
+        factory: EntityFactory = get_factory(GeoPoliticalEntity, options_list)
+        for index in range(start, stop):
+            rng = get_entity_rng(seed, stream, index)
+            location = location_factory.create_random_entity(options_list, rng=rng, id=get_stream_id(f"{stream}.{Location.__name__}", index))
+            organization = organization_factory.create_random_entity(options_list, rng=rng, 
+                                                                     id=get_stream_id(f"{stream}.{Organization.__name__}", index))
+            gpe = factory.create_random_entity(options_list, rng=rng, id=get_stream_id(stream, index), location=location, organization=organization)
+            generated.extend((location, organization, gpe))
+            edges.extend(((location, organization), (location, gpe), (organization, gpe)))
+    else:
+        factory: EntityFactory = get_factory(entity_type, options_list)
+        for index in range(start, stop):
+            generated.append(factory.create_random_entity(options_list, rng=get_entity_rng(seed, stream, index), id=get_stream_id(stream, index)))
+
+    return generated, edges
@@ -1,3 +1,4 @@
+import random
 from dataclasses import dataclass, field
 
 from .entity import Entity
@@ -5,7 +6,7 @@ from .location import Location
 from .organization import Organization
 from .structure import Structure
 
-@dataclass(frozen=True, kw_only=True)
+@dataclass(frozen=True, kw_only=True, slots=True)
 class GeoPoliticalEntity(Entity):
     location: Location
     organization: Organization
@@ -22,8 +23,8 @@ class GeoPoliticalEntity(Entity):
     # For Locations: Population growth, resource exploitation, environmental changes.
     # For Organizations: Influence, stability, conflicts, and alliances.
 
-    def __post_init__(self):
-        super().__post_init__()
+    def __post_init__(self, rng: random.Random = None):
+        super(GeoPoliticalEntity, self).__post_init__(rng)
 
     def __hash__(self):
-        return hash((self.id, self.name)) 
+        return self._hash
@@ -1,7 +1,13 @@
+from . import traversal
+
 class Graph:
     def __init__(self) -> None:
+        # Adjacency is held in dictionaries used as insertion-ordered sets (neighbor -> None), 
+        # so membership tests and removals are O(1) and iteration order is reproducible
         self.graph: dict = {}
         self.metadata: dict = {}
+        # Secondary index from each node to the keys of the metadata entries it appears in
+        self.metadata_keys: dict = {}
 
     def __repr__(self):
         return str(self.graph) + str(self.metadata)
@@ -13,26 +19,33 @@ class Graph:
         self.add_pair(node1, node2, metadata1, metadata2)
 
     def add_edge(self, node1, node2) -> None:
-        if node1 in self.graph:
-            self.graph[node1].append(node2)
-        else:
-            self.graph[node1] = {node2}
-        if node2 in self.graph:
-            self.graph[node2].append(node1)
-        else:
-            self.graph[node2] = {node1}
+        self.graph.setdefault(node1, {})[node2] = None
+        self.graph.setdefault(node2, {})[node1] = None
 
     def add_node(self, node) -> None:
         if node not in self.graph:
-            self.graph[node] = set()
+            self.graph[node] = {}
     
     def add_metadata(self, node1, node2, metadata: dict) -> None:
         if metadata is not None:
             if (node1, node2) not in self.metadata:
-                self.metadata[(node1, node2)] = metadata
+                self.set_metadata(node1, node2, metadata)
             else:
                 self.metadata[(node1, node2)].update(metadata)
 
+    def set_metadata(self, node1, node2, metadata: dict) -> None:
+        key = (node1, node2)
+        self.metadata[key] = metadata
+        self.metadata_keys.setdefault(node1, {})[key] = None
+        self.metadata_keys.setdefault(node2, {})[key] = None
+
+    def delete_metadata(self, node1, node2) -> None:
+        key = (node1, node2)
+        if key in self.metadata:
+            del self.metadata[key]
+            self.metadata_keys[node1].pop(key, None)
+            self.metadata_keys[node2].pop(key, None)
+
     def add_metadata2(self, node1, node2, metadata1: dict = None, metadata2: dict = None) -> None:
         if metadata1 is not None:
             if (node1, node2) not in self.metadata:
@@ -44,9 +57,9 @@ class Graph:
     def add_metadata_reciprocal(self, node1, node2, metadata: dict) -> None:
         if metadata is not None:
             if (node1, node2) not in self.metadata:
-                self.metadata[(node1, node2)] = metadata
+                self.set_metadata(node1, node2, metadata)
             if (node2, node1) not in self.metadata:
-                self.metadata[(node2, node2)] = metadata
+                self.set_metadata(node2, node1, metadata)
 
     def add_pair(self, node1, node2, metadata1: dict = None, metadata2: dict = None) -> None:
         if node1 not in self.graph:
@@ -96,38 +109,32 @@ class Graph:
         return False
     
     def get_node(self, node) -> set:
-        return self.graph[node]
+        return self.graph[node].keys()
     
     def get_adjacent_nodes(self, node) -> list:
         return list(self.graph[node])
     
     def get_metadata(self, node) -> list:
-        metadata = []
-        for key, value in self.metadata.items():
-            if node in key:
-                metadata.append((key, value))
-        return metadata
+        return [(key, self.metadata[key]) for key in self.metadata_keys.get(node, ())]
     
     def remove(self, node) -> None:
-        if node in self.graph:
-            del self.graph[node]
-        for key, value in self.graph.items():
-            if node in value:
-                value.remove(node)
-        for key in self.metadata.items():
-            if node in key:
-                del self.metadata[key]
+        for neighbor in self.graph.pop(node, ()):
+            # A self-loop lists the node among its own neighbors, and its adjacency is already gone
+            if neighbor != node:
+                self.graph[neighbor].pop(node, None)
+        for key in list(self.metadata_keys.pop(node, ())):
+            del self.metadata[key]
+            for endpoint in key:
+                if endpoint in self.metadata_keys:
+                    self.metadata_keys[endpoint].pop(key, None)
     
     def remove_edge(self, node1, node2) -> None:
         if node1 in self.graph:
-            self.graph[node1].remove(node2)
+            self.graph[node1].pop(node2, None)
         if node2 in self.graph:
-            self.graph[node2].remove(node1)
-        for key in self.metadata.items():
-            if node1 in key:
-                del self.metadata[key]
-            if node2 in key:
-                del self.metadata[key]
+            self.graph[node2].pop(node1, None)
+        self.delete_metadata(node1, node2)
+        self.delete_metadata(node2, node1)
 
     def unconnected_nodes(self) -> list:
         unconnected = []
@@ -136,49 +143,29 @@ class Graph:
                 unconnected.append(node)
         return unconnected
     
+    def sort_adjacency(self, key=None) -> None:
+        """
+        Sorts every node's neighbors once, so traversals that follow adjacency order visit 
+        neighbors in a canonical order without sorting them on every visit.
+
+        args:
+            key: Optional sort key for the nodes, as for sorted().
+        """
+        for node, neighbors in self.graph.items():
+            self.graph[node] = dict.fromkeys(sorted(neighbors, key=key))
+
     def breadth_first_search(self, node) -> list:
-        visited = []
-        to_visit = []
-        to_visit.append(node)
-        while to_visit:
-            s = to_visit.pop(0)
-            visited.append(s)
-            sorted_neighbors = sorted(self.graph[s])
-            for neighbor in sorted_neighbors:
-                if neighbor not in visited and neighbor not in to_visit:
-                    to_visit.append(neighbor)
-        return visited
+        return traversal.breadth_first_search(self, node)
     
     def depth_first_search(self, start_node) -> list:
-        visited = []
-        self.depth_first_search_r(visited, start_node)
-        return visited
+        return traversal.depth_first_search(self, start_node)
 
     def depth_first_search_r(self, visited, current_node) -> list:
-        visited.append(current_node)
-        sorted_neighbors = sorted(self.graph[current_node])
-        for neighbor in sorted_neighbors:
-            if neighbor not in visited:
-                self.depth_first_search_r(visited, neighbor)
+        # Kept for compatibility; the search itself is iterative so deep graphs cannot exceed the recursion limit
+        visited.extend(traversal.depth_first_search(self, current_node, dict.fromkeys(visited)))
 
     def bfs_shortest_path(self, start, end) -> list:
-        visited = []
-        to_visit = [start]
-        path = {start: None}
-        while to_visit:
-            current_node = to_visit.pop(0)
-            visited.append(current_node)
-            if current_node == end:
-                path_list = []
-                while current_node is not None:
-                    path_list.append(current_node)
-                    current_node = path[current_node]
-                path_list.reverse()
-                return path_list
-
-            sorted_neighbors = sorted(self.graph[current_node])
-            for neighbor in sorted_neighbors:
-                if neighbor not in visited and neighbor not in to_visit:
-                    to_visit.append(neighbor)
-                    path[neighbor] = current_node
-        return None
+        return traversal.shortest_path(self, start, end)
+
+    def ego_network(self, node, k: int = 1):
+        return traversal.ego_network(self, node, k)
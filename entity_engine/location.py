@@ -1,3 +1,4 @@
+import random
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -27,7 +28,7 @@ class ClimateAttributes(Enum):
     TEMPERATE = 2
     ARTIC = 3
 
-@dataclass(frozen=True, kw_only=True)
+@dataclass(frozen=True, kw_only=True, slots=True)
 class Location(Entity):
     type: LocationType = field(default=LocationType.TOWN)
     #coordinates
@@ -39,8 +40,8 @@ class Location(Entity):
     # Resources	ResourceID, LocationID, Type (water, ore, crops), Quantity, Quality
     # Infrastructure	InfrastructureID, LocationID, Type (roads, spaceports, trade hubs), Status
 
-    def __post_init__(self):
-        super().__post_init__()
+    def __post_init__(self, rng: random.Random = None):
+        super(Location, self).__post_init__(rng)
 
     def __hash__(self):
-        return hash((self.id, self.name, self.type)) 
\ No newline at end of file
+        return self._hash
@@ -0,0 +1,168 @@
+import configparser, logging, queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Iterator, Sequence
+
+from .entity import Entity
+
+# The settings of the [logging] section of config.ini; the log file rolls over every 10 MiB
+LOGGING_DEFAULTS: dict[str, str] = {
+    "level": "WARNING",
+    "file": "app.log",
+    "file_level": "ERROR",
+    "max_bytes": str(10 * 2**20),
+    "backup_count": "5",
+    "sample_rate": "1000"
+}
+
+LOGGING_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+class EntityEventSampler:
+    __slots__ = ("rate", "count")
+
+    def __init__(self, rate: int = 1000) -> None:
+        """
+        Picks every rate-th entity event to log, so that bulk runs log a steady trickle of
+        sample entities instead of one record per entity.
+
+        args:
+            rate: Log one in this many events; 1 logs every event.
+        """
+        self.rate: int = max(1, rate)
+        self.count: int = 0
+
+    def sample(self) -> bool:
+        """
+        Counts one event.
+
+        returns:
+            True if the event should be logged.
+        """
+        count = self.count
+        self.count = count + 1
+        return count % self.rate == 0
+
+    def sample_batch(self, events: Sequence) -> Sequence:
+        """
+        Counts a batch of events without visiting each of them.
+
+        args:
+            events: The events of the batch.
+
+        returns:
+            The events of the batch that should be logged.
+        """
+        start = -self.count % self.rate
+        self.count += len(events)
+        return events[start::self.rate]
+
+# The sampler entity events of every generation function (and the CLI) go through
+_entity_sampler: EntityEventSampler = EntityEventSampler(int(LOGGING_DEFAULTS["sample_rate"]))
+
+def get_entity_sampler() -> EntityEventSampler:
+    """
+    Returns the EntityEventSampler of the process.
+
+    returns:
+        The EntityEventSampler.
+    """
+    return _entity_sampler
+
+def set_entity_sampler(sampler: EntityEventSampler) -> None:
+    """
+    Replaces the EntityEventSampler of the process, e.g. with the sample rate from config.ini.
+
+    args:
+        sampler: The EntityEventSampler to use from now on.
+    """
+    global _entity_sampler
+    _entity_sampler = sampler
+
+def log_entities(logger: logging.Logger, entities: Sequence[Entity], event: str = "Created") -> None:
+    """
+    Logs a sample of a batch of entities at debug level. The check is a single level lookup when
+    debug logging is off, and the attributes are only formatted for the sampled entities.
+
+    args:
+        logger: The logger to log to.
+        entities: The entities of the batch.
+        event: What happened to the entities.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    for entity in _entity_sampler.sample_batch(entities):
+        logger.debug("%s %s %s: %s", event, type(entity).__name__, entity.id, entity.attributes)
+
+def get_logging_settings(config: configparser.ConfigParser) -> dict[str, str]:
+    """
+    Reads the [logging] section of a config, filling in missing settings with LOGGING_DEFAULTS.
+
+    args:
+        config: The parsed config.
+
+    returns:
+        The logging settings by name.
+    """
+    settings = dict(LOGGING_DEFAULTS)
+    if config.has_section("logging"):
+        settings.update({name: value for name, value in config["logging"].items() if name in LOGGING_DEFAULTS})
+    return settings
+
+def start_logging(settings: dict[str, str] = None, logger: logging.Logger = None) -> QueueListener:
+    """
+    Sets up logging through a queue: the logger only puts records on an in-memory queue, and a
+    listener thread writes them to the console and to a rotating log file, so slow handlers
+    never block generation. The logger's level is the lowest level of the handlers, so records
+    no handler would write are dropped before they are created.
+
+    args:
+        settings: The logging settings, e.g. from get_logging_settings; defaults to LOGGING_DEFAULTS.
+        logger: The logger to attach the queue to; defaults to the root logger.
+
+    returns:
+        The started QueueListener; stop it before exiting to flush the queue.
+
+    raises:
+        ValueError: If a level is not a logging level name or a number is invalid.
+    """
+    settings = {**LOGGING_DEFAULTS, **(settings or {})}
+    logger = logger if logger is not None else logging.getLogger()
+    # Every setting is validated before the logger is touched, so a caller can retry with other settings
+    console_level = get_level(settings["level"])
+    file_level = get_level(settings["file_level"])
+    max_bytes = int(settings["max_bytes"])
+    backup_count = int(settings["backup_count"])
+    sample_rate = int(settings["sample_rate"])
+
+    console_handler = logging.StreamHandler()
+    rotating_file_handler = RotatingFileHandler(settings["file"], maxBytes=max_bytes, backupCount=backup_count, delay=True)
+    console_handler.setLevel(console_level)
+    rotating_file_handler.setLevel(file_level)
+    logging_format = logging.Formatter(LOGGING_FORMAT)
+    console_handler.setFormatter(logging_format)
+    rotating_file_handler.setFormatter(logging_format)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, console_handler, rotating_file_handler, respect_handler_level=True)
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(min(console_level, file_level))
+    set_entity_sampler(EntityEventSampler(sample_rate))
+    listener.start()
+    return listener
+
+def get_level(name: str) -> int:
+    """
+    Converts a logging level name, e.g. "DEBUG", into its number.
+
+    args:
+        name: The level name, in any case.
+
+    returns:
+        The level number.
+
+    raises:
+        ValueError: If the name is not a logging level.
+    """
+    level = logging.getLevelName(name.strip().upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Invalid logging level: {name}")
+    return level
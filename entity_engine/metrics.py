@@ -0,0 +1,279 @@
+import json, os, time
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Iterator
+
+# The stages of generation the instrumented code reports
+METRIC_STAGES: tuple[str, ...] = ("sample", "construct", "graph_insert", "io")
+
+# Timing histograms count calls in power-of-two buckets of microseconds per item: bucket 0 holds
+# calls under 1 us per item, bucket b calls of [2^(b-1), 2^b) us per item
+HISTOGRAM_BUCKETS: int = 24
+
+class StageStats:
+    __slots__ = ("calls", "items", "seconds", "min_seconds", "max_seconds", "histogram")
+
+    def __init__(self) -> None:
+        """
+        The timings of one stage for one entity type.
+        """
+        self.calls: int = 0
+        self.items: int = 0
+        self.seconds: float = 0.0
+        self.min_seconds: float = None
+        self.max_seconds: float = None
+        self.histogram: list[int] = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, seconds: float, items: int = 1) -> None:
+        """
+        Records one timed call.
+
+        args:
+            seconds: The duration of the call.
+            items: The number of items (e.g. entities) the call processed.
+        """
+        self.calls += 1
+        self.items += items
+        self.seconds += seconds
+        per_item = seconds / items if items > 0 else seconds
+        if self.min_seconds is None or per_item < self.min_seconds:
+            self.min_seconds = per_item
+        if self.max_seconds is None or per_item > self.max_seconds:
+            self.max_seconds = per_item
+        self.histogram[min(HISTOGRAM_BUCKETS - 1, int(per_item * 1e6).bit_length())] += 1
+
+    def merge(self, other: "StageStats") -> None:
+        """
+        Adds the calls recorded by another StageStats, e.g. one of a worker process.
+
+        args:
+            other: The StageStats to add.
+        """
+        self.calls += other.calls
+        self.items += other.items
+        self.seconds += other.seconds
+        if other.min_seconds is not None and (self.min_seconds is None or other.min_seconds < self.min_seconds):
+            self.min_seconds = other.min_seconds
+        if other.max_seconds is not None and (self.max_seconds is None or other.max_seconds > self.max_seconds):
+            self.max_seconds = other.max_seconds
+        self.histogram = [count + other_count for count, other_count in zip(self.histogram, other.histogram)]
+
+    def to_dict(self) -> dict:
+        return {"calls": self.calls, "items": self.items, "seconds": self.seconds, "min_seconds_per_item": self.min_seconds,
+                "max_seconds_per_item": self.max_seconds, "histogram_us": self.histogram}
+
+class Metrics:
+    def __init__(self) -> None:
+        """
+        Collects counters and timing histograms per stage and entity type. Instrumented code
+        only reports to the Metrics set with set_metrics, so none of this costs anything but a
+        None check unless profiling is on.
+        """
+        # (stage, entity type name) -> timings
+        self.stages: dict[tuple[str, str], StageStats] = {}
+        # (counter, entity type name) -> count
+        self.counters: dict[tuple[str, str], int] = {}
+        self.started: float = time.perf_counter()
+
+    def record(self, stage: str, entity_type: str, seconds: float, items: int = 1) -> None:
+        """
+        Records the duration of one call of a stage.
+
+        args:
+            stage: The stage, e.g. one of METRIC_STAGES.
+            entity_type: The name of the entity type the call worked on, or None.
+            seconds: The duration of the call.
+            items: The number of items the call processed.
+        """
+        key = (stage, entity_type)
+        stats = self.stages.get(key)
+        if stats is None:
+            stats = self.stages[key] = StageStats()
+        stats.add(seconds, items)
+
+    def increment(self, counter: str, entity_type: str = None, count: int = 1) -> None:
+        """
+        Adds to a counter.
+
+        args:
+            counter: The name of the counter.
+            entity_type: The name of the entity type counted, or None.
+            count: The amount to add.
+        """
+        key = (counter, entity_type)
+        self.counters[key] = self.counters.get(key, 0) + count
+
+    def merge(self, other: "Metrics") -> None:
+        """
+        Adds the timings and counters recorded by another Metrics, e.g. the one a worker process 
+        reported to. The wall time stays the one of this Metrics.
+
+        args:
+            other: The Metrics to add.
+        """
+        for key, other_stats in other.stages.items():
+            stats = self.stages.get(key)
+            if stats is None:
+                stats = self.stages[key] = StageStats()
+            stats.merge(other_stats)
+        for key, count in other.counters.items():
+            self.counters[key] = self.counters.get(key, 0) + count
+
+    @contextmanager
+    def time(self, stage: str, entity_type: str = None, items: int = 1) -> Iterator[None]:
+        """
+        Times the body of a with statement as one call of a stage.
+
+        args:
+            stage: The stage.
+            entity_type: The name of the entity type the body works on, or None.
+            items: The number of items the body processes.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, entity_type, time.perf_counter() - start, items)
+
+    def to_dict(self) -> dict:
+        """
+        Returns the metrics as plain data, e.g. for dumping as JSON.
+
+        returns:
+            A dictionary with the wall time since the metrics were created, the stage timings,
+            and the counters, each as a list of records.
+        """
+        return {
+            "wall_seconds": time.perf_counter() - self.started,
+            "stages": [{"stage": stage, "entity_type": entity_type, **stats.to_dict()}
+                       for (stage, entity_type), stats in sorted(self.stages.items(), key=self.__sort_key)],
+            "counters": [{"counter": counter, "entity_type": entity_type, "count": count}
+                         for (counter, entity_type), count in sorted(self.counters.items(), key=self.__sort_key)]
+        }
+
+    def write_json(self, file_path: str) -> None:
+        """
+        Dumps the metrics to a JSON file.
+
+        args:
+            file_path: Path of the file to write.
+        """
+        with open(file_path, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def format_table(self) -> str:
+        """
+        Formats the stage timings and counters as a plain text table, slowest stage first.
+
+        returns:
+            The table.
+        """
+        total = sum(stats.seconds for stats in self.stages.values()) or 1.0
+        lines = [f"{'stage':<14} {'type':<20} {'calls':>9} {'items':>10} {'total s':>9} {'share':>6} {'us/item':>9} {'min us':>9} {'max us':>9}"]
+        for (stage, entity_type), stats in sorted(self.stages.items(), key=lambda item: -item[1].seconds):
+            per_item = stats.seconds / stats.items if stats.items else stats.seconds
+            lines.append(f"{stage:<14} {entity_type or '*':<20} {stats.calls:>9} {stats.items:>10} {stats.seconds:>9.3f} "
+                         f"{stats.seconds / total:>6.1%} {per_item * 1e6:>9.1f} {stats.min_seconds * 1e6:>9.1f} {stats.max_seconds * 1e6:>9.1f}")
+        for (counter, entity_type), count in sorted(self.counters.items(), key=self.__sort_key):
+            lines.append(f"{counter:<14} {entity_type or '*':<20} {count:>9}")
+        lines.append(f"wall time: {time.perf_counter() - self.started:.3f} s")
+        return "\n".join(lines)
+
+    @staticmethod
+    def __sort_key(item: tuple[tuple[str, str], object]) -> tuple[str, str]:
+        (name, entity_type), _ = item
+        return name, entity_type or ""
+
+# The Metrics instrumented code reports to; None while profiling is off
+_metrics: Metrics = None
+
+def get_metrics() -> Metrics:
+    """
+    Returns the Metrics instrumented code reports to.
+
+    returns:
+        The Metrics, or None if profiling is off.
+    """
+    return _metrics
+
+def set_metrics(metrics: Metrics) -> None:
+    """
+    Turns profiling on by passing a Metrics to report to, or off by passing None.
+
+    args:
+        metrics: The Metrics, or None.
+    """
+    global _metrics
+    _metrics = metrics
+
+def timed(stage: str, entity_type: str = None, items: int = 1) -> ContextManager[None]:
+    """
+    Times the body of a with statement as one call of a stage if profiling is on. Meant for
+    coarse operations such as file I/O; hot paths check get_metrics themselves.
+
+    args:
+        stage: The stage.
+        entity_type: The name of the entity type the body works on, or None.
+        items: The number of items the body processes.
+
+    returns:
+        A context manager.
+    """
+    if _metrics is None:
+        return nullcontext()
+    return _metrics.time(stage, entity_type, items)
+
+class ProfileCapture:
+    def __init__(self, directory: str = "data/log/", cprofile: bool = False, tracemalloc: bool = False) -> None:
+        """
+        Captures a cProfile profile and/or tracemalloc snapshot of a run into files named after
+        the time the capture started.
+
+        args:
+            directory: The directory to write the captures to; created if missing.
+            cprofile: Whether to profile with cProfile; the stats are written as a .prof file.
+            tracemalloc: Whether to trace allocations; the final snapshot is written as a .snapshot file.
+        """
+        self.directory: str = directory
+        self.cprofile: bool = cprofile
+        self.tracemalloc: bool = tracemalloc
+        self.paths: list[str] = []
+        self.peak_bytes: int = None
+        self.__profiler = None
+        self.__name: str = None
+
+    def start(self) -> None:
+        """
+        Starts capturing.
+        """
+        self.__name = time.strftime("%Y-%m-%d_%H-%M-%S")
+        if self.tracemalloc:
+            import tracemalloc
+            tracemalloc.start()
+        if self.cprofile:
+            import cProfile
+            self.__profiler = cProfile.Profile()
+            self.__profiler.enable()
+
+    def stop(self) -> list[str]:
+        """
+        Stops capturing and writes the captures.
+
+        returns:
+            The paths of the files written.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        if self.__profiler is not None:
+            self.__profiler.disable()
+            path = os.path.join(self.directory, f"profile_{self.__name}.prof")
+            self.__profiler.dump_stats(path)
+            self.paths.append(path)
+            self.__profiler = None
+        if self.tracemalloc:
+            import tracemalloc
+            if tracemalloc.is_tracing():
+                _, self.peak_bytes = tracemalloc.get_traced_memory()
+                path = os.path.join(self.directory, f"tracemalloc_{self.__name}.snapshot")
+                tracemalloc.take_snapshot().dump(path)
+                tracemalloc.stop()
+                self.paths.append(path)
+        return self.paths
@@ -0,0 +1,181 @@
+from typing import Iterable, Iterator, Mapping
+
+from .entity_option import EntityOption, OptionTypes
+
+class OptionCatalog:
+    def __init__(self, options_list: Iterable[EntityOption] = None) -> None:
+        """
+        Assigns every EntityOption a small integer id, so that entities can store their
+        attributes as compact tuples/arrays of ids and resolve them back to options on demand.
+        Options are keyed by (type, name); the first option interned for a key keeps its id for
+        the lifetime of the catalog, so ids are stable as long as options are interned in the
+        same order.
+
+        args:
+            options_list: Optional EntityOption objects to intern up front.
+        """
+        self.__options: list[EntityOption] = []
+        self.__ids: dict[tuple[OptionTypes, str], int] = {}
+        # Incremented whenever an option is interned or replaced, so caches built from the catalog can tell they are stale
+        self.version: int = 0
+        if options_list is not None:
+            self.intern_all(options_list)
+
+    def __len__(self) -> int:
+        return len(self.__options)
+
+    def __contains__(self, option: EntityOption) -> bool:
+        return (option.type, option.name) in self.__ids
+
+    def __iter__(self) -> Iterator[EntityOption]:
+        return iter(self.__options)
+
+    def intern(self, option: EntityOption) -> int:
+        """
+        Returns the id of the passed option, assigning it the next free id if no option with
+        the same type and name has been interned yet. The id is also recorded on the option.
+
+        args:
+            option: The EntityOption to intern.
+
+        returns:
+            The id of the option.
+        """
+        key = (option.type, option.name)
+        id = self.__ids.get(key)
+        if id is None:
+            id = self.__ids[key] = len(self.__options)
+            self.__options.append(option)
+            self.version += 1
+        option.id = id
+        return id
+
+    def intern_all(self, options_list: Iterable[EntityOption]) -> list[int]:
+        """
+        Interns every option in the passed list.
+
+        args:
+            options_list: The EntityOption objects to intern.
+
+        returns:
+            A list of the ids of the options, in the same order.
+        """
+        return [self.intern(option) for option in options_list]
+
+    def replace(self, option: EntityOption) -> int:
+        """
+        Replaces the option stored for the passed option's type and name (e.g. after its
+        weight or description changed), keeping its id; interns it if it is new.
+
+        args:
+            option: The EntityOption to store.
+
+        returns:
+            The id of the option.
+        """
+        id = self.__ids.get((option.type, option.name))
+        if id is None:
+            return self.intern(option)
+        if self.__options[id] is not option:
+            self.__options[id] = option
+            self.version += 1
+        option.id = id
+        return id
+
+    def get_id(self, option: EntityOption) -> int:
+        """
+        Returns the id of an option that has already been interned.
+
+        args:
+            option: The EntityOption to look up.
+
+        returns:
+            The id of the option, or None if no option with its type and name has been interned.
+        """
+        # The id recorded on the option is only trusted if it is this catalog's option
+        id = option.id
+        if id is not None and id < len(self.__options) and self.__options[id] is option:
+            return id
+        return self.__ids.get((option.type, option.name))
+
+    def find_id(self, option_type: OptionTypes, name: str) -> int:
+        """
+        Returns the id of the option with the passed type and name.
+
+        args:
+            option_type: The OptionTypes of the option.
+            name: The name of the option.
+
+        returns:
+            The id of the option, or None if no such option has been interned.
+        """
+        return self.__ids.get((option_type, name))
+
+    def resolve(self, id: int) -> EntityOption:
+        """
+        Returns the option with the passed id.
+
+        args:
+            id: The id of the option.
+
+        returns:
+            The EntityOption with that id.
+        """
+        return self.__options[id]
+
+    def resolve_all(self, ids: Iterable[int]) -> tuple[EntityOption, ...]:
+        """
+        Returns the options with the passed ids.
+
+        args:
+            ids: The ids of the options.
+
+        returns:
+            A tuple of EntityOption objects, in the same order as the ids.
+        """
+        options = self.__options
+        return tuple(options[id] for id in ids)
+
+    def encode(self, attributes: Mapping[OptionTypes, Iterable[EntityOption]]) -> dict[OptionTypes, tuple[int, ...]]:
+        """
+        Converts attributes holding EntityOption objects to attributes holding option ids,
+        interning any options that are not in the catalog yet.
+
+        args:
+            attributes: The options of an entity per option type.
+
+        returns:
+            A dictionary of OptionTypes to tuples of option ids.
+        """
+        return {option_type: tuple(self.intern(option) for option in options) for option_type, options in attributes.items()}
+
+    def decode(self, attributes: Mapping[OptionTypes, Iterable[int]]) -> dict[OptionTypes, tuple[EntityOption, ...]]:
+        """
+        Converts attributes holding option ids back to attributes holding EntityOption objects.
+
+        args:
+            attributes: The option ids of an entity per option type.
+
+        returns:
+            A dictionary of OptionTypes to tuples of EntityOption objects.
+        """
+        return {option_type: self.resolve_all(ids) for option_type, ids in attributes.items()}
+
+    def __getstate__(self):
+        return (self.__options, self.version)
+
+    def __setstate__(self, state):
+        self.__options, self.version = state
+        self.__ids = {(option.type, option.name): id for id, option in enumerate(self.__options)}
+
+# The catalog the factories and stores use unless they are given their own
+default_catalog: OptionCatalog = OptionCatalog()
+
+def get_default_catalog() -> OptionCatalog:
+    """
+    Returns the process-wide OptionCatalog.
+
+    returns:
+        The default OptionCatalog.
+    """
+    return default_catalog
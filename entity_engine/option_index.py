@@ -0,0 +1,182 @@
+import random
+from itertools import accumulate
+
+from .entity_option import EntityOption, OptionTypes
+from .option_catalog import OptionCatalog, get_default_catalog
+
+class OptionSamplingIndex:
+    def __init__(self, options_list: list[EntityOption], catalog: OptionCatalog = None) -> None:
+        """
+        Compiles an options list into a per-OptionTypes sampling index so that weighted
+        draws do not need to rescan the whole options list or rebuild the weights list.
+
+        args:
+            options_list: A list of EntityOption objects to compile.
+            catalog: The OptionCatalog to intern the options in; defaults to the process-wide catalog.
+        """
+        self.catalog: OptionCatalog = catalog if catalog is not None else get_default_catalog()
+        self.__options: dict[OptionTypes, tuple[EntityOption, ...]] = {}
+        self.__ids: dict[OptionTypes, tuple[int, ...]] = {}
+        self.__cum_weights: dict[OptionTypes, list[float]] = {}
+        self.build(options_list)
+
+    def build(self, options_list: list[EntityOption]) -> None:
+        """
+        (Re)builds the index from the passed options list, grouping the options by type,
+        interning them in the catalog, and precomputing the cumulative weights used for the 
+        O(log n) bisect draws.
+
+        args:
+            options_list: A list of EntityOption objects to compile.
+        """
+        grouped: dict[OptionTypes, list[EntityOption]] = {}
+        for option in options_list:
+            grouped.setdefault(option.type, []).append(option)
+
+        self.__options = {option_type: tuple(options) for option_type, options in grouped.items()}
+        self.__ids = self.__intern(self.__options)
+        self.__cum_weights = {option_type: list(accumulate(opt.weight for opt in options))
+                              for option_type, options in grouped.items()}
+        self.__size = len(options_list)
+
+    @classmethod
+    def from_compiled(cls, options: dict[OptionTypes, tuple[EntityOption, ...]], cum_weights: dict[OptionTypes, list[float]], 
+                      catalog: OptionCatalog = None) -> "OptionSamplingIndex":
+        """
+        Creates an index from the grouped options and cumulative weights of another index (see
+        get_compiled), e.g. loaded from a cache, interning the options in the passed catalog.
+
+        args:
+            options: The options of every OptionTypes, in options list order.
+            cum_weights: The cumulative weights aligned with the options.
+            catalog: The OptionCatalog to intern the options in; defaults to the process-wide catalog.
+
+        returns:
+            The OptionSamplingIndex.
+        """
+        sampling_index = cls.__new__(cls)
+        sampling_index.__options = options
+        sampling_index.__cum_weights = cum_weights
+        sampling_index.__size = sum(len(type_options) for type_options in options.values())
+        sampling_index.rebind(catalog if catalog is not None else get_default_catalog())
+        return sampling_index
+
+    def get_compiled(self) -> tuple[dict[OptionTypes, tuple[EntityOption, ...]], dict[OptionTypes, list[float]]]:
+        """
+        Returns the compiled tables of the index, which do not depend on the catalog.
+
+        returns:
+            A tuple of the options of every OptionTypes and their cumulative weights.
+        """
+        return self.__options, self.__cum_weights
+
+    def rebind(self, catalog: OptionCatalog) -> None:
+        """
+        Moves the index to another catalog, e.g. after it was unpickled from a cache, interning
+        its options there. The grouped options and cumulative weights are kept as they are.
+
+        args:
+            catalog: The OptionCatalog to intern the options in.
+        """
+        self.catalog = catalog
+        self.__ids = self.__intern(self.__options)
+
+    def __intern(self, options: dict[OptionTypes, tuple[EntityOption, ...]]) -> dict[OptionTypes, tuple[int, ...]]:
+        # Only the last option of each (type, name) is stored in the catalog; storing every duplicate
+        # in turn would swap the stored option, and bump the catalog version, on every build
+        last: dict[tuple[OptionTypes, str], EntityOption] = {(option.type, option.name): option 
+                                                             for type_options in options.values() for option in type_options}
+        ids: dict[tuple[OptionTypes, str], int] = {key: self.catalog.replace(option) for key, option in last.items()}
+        for type_options in options.values():
+            for option in type_options:
+                option.id = ids[(option.type, option.name)]
+        return {option_type: tuple(option.id for option in type_options) for option_type, type_options in options.items()}
+
+    def __contains__(self, option_type: OptionTypes) -> bool:
+        return option_type in self.__options
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def get_options(self, option_type: OptionTypes) -> tuple[EntityOption, ...]:
+        """
+        Returns the options of the passed type in the order they appear in the options list.
+
+        args:
+            option_type: The OptionTypes to look up.
+
+        returns:
+            A tuple of EntityOption objects, empty if the type has no options.
+        """
+        return self.__options.get(option_type, ())
+
+    def get_ids(self, option_type: OptionTypes) -> tuple[int, ...]:
+        """
+        Returns the catalog ids of the options of the passed type.
+
+        args:
+            option_type: The OptionTypes to look up.
+
+        returns:
+            A tuple of option ids aligned with get_options(option_type).
+        """
+        return self.__ids.get(option_type, ())
+
+    def get_cum_weights(self, option_type: OptionTypes) -> list[float]:
+        """
+        Returns the cumulative weights of the options of the passed type.
+
+        args:
+            option_type: The OptionTypes to look up.
+
+        returns:
+            A list of cumulative weights aligned with get_options(option_type).
+        """
+        return self.__cum_weights.get(option_type, [])
+
+    def get_option_types(self) -> set[OptionTypes]:
+        """
+        Returns the option types that have at least one option in the index.
+
+        returns:
+            A set of OptionTypes.
+        """
+        return set(self.__options)
+
+    def sample(self, option_type: OptionTypes, k: int = 1, rng: random.Random = None) -> list[EntityOption]:
+        """
+        Draws k options of the passed type with replacement, weighted by EntityOption.weight.
+
+        args:
+            option_type: The OptionTypes to draw from.
+            k: The number of options to draw.
+            rng: The random number generator to draw with; defaults to the global random module.
+
+        returns:
+            A list of k EntityOption objects, empty if the type has no options.
+        """
+        options = self.__options.get(option_type)
+        if not options or k <= 0:
+            return []
+
+        rng = rng or random
+        return rng.choices(options, cum_weights=self.__cum_weights[option_type], k=k)
+
+    def sample_ids(self, option_type: OptionTypes, k: int = 1, rng: random.Random = None) -> list[int]:
+        """
+        Draws k options of the passed type like sample, returning their catalog ids.
+
+        args:
+            option_type: The OptionTypes to draw from.
+            k: The number of options to draw.
+            rng: The random number generator to draw with; defaults to the global random module.
+
+        returns:
+            A list of k option ids, empty if the type has no options.
+        """
+        ids = self.__ids.get(option_type)
+        if not ids or k <= 0:
+            return []
+
+        rng = rng or random
+        return rng.choices(ids, cum_weights=self.__cum_weights[option_type], k=k)
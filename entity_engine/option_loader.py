@@ -0,0 +1,338 @@
+import csv, io, json, logging, os
+from itertools import islice
+from typing import Callable, Iterable, Iterator
+
+from .entity_option import EntityOption, EntityOptionListFlag, OptionTypes
+from .option_catalog import OptionCatalog
+
+# Columns of an options file that hold lists; in CSV files their values are comma-separated
+LIST_FIELDS: tuple[str, ...] = ("exclusive", "requirements", "specializations")
+
+# Called after every chunk with the number of records, the bytes read, and the size of the file
+ProgressCallback = Callable[[int, int, int], None]
+
+def load_options_file(input_file_path: str, options_list: list[EntityOption], flag: EntityOptionListFlag = EntityOptionListFlag.ADD,
+                      chunk_size: int = 10_000, progress: ProgressCallback = None, catalog: OptionCatalog = None) -> int:
+    """
+    Streams options from a CSV, JSON, or JSON Lines file into options_list in O(n). The file is 
+    read incrementally and processed in chunks of records, so memory use beyond the options 
+    themselves stays bounded no matter how large the file is.
+
+    args:
+        input_file_path: Path to the input options file.
+        options_list: The list of EntityOption objects to add the options to, in place.
+        flag: Whether to add to (upserting options with the same type and name) or override the list.
+        chunk_size: The number of records to process between progress reports.
+        progress: Optional callback reporting the progress after every chunk.
+        catalog: Optional OptionCatalog to intern the loaded options in as they are read.
+
+    returns:
+        The number of records read.
+
+    raises:
+        FileNotFoundError: If the specified file does not exist.
+        ValueError: If the file format is invalid or the data cannot be parsed.
+    """
+    reader = OptionRecordReader(input_file_path)
+    report = None
+    if progress is not None:
+        report = lambda count: progress(count, reader.bytes_read, reader.total_bytes)
+    return load_option_records(reader, options_list, flag, reader.file_format, chunk_size, report, catalog)
+
+def get_options_file_format(input_file_path: str) -> str:
+    """
+    Determines the format of an options file from its extension.
+
+    args:
+        input_file_path: Path to the input options file.
+
+    returns:
+        "CSV", "JSON", or "JSONL".
+
+    raises:
+        ValueError: If the extension is not a supported format.
+    """
+    if input_file_path.endswith(".csv"):
+        return "CSV"
+    if input_file_path.endswith(".json"):
+        return "JSON"
+    if input_file_path.endswith((".jsonl", ".ndjson")):
+        return "JSONL"
+
+    logger = logging.getLogger(__name__)
+    err_msg = f"Unsupported file format: {input_file_path}"
+    logger.error(err_msg)
+    raise ValueError(err_msg)
+
+def iter_option_records(input_file_path: str) -> Iterator[dict]:
+    """
+    Iterates over the records of a CSV, JSON, or JSON Lines options file as dictionaries, with 
+    the list fields of CSV rows split into lists.
+
+    args:
+        input_file_path: Path to the input options file.
+
+    returns:
+        An iterator of option records.
+
+    raises:
+        FileNotFoundError: If the specified file does not exist.
+        ValueError: If the file format is not supported or the file is not valid JSON.
+    """
+    return iter(OptionRecordReader(input_file_path))
+
+class OptionRecordReader:
+    def __init__(self, input_file_path: str, buffer_size: int = 1 << 20) -> None:
+        """
+        Streams the records of an options file. CSV and JSON Lines files are read row by row; 
+        the top-level array of a JSON file is decoded one element at a time from a buffer of 
+        at most a few buffer_size reads, instead of loading the whole document.
+
+        args:
+            input_file_path: Path to the input options file.
+            buffer_size: The number of characters to read from a JSON file at a time.
+
+        raises:
+            FileNotFoundError: If the specified file does not exist.
+            ValueError: If the file format is not supported.
+        """
+        self.file_format: str = get_options_file_format(input_file_path)
+        if not os.path.exists(input_file_path):
+            raise FileNotFoundError(f"Input options file not found at {input_file_path}.")
+        self.input_file_path: str = input_file_path
+        self.buffer_size: int = buffer_size
+        self.total_bytes: int = os.path.getsize(input_file_path)
+        self.__file: io.TextIOWrapper = None
+
+    @property
+    def bytes_read(self) -> int:
+        """
+        The number of bytes of the file read so far (up to the read-ahead of the file buffer).
+        """
+        if self.__file is None or self.__file.closed:
+            return self.total_bytes if self.__file is not None else 0
+        return self.__file.buffer.tell()
+
+    def __iter__(self) -> Iterator[dict]:
+        with open(self.input_file_path, 'r', newline='' if self.file_format == "CSV" else None) as file:
+            self.__file = file
+            if self.file_format == "CSV":
+                yield from self.__iter_csv(file)
+            elif self.file_format == "JSONL":
+                yield from self.__iter_json_lines(file)
+            else:
+                yield from self.__iter_json_array(file)
+
+    def __iter_csv(self, file: io.TextIOWrapper) -> Iterator[dict]:
+        for row in csv.DictReader(file):
+            for list_field in LIST_FIELDS:
+                if row.get(list_field):
+                    row[list_field] = row[list_field].split(',')
+            yield row
+
+    def __iter_json_lines(self, file: io.TextIOWrapper) -> Iterator[dict]:
+        for line_number, line in enumerate(file, 1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"Invalid JSON on line {line_number}: {e}")
+
+    def __iter_json_array(self, file: io.TextIOWrapper) -> Iterator[dict]:
+        decoder = json.JSONDecoder()
+        buffer = ""
+        position = 0
+        eof = False
+        started = False
+
+        while True:
+            # Skip whitespace and the separators between elements
+            while position < len(buffer) and (buffer[position].isspace() or (started and buffer[position] == ',')):
+                position += 1
+            if position >= len(buffer) or (not eof and len(buffer) - position < self.buffer_size // 2):
+                if not eof:
+                    chunk = file.read(self.buffer_size)
+                    eof = not chunk
+                    buffer = buffer[position:] + chunk
+                    position = 0
+                    continue
+                if position >= len(buffer):
+                    raise ValueError("Invalid JSON data: unexpected end of file")
+
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError("Invalid JSON data: the options must be a top-level array")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                return
+
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise ValueError(f"Invalid JSON data: {e}")
+                # The element continues past the buffer; read more of the file and try again
+                chunk = file.read(self.buffer_size)
+                eof = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            yield record
+            position = end
+
+def load_option_records(records: Iterable[dict], options_list: list[EntityOption], flag: EntityOptionListFlag = EntityOptionListFlag.ADD,
+                        file_format: str = "options", chunk_size: int = 10_000, progress: Callable[[int], None] = None, 
+                        catalog: OptionCatalog = None) -> int:
+    """
+    Upserts option records into options_list. The first pass parses every record and upserts
+    it through a dictionary keyed by (type, name) in O(1); the exclusive and specialization
+    references are only resolved in a second pass, once every option in the file is known,
+    so they may refer to options that appear later in the file. Records are consumed in 
+    chunks, so a streaming iterator is never read further ahead than one chunk.
+
+    args:
+        records: The option records, e.g. from iter_option_records.
+        options_list: The list of EntityOption objects to add the options to, in place.
+        flag: Whether to add to (upserting options with the same type and name) or override the list.
+        file_format: The name of the format of the records, for error messages.
+        chunk_size: The number of records to process between progress reports.
+        progress: Optional callback called with the number of records processed after every chunk.
+        catalog: Optional OptionCatalog to intern the upserted options in.
+
+    returns:
+        The number of records read.
+
+    raises:
+        ValueError: If a record is missing a field or holds invalid data.
+    """
+    logger = logging.getLogger(__name__)
+    if flag == EntityOptionListFlag.OVERRIDE:
+        options_list.clear()
+
+    index: dict[tuple[OptionTypes, str], EntityOption] = {(option.type, option.name): option for option in options_list}
+    pending_references: list[tuple[EntityOption, list[str], list[str]]] = []
+    count = 0
+    records = iter(records)
+    while chunk := list(islice(records, max(1, chunk_size))):
+        for record in chunk:
+            try:
+                option, exclusive_names, specialization_names = parse_option_record(record)
+            except (KeyError, TypeError) as e:
+                err_msg = f"Invalid {file_format} data: {e}"
+                logger.error(err_msg)
+                raise ValueError(err_msg)
+            except ValueError as e:
+                err_msg = f"Invalid data in {file_format}: {e}"
+                logger.error(err_msg)
+                raise ValueError(err_msg)
+
+            option = upsert_entity_option(option, options_list, index)
+            if catalog is not None:
+                catalog.replace(option)
+            if exclusive_names or specialization_names:
+                pending_references.append((option, exclusive_names, specialization_names))
+
+        count += len(chunk)
+        if progress is not None:
+            progress(count)
+
+    resolve_option_references(pending_references, options_list)
+    return count
+
+def parse_option_record(record: dict) -> tuple[EntityOption, list[str], list[str]]:
+    """
+    Parses one option record. Missing or empty fields fall back to their defaults.
+
+    args:
+        record: The option record, with its list fields as lists.
+
+    returns:
+        A tuple of the EntityOption (without its exclusive options and specializations) and the
+        names of its exclusive options and specializations.
+
+    raises:
+        KeyError: If the record has no type or name, or the type is not an OptionTypes member.
+        ValueError: If a numeric field cannot be parsed.
+    """
+    option = EntityOption(
+        type = OptionTypes[record['type']],
+        name = record['name'],
+        description = record.get('description') or '',
+        weight = float(record.get('weight') or 1.0),
+        min = int(record.get('min') or 1),
+        max = int(record.get('max') or 1),
+        requirements = list(record.get('requirements') or [])
+    )
+    return option, list(record.get('exclusive') or []), list(record.get('specializations') or [])
+
+def upsert_entity_option(option: EntityOption, options_list: list[EntityOption], index: dict[tuple[OptionTypes, str], EntityOption] = None) -> EntityOption:
+    """
+    Updates the option in options_list with the same type and name as the passed option, or
+    appends the passed option if there is none.
+
+    args:
+        option: The EntityOption to upsert.
+        options_list: The list of EntityOption objects to upsert into.
+        index: Optional dictionary of (type, name) to the options in options_list, kept up to
+               date by the upsert; without it the list is scanned.
+
+    returns:
+        The option now in options_list.
+    """
+    key = (option.type, option.name)
+    if index is not None:
+        existing_option = index.get(key)
+    else:
+        existing_option = next((opt for opt in options_list if (opt.type, opt.name) == key), None)
+
+    if existing_option is None:
+        options_list.append(option)
+        if index is not None:
+            index[key] = option
+        return option
+
+    # Update existing option with new values
+    existing_option.description = option.description
+    existing_option.weight = option.weight
+    existing_option.min = option.min
+    existing_option.max = option.max
+    existing_option.mutually_exclusive.extend(option.mutually_exclusive)
+    existing_option.requirements += option.requirements
+    existing_option.specilizations.extend(option.specilizations)
+    return existing_option
+
+def resolve_option_references(pending_references: list[tuple[EntityOption, list[str], list[str]]], options_list: list[EntityOption]) -> None:
+    """
+    Resolves the exclusive option and specialization names of loaded options against the
+    complete options list. Exclusive options are matched by name alone, specializations by
+    name among the SPECIALIZATION options; unknown specializations get a new option of their
+    own, as before, while unknown exclusive options are logged and skipped.
+
+    args:
+        pending_references: Tuples of an option and the names of its exclusive options and specializations.
+        options_list: The complete list of EntityOption objects.
+    """
+    if not pending_references:
+        return
+
+    logger = logging.getLogger(__name__)
+    by_name: dict[str, EntityOption] = {}
+    for option in options_list:
+        by_name.setdefault(option.name, option)
+    specializations_by_name: dict[str, EntityOption] = {option.name: option for option in options_list
+                                                        if option.type == OptionTypes.SPECIALIZATION}
+
+    for option, exclusive_names, specialization_names in pending_references:
+        for name in exclusive_names:
+            exclusive_option = by_name.get(name)
+            if exclusive_option is not None:
+                option.mutually_exclusive.append(exclusive_option)
+            else:
+                logger.warning(f"Unknown exclusive option '{name}' of '{option.name}' ignored")
+        for name in specialization_names:
+            specialization = specializations_by_name.get(name)
+            if specialization is None:
+                specialization = specializations_by_name[name] = EntityOption(name=name, type=OptionTypes.SPECIALIZATION)
+            option.specilizations.append(specialization)
@@ -0,0 +1,34 @@
+import importlib
+from types import ModuleType
+
+_MISSING = object()
+_modules: dict[str, ModuleType | object] = {}
+
+def import_optional(name: str) -> ModuleType | None:
+    """
+    Imports an optional dependency on first use rather than when the package is imported, 
+    since heavy modules such as NumPy would otherwise dominate the startup time of the CLI.
+
+    args:
+        name: The name of the module to import.
+
+    returns:
+        The module, or None if it is not installed.
+    """
+    module = _modules.get(name)
+    if module is None:
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            module = _MISSING
+        _modules[name] = module
+    return None if module is _MISSING else module
+
+def get_numpy() -> ModuleType | None:
+    """
+    Returns NumPy, importing it on first use.
+
+    returns:
+        The numpy module, or None if it is not installed.
+    """
+    return import_optional("numpy")
@@ -1,3 +1,4 @@
+import random
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -22,7 +23,7 @@ class OrganizationAttributes(Enum):
     TECHNOLOGICAL = 8
     MAGICAL = 9 
 
-@dataclass(frozen=True, kw_only=True)
+@dataclass(frozen=True, kw_only=True, slots=True)
 class Organization(Entity):
     type: OrganizationType = field(default=OrganizationType.GOVERNMENT)
     #leader: Person - connected by graph
@@ -34,8 +35,8 @@ class Organization(Entity):
     # Factions	FactionID, OrganizationID, Name, Alignment, PowerLevel
     # Relations	RelationID, OrganizationID1, OrganizationID2, Type (ally/rival/enemy), Status
 
-    def __post_init__(self):
-        super().__post_init__()
+    def __post_init__(self, rng: random.Random = None):
+        super(Organization, self).__post_init__(rng)
 
     def __hash__(self):
-        return hash((self.id, self.name, self.type)) 
\ No newline at end of file
+        return self._hash
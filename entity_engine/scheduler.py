@@ -0,0 +1,288 @@
+import logging, random
+from concurrent.futures import Executor
+from typing import NamedTuple
+
+from .entity import Entity
+from .entity_factory import EntityFactory
+from .entity_graph import EntityGraph
+from .entity_option import EntityOption
+from .entity_id import get_stream_id
+from .entity_rng import get_entity_rng
+from .entity_tracker import EntityTypes
+from .log_config import log_entities
+from .metrics import get_metrics
+from .generation import APPLICABLE_OPTION_TYPES, _generate_sharded, get_factory
+from .gpe import GeoPoliticalEntity
+from .location import Location
+from .organization import Organization
+from .person import Person
+
+class EntityDependency(NamedTuple):
+    # The name of the related entity, e.g. "location"
+    role: str
+    # The class of the related entity
+    entity_type: type[Entity]
+    # Whether the related entity is passed to the constructor under the role name, or only connected by an edge
+    constructor_argument: bool = True
+    # Whether an entity that is already planned or in the graph may be shared, instead of creating one per dependent
+    reuse: bool = False
+    # The role of another dependency of the same entity to connect this one to
+    linked_to: str = None
+
+# The entities each composite entity needs, in the order they are created. A GeoPoliticalEntity
+# is composed of its own location and organization; an organization is led by a person from its
+# headquarters, both connected by the graph and shared with the rest of the world when possible.
+ENTITY_DEPENDENCIES: dict[type[Entity], tuple[EntityDependency, ...]] = {
+    GeoPoliticalEntity: (
+        EntityDependency("location", Location, linked_to="organization"),
+        EntityDependency("organization", Organization)
+    ),
+    Organization: (
+        EntityDependency("headquarters", Location, constructor_argument=False, reuse=True),
+        EntityDependency("leader", Person, constructor_argument=False, reuse=True)
+    )
+}
+
+class GenerationScheduler:
+    def __init__(self, dependencies: dict[type[Entity], tuple[EntityDependency, ...]] = None) -> None:
+        """
+        Generates worlds of composite entities by modelling the entities they need as a DAG of
+        entity classes. The plan is expanded into the number of entities to create per class,
+        the classes are generated level by level from the leaves up, every class without
+        constructor dependencies in a level is generated in one batch (sharded across worker
+        processes), and the edges of the whole run are wired into the graph in bulk.
+
+        args:
+            dependencies: The dependencies of each entity class; defaults to ENTITY_DEPENDENCIES.
+        """
+        self.dependencies: dict[type[Entity], tuple[EntityDependency, ...]] = dependencies if dependencies is not None else ENTITY_DEPENDENCIES
+
+    def get_levels(self, entity_types: list[type[Entity]]) -> list[list[type[Entity]]]:
+        """
+        Orders the passed entity classes and everything they depend on into levels, so that
+        every class only depends on classes of earlier levels.
+
+        args:
+            entity_types: The entity classes to generate.
+
+        returns:
+            The entity classes of each level, leaves first.
+
+        raises:
+            ValueError: If the dependencies contain a cycle.
+        """
+        depths: dict[type[Entity], int] = {}
+        visiting: set[type[Entity]] = set()
+
+        def get_depth(entity_type: type[Entity]) -> int:
+            if entity_type in depths:
+                return depths[entity_type]
+            if entity_type in visiting:
+                raise ValueError(f"Cyclic entity dependency on {entity_type.__name__}")
+            visiting.add(entity_type)
+            depth = 1 + max((get_depth(dependency.entity_type) for dependency in self.dependencies.get(entity_type, ())), default=-1)
+            visiting.discard(entity_type)
+            depths[entity_type] = depth
+            return depth
+
+        for entity_type in entity_types:
+            get_depth(entity_type)
+
+        levels: list[list[type[Entity]]] = [[] for _ in range(1 + max(depths.values(), default=-1))]
+        for entity_type, depth in depths.items():
+            levels[depth].append(entity_type)
+        return levels
+
+    def plan(self, counts: dict[type[Entity], int], entities: EntityGraph = None) -> dict[type[Entity], int]:
+        """
+        Expands the requested counts into the number of entities to create per class, including
+        the dependencies of the composite entities. A dependency that may be reused only adds
+        entities when the plan creates none of its class and the graph holds none either.
+
+        args:
+            counts: The number of entities requested per entity class.
+            entities: Optional graph whose entities reusable dependencies may be drawn from.
+
+        returns:
+            The number of entities to create per entity class, in generation order.
+
+        raises:
+            TypeError: If an entity class cannot be generated.
+            ValueError: If the dependencies contain a cycle.
+        """
+        for entity_type in counts:
+            if entity_type not in APPLICABLE_OPTION_TYPES:
+                raise TypeError(f"Invalid entity type: {entity_type}")
+
+        levels = self.get_levels([entity_type for entity_type, count in counts.items() if count > 0])
+        needed: dict[type[Entity], int] = {entity_type: counts.get(entity_type, 0) for level in levels for entity_type in level}
+        # Dependents come before their dependencies, so their final counts are known first
+        for level in reversed(levels):
+            for entity_type in level:
+                reuse_demand = 0
+                for dependent, dependency in self.__iter_dependents(entity_type, needed):
+                    if dependency.reuse:
+                        reuse_demand = max(reuse_demand, needed[dependent])
+                    else:
+                        needed[entity_type] += needed[dependent]
+                if reuse_demand and not needed[entity_type] and not self.__count_existing(entities, entity_type):
+                    needed[entity_type] = reuse_demand
+        return needed
+
+    def run(self, entities: EntityGraph, counts: dict[type[Entity], int], options_list: list[EntityOption], workers: int = 1,
+            seed: int = None, offsets: dict[type[Entity], int] = None) -> dict[type[Entity], int]:
+        """
+        Generates the requested entities along with the entities they depend on and adds them
+        and the edges between them to the graph. With a seed every entity is created from its
+        own random stream, at consecutive indices per entity class starting at offsets, so the
+        world does not depend on the number of workers.
+
+        args:
+            entities: The EntityGraph to add the entities to.
+            counts: The number of entities requested per entity class.
+            options_list: A list of EntityOption objects to use for randomization.
+            workers: The number of worker processes to shard each batch across.
+            seed: Optional seed of the world.
+            offsets: The index to start at per entity class, e.g. the number of entities each
+                     class of the seeded world already holds; defaults to 0.
+
+        returns:
+            The number of entities created per entity class, including dependencies.
+
+        raises:
+            TypeError: If an entity class cannot be generated.
+            ValueError: If the dependencies contain a cycle.
+        """
+        created, edges = self.generate(counts, options_list, workers, seed, offsets, entities)
+        logger = logging.getLogger(__name__)
+        metrics = get_metrics()
+        for entity_type, generated in created.items():
+            log_entities(logger, generated)
+            if metrics is not None:
+                metrics.increment("generated", entity_type.__name__, len(generated))
+            entities.add_nodes(generated)
+        entities.add_edges(edges)
+        return {entity_type: len(generated) for entity_type, generated in created.items()}
+
+    def generate(self, counts: dict[type[Entity], int], options_list: list[EntityOption], workers: int = 1, seed: int = None,
+                 offsets: dict[type[Entity], int] = None, entities: EntityGraph = None, 
+                 executor: Executor = None) -> tuple[dict[type[Entity], list[Entity]], list[tuple[Entity, Entity]]]:
+        """
+        Generates the requested entities along with the entities they depend on, like run, but
+        returns them and the edges between them instead of adding them to a graph.
+
+        args:
+            counts: The number of entities requested per entity class.
+            options_list: A list of EntityOption objects to use for randomization.
+            workers: The number of worker processes to shard each batch across.
+            seed: Optional seed of the world.
+            offsets: The index to start at per entity class; defaults to 0.
+            entities: Optional graph whose entities reusable dependencies may be drawn from.
+            executor: Optional process pool to shard the batches across, e.g. one kept open 
+                      across calls; each batch starts a pool of its own otherwise.
+
+        returns:
+            A tuple of the created entities per entity class, in generation order, and the edges
+            between them (and the graph entities they reuse).
+
+        raises:
+            TypeError: If an entity class cannot be generated.
+            ValueError: If the dependencies contain a cycle.
+        """
+        needed = self.plan(counts, entities)
+        offsets = offsets or {}
+        rng = random.Random(seed)
+        created: dict[type[Entity], list[Entity]] = {}
+        existing: dict[type[Entity], list[Entity]] = {}
+        # The next created entity of each class to hand to a dependent; the requested entities come
+        # first, then the entities created for dependents of their own, then those created for reuse
+        cursors: dict[tuple[type[Entity], bool], int] = {}
+        for entity_type in needed:
+            own_demand = sum(needed[dependent] for dependent, dependency in self.__iter_dependents(entity_type, needed) if not dependency.reuse)
+            cursors[(entity_type, False)] = counts.get(entity_type, 0)
+            cursors[(entity_type, True)] = counts.get(entity_type, 0) + own_demand
+        edges: list[tuple[Entity, Entity]] = []
+
+        for level in self.get_levels(list(needed)):
+            batch_counts = {entity_type: needed[entity_type] for entity_type in level
+                            if needed[entity_type] and not any(dependency.constructor_argument for dependency in self.dependencies.get(entity_type, ()))}
+            if batch_counts:
+                results = _generate_sharded(batch_counts, options_list, workers, seed, offsets, executor)
+                for entity_type in batch_counts:
+                    created[entity_type] = [entity for result in results if entity_type in result for entity in result[entity_type][0]]
+
+            for entity_type in level:
+                if not needed[entity_type]:
+                    created.setdefault(entity_type, [])
+                    continue
+                if entity_type in batch_counts:
+                    for entity in created[entity_type]:
+                        self.__connect(entity, self.__assign(entity_type, entities, created, existing, cursors, rng), edges)
+                    continue
+
+                # Composite entities take their dependencies as constructor arguments, so they are created one at a time
+                factory: EntityFactory = get_factory(entity_type, options_list)
+                stream: str = entity_type.__name__
+                offset = offsets.get(entity_type, 0)
+                composites: list[Entity] = []
+                for index in range(needed[entity_type]):
+                    related = self.__assign(entity_type, entities, created, existing, cursors, rng)
+                    kwargs = {dependency.role: entity for dependency, entity in related if dependency.constructor_argument}
+                    if seed is not None:
+                        kwargs["rng"] = get_entity_rng(seed, stream, offset + index)
+                        kwargs["id"] = get_stream_id(stream, offset + index)
+                    entity = factory.create_random_entity(options_list, **kwargs)
+                    self.__connect(entity, related, edges)
+                    composites.append(entity)
+                created[entity_type] = composites
+
+        return {entity_type: created[entity_type] for entity_type in needed if created[entity_type]}, edges
+
+    def __iter_dependents(self, entity_type: type[Entity], planned: dict[type[Entity], int]):
+        for dependent, dependencies in self.dependencies.items():
+            for dependency in dependencies:
+                if dependency.entity_type == entity_type and dependent in planned:
+                    yield dependent, dependency
+
+    def __count_existing(self, entities: EntityGraph, entity_type: type[Entity]) -> int:
+        if entities is None:
+            return 0
+        try:
+            entity_type = EntityTypes(entity_type)
+        except ValueError:
+            return 0
+        return entities.count(entity_type)
+
+    def __assign(self, entity_type: type[Entity], entities: EntityGraph, created: dict[type[Entity], list[Entity]],
+                 existing: dict[type[Entity], list[Entity]], cursors: dict[tuple[type[Entity], bool], int], 
+                 rng: random.Random) -> list[tuple[EntityDependency, Entity]]:
+        """
+        Picks the related entities of one entity: the next unassigned created entity of each
+        dependency's class, or for reusable dependencies a random entity of the plan, or of the
+        graph if the plan creates none, once no entity created for reuse is left.
+        """
+        related: list[tuple[EntityDependency, Entity]] = []
+        for dependency in self.dependencies.get(entity_type, ()):
+            pool = created[dependency.entity_type]
+            key = (dependency.entity_type, dependency.reuse)
+            cursor = cursors[key]
+            if cursor < len(pool):
+                related.append((dependency, pool[cursor]))
+                cursors[key] = cursor + 1
+                continue
+            if not dependency.reuse:
+                raise RuntimeError(f"No {dependency.entity_type.__name__} left for the {dependency.role} of a {entity_type.__name__}")
+            if not pool:
+                if dependency.entity_type not in existing:
+                    existing[dependency.entity_type] = list(entities.iter_type(EntityTypes(dependency.entity_type)))
+                pool = existing[dependency.entity_type]
+            related.append((dependency, rng.choice(pool)))
+        return related
+
+    def __connect(self, entity: Entity, related: list[tuple[EntityDependency, Entity]], edges: list[tuple[Entity, Entity]]) -> None:
+        by_role: dict[str, Entity] = {dependency.role: related_entity for dependency, related_entity in related}
+        for dependency, related_entity in related:
+            if dependency.linked_to is not None and dependency.linked_to in by_role:
+                edges.append((related_entity, by_role[dependency.linked_to]))
+        for _, related_entity in related:
+            edges.append((related_entity, entity))
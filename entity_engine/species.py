@@ -1,3 +1,4 @@
+import random
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -12,21 +13,49 @@ class SpeciesAttributes(Enum):
     HAS_WINGS = 4
     CAN_FLY = 5
 
-@dataclass(frozen=True, kw_only=True)
+# Age ranges shared by reference (so never mutated) by every entity of a species, keyed by the species 
+# option's (min, max); changing an option's min or max changes its key, so stale tables are never returned
+_age_ranges_cache: dict[tuple[int, int], dict[str, tuple[int, int]]] = {}
+
+def get_age_ranges(race_attr: EntityOption) -> dict[str, tuple[int, int]]:
+    """
+    Returns the age ranges of a species, computing them only the first time a species with the 
+    same min and max ages is seen.
+
+    args:
+        race_attr: The race/species 'EntityOption'
+
+    returns:
+        The shared dictionary of age descriptor to (min, max) integer ages
+    """
+    key = (race_attr.min, race_attr.max)
+    age_ranges = _age_ranges_cache.get(key)
+    if age_ranges is None:
+        age_ranges = _age_ranges_cache[key] = Species.determine_age_ranges(race_attr)
+    return age_ranges
+
+def clear_age_ranges_cache() -> None:
+    """
+    Drops every cached age range table.
+    """
+    _age_ranges_cache.clear()
+
+@dataclass(frozen=True, kw_only=True, slots=True)
 class Species(Entity):
-    species_traits: list[SpeciesAttributes] = field(default_factory=list)
-    age_ranges: dict[str, tuple[int, int]] = field(default_factory=dict)
+    species_traits: tuple[SpeciesAttributes, ...] = field(default=())
+    age_ranges: dict[str, tuple[int, int]] = field(default=None)
     
-    def __post_init__(self):
-        super().__post_init__()
+    def __post_init__(self, rng: random.Random = None):
+        super(Species, self).__post_init__(rng)
 
         species_option: EntityOption = self.attributes[OptionTypes.RACE][0]
-        object.__setattr__(self, "age_ranges", self.determine_age_ranges(species_option))
+        object.__setattr__(self, "age_ranges", get_age_ranges(species_option))
 
     def __hash__(self):
-        return hash((self.id, self.name)) 
+        return self._hash
     
-    def determine_age_ranges(self, race_attr: EntityOption) -> dict[str, tuple[int, int]]:
+    @staticmethod
+    def determine_age_ranges(race_attr: EntityOption) -> dict[str, tuple[int, int]]:
         """
         Determines the age ranges of the species based on the race/species trait
 
@@ -44,7 +73,7 @@ class Species(Entity):
                     "toddler": (1, 3)
                 }
 
-        returns: default or modified default age_range dictionary based on parameters of the species
+        returns: default or modified default age_range dictionary of integer bounds based on parameters of the species
         """
         
         
@@ -75,4 +104,8 @@ class Species(Entity):
             "toddler": (max * 0.01, max * 0.03)
         }
 
+        # Truncate to integer bounds once here rather than on every age draw
+        for trait, (low, high) in age_ranges.items():
+            age_ranges[trait] = (int(low), int(high) if high >= low else int(low))
+
         return age_ranges
@@ -1,3 +1,4 @@
+import random
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -12,12 +13,12 @@ class StructureAttributes(Enum):
     MAGICAL = 6
     ORNAMENTAL = 7
 
-@dataclass(frozen=True, kw_only=True)
+@dataclass(frozen=True, kw_only=True, slots=True)
 class Structure(Entity):
     attributes: dict[StructureAttributes, bool] = field(default=None)
     
-    def __post_init__(self):
-        super().__post_init__()
+    def __post_init__(self, rng: random.Random = None):
+        super(Structure, self).__post_init__(rng)
 
     def __hash__(self):
-        return hash((self.id, self.name)) 
\ No newline at end of file
+        return self._hash
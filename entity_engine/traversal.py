@@ -0,0 +1,170 @@
+from collections import deque
+
+# Traversals over Graph/EntityGraph adjacency. Neighbors are visited in adjacency order, which is
+# insertion order and therefore reproducible; call Graph.sort_adjacency once up front for a
+# canonical order instead of sorting the neighbors on every visit.
+
+def breadth_first_search(graph, start) -> list:
+    """
+    Lists the nodes reachable from start in breadth-first order in O(V + E).
+
+    args:
+        graph: The Graph or EntityGraph to traverse.
+        start: The node to start from.
+
+    returns:
+        A list of the visited nodes, starting with start.
+    """
+    visited = {start: None}
+    to_visit = deque([start])
+    while to_visit:
+        current_node = to_visit.popleft()
+        for neighbor in graph.graph[current_node]:
+            if neighbor not in visited:
+                visited[neighbor] = None
+                to_visit.append(neighbor)
+    return list(visited)
+
+def depth_first_search(graph, start, visited: dict = None) -> list:
+    """
+    Lists the nodes reachable from start in depth-first (preorder) order in O(V + E), using an
+    explicit stack so deep graphs cannot hit the recursion limit.
+
+    args:
+        graph: The Graph or EntityGraph to traverse.
+        start: The node to start from.
+        visited: Optional insertion-ordered set (node -> None) of nodes to treat as already
+                 visited; the newly visited nodes are added to it.
+
+    returns:
+        A list of the newly visited nodes, starting with start.
+    """
+    visited = {} if visited is None else visited
+    if start in visited:
+        return []
+
+    newly_visited = [start]
+    visited[start] = None
+    stack = [iter(graph.graph[start])]
+    while stack:
+        for neighbor in stack[-1]:
+            if neighbor not in visited:
+                visited[neighbor] = None
+                newly_visited.append(neighbor)
+                stack.append(iter(graph.graph[neighbor]))
+                break
+        else:
+            stack.pop()
+    return newly_visited
+
+def shortest_path(graph, start, end) -> list:
+    """
+    Finds a shortest (fewest edges) path between two nodes with a bidirectional breadth-first
+    search, expanding whichever frontier is smaller one level at a time.
+
+    args:
+        graph: The Graph or EntityGraph to search.
+        start: The node the path starts at.
+        end: The node the path ends at.
+
+    returns:
+        A list of nodes from start to end, or None if they are not connected.
+    """
+    if start not in graph.graph or end not in graph.graph:
+        return None
+    if start == end:
+        return [start]
+
+    forward_parents = {start: None}
+    backward_parents = {end: None}
+    forward_frontier = [start]
+    backward_frontier = [end]
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting_node = _expand_frontier(graph, forward_frontier, forward_parents, backward_parents)
+        else:
+            backward_frontier, meeting_node = _expand_frontier(graph, backward_frontier, backward_parents, forward_parents)
+
+        if meeting_node is not None:
+            path = []
+            node = meeting_node
+            while node is not None:
+                path.append(node)
+                node = forward_parents[node]
+            path.reverse()
+            node = backward_parents[meeting_node]
+            while node is not None:
+                path.append(node)
+                node = backward_parents[node]
+            return path
+    return None
+
+def k_hop_neighborhood(graph, node, k: int) -> dict:
+    """
+    Finds the nodes within k edges of node.
+
+    args:
+        graph: The Graph or EntityGraph to search.
+        node: The node at the center of the neighborhood.
+        k: The maximum number of edges from node.
+
+    returns:
+        A dictionary of each node in the neighborhood to its distance from node, in
+        breadth-first order.
+    """
+    distances = {node: 0}
+    frontier = [node]
+    for distance in range(1, k + 1):
+        next_frontier = []
+        for current_node in frontier:
+            for neighbor in graph.graph[current_node]:
+                if neighbor not in distances:
+                    distances[neighbor] = distance
+                    next_frontier.append(neighbor)
+        if not next_frontier:
+            break
+        frontier = next_frontier
+    return distances
+
+def ego_network(graph, node, k: int = 1):
+    """
+    Extracts the k-hop ego network of a node: the nodes within k edges of it together with
+    the edges and metadata between them.
+
+    args:
+        graph: The Graph or EntityGraph to extract from.
+        node: The node at the center of the network.
+        k: The maximum number of edges from node.
+
+    returns:
+        A new graph of the same class as graph holding the ego network.
+    """
+    members = k_hop_neighborhood(graph, node, k)
+    ego = graph.__class__()
+    for member in members:
+        ego.add_node(member)
+    for member in members:
+        for neighbor in graph.graph[member]:
+            if neighbor in members:
+                ego.graph[member][neighbor] = None
+        for (node1, node2) in graph.metadata_keys.get(member, ()):
+            if node1 == member and node2 in members:
+                ego.set_metadata(node1, node2, graph.metadata[(node1, node2)])
+    return ego
+
+def _expand_frontier(graph, frontier: list, parents: dict, other_parents: dict) -> tuple[list, object]:
+    """
+    Expands one side of a bidirectional search by a full level.
+
+    returns:
+        A tuple of the next frontier and the first node reached by both sides, or None.
+    """
+    next_frontier = []
+    for current_node in frontier:
+        for neighbor in graph.graph[current_node]:
+            if neighbor not in parents:
+                parents[neighbor] = current_node
+                if neighbor in other_parents:
+                    return next_frontier, neighbor
+                next_frontier.append(neighbor)
+    return next_frontier, None
@@ -0,0 +1,19 @@
+from entity_engine.entity_option import EntityOption, OptionTypes
+from entity_engine.location import Location
+
+def make_location(name: str, *terrains: str, **kwargs) -> Location:
+    """
+    Builds a Location with a name and optional terrains, the smallest entity most tests need.
+
+    args:
+        name: The name of the location.
+        *terrains: The names of its terrain options.
+        **kwargs: Additional keyword arguments to pass to the Location constructor, e.g. id.
+
+    returns:
+        The Location.
+    """
+    attributes = {OptionTypes.NAME: [EntityOption(name=name, type=OptionTypes.NAME)]}
+    if terrains:
+        attributes[OptionTypes.TERRAIN] = [EntityOption(name=terrain, type=OptionTypes.TERRAIN) for terrain in terrains]
+    return Location(attributes=attributes, **kwargs)
@@ -0,0 +1,64 @@
+import unittest
+import os, sys
+parentddir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+sys.path.append(parentddir)
+
+from benchmarks.suite import MICRO_THRESHOLD, compare_environments, compare_results, get_metric, get_timing_threshold, merge_runs
+
+class TestCompareResults(unittest.TestCase):
+    baseline = {"metrics": [
+        get_metric("generate.Person", 1000.0, "entities/s", "higher"),
+        get_metric("graph.1000.build", 2.0, "s"),
+        get_metric("save_load.size", 100.0, "bytes/entity", threshold=0.05),
+    ]}
+
+    def test_within_threshold_passes(self):
+        results = {"metrics": [
+            get_metric("generate.Person", 800.0, "entities/s", "higher"),
+            get_metric("graph.1000.build", 2.5, "s"),
+            get_metric("save_load.size", 104.0, "bytes/entity", threshold=0.05),
+            get_metric("graph.1000000.build", 50.0, "s"),
+        ]}
+        self.assertEqual(compare_results(results, self.baseline, 0.3), [])
+
+    def test_regressions_fail_in_either_direction(self):
+        results = {"metrics": [
+            get_metric("generate.Person", 500.0, "entities/s", "higher"),
+            get_metric("graph.1000.build", 1.0, "s"),
+            get_metric("save_load.size", 110.0, "bytes/entity", threshold=0.05),
+        ]}
+        regressions = compare_results(results, self.baseline, 0.3)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith("generate.Person"))
+        self.assertTrue(regressions[1].startswith("save_load.size"))
+
+    def test_sub_millisecond_timings_get_a_wider_threshold(self):
+        self.assertEqual(get_timing_threshold(0.0001), MICRO_THRESHOLD)
+        self.assertIsNone(get_timing_threshold(1.0))
+
+class TestEnvironments(unittest.TestCase):
+    environment = {"python": "3.11.7", "implementation": "CPython", "machine": "Linux-x86_64", "cpu_count": 4}
+
+    def test_patch_versions_are_comparable(self):
+        self.assertEqual(compare_environments({**self.environment, "python": "3.11.9"}, self.environment), [])
+
+    def test_other_interpreter_or_machine_differs(self):
+        differences = compare_environments({**self.environment, "python": "3.12.1", "cpu_count": 8}, self.environment)
+        self.assertEqual(len(differences), 2)
+        self.assertTrue(differences[0].startswith("python"))
+        self.assertTrue(differences[1].startswith("cpu_count"))
+
+    def test_baseline_without_environment_differs(self):
+        self.assertEqual(len(compare_environments(self.environment, {"python": "3.11.7"})), 3)
+
+class TestMergeRuns(unittest.TestCase):
+    def test_median_per_metric(self):
+        runs = [{"python": "3.11.7", "metrics": [get_metric("graph.1000.build", value, "s"), get_metric("save_load.size", 100.0, "bytes/entity")]}
+                for value in (1.0, 9.0, 2.0)]
+        merged = merge_runs(runs)
+        self.assertEqual(merged["runs"], 3)
+        self.assertEqual(merged["python"], "3.11.7")
+        self.assertEqual([metric["value"] for metric in merged["metrics"]], [2.0, 100.0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import tempfile
+import unittest
+import os, sys
+parentddir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+sys.path.append(parentddir)
+
+from entity_engine.catalog_cache import CatalogCache
+from entity_engine.entity_option import EntityOption, OptionTypes
+from entity_engine.factory_registry import FactoryRegistry
+from entity_engine.generation import APPLICABLE_OPTION_TYPES
+from entity_engine.location import Location
+from entity_engine.option_catalog import OptionCatalog
+
+def get_options_list() -> list[EntityOption]:
+    return [EntityOption(name=name, type=option_type, weight=weight) 
+            for option_type in (OptionTypes.NAME, OptionTypes.CLIMATE, OptionTypes.TERRAIN, OptionTypes.TYPE, OptionTypes.RESOURCES)
+            for name, weight in (("Alpha", 1), ("Beta", 3))]
+
+class TestCatalogCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = CatalogCache(self.directory.name)
+        self.source = os.path.join(self.directory.name, "options.csv")
+        with open(self.source, "w") as file:
+            file.write("type,name\nNAME,Alpha\n")
+        self.builds = 0
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def build(self) -> list[EntityOption]:
+        self.builds += 1
+        return get_options_list()
+
+    def test_second_load_skips_build(self):
+        options_list, sampling_index = self.cache.get_options_list([self.source], self.build, OptionCatalog())
+        catalog = OptionCatalog()
+        cached_list, cached_index = self.cache.get_options_list([self.source], self.build, catalog)
+        self.assertEqual(self.builds, 1)
+        self.assertEqual(cached_list, options_list)
+        self.assertIs(cached_index.catalog, catalog)
+        self.assertEqual(cached_index.get_cum_weights(OptionTypes.NAME), [1.0, 4.0])
+        self.assertEqual([catalog.resolve(id) for id in cached_index.get_ids(OptionTypes.TERRAIN)], 
+                         list(cached_index.get_options(OptionTypes.TERRAIN)))
+
+    def test_source_change_invalidates_cache(self):
+        self.cache.get_options_list([self.source], self.build, OptionCatalog())
+        with open(self.source, "a") as file:
+            file.write("NAME,Beta\n")
+        self.cache.get_options_list([self.source], self.build, OptionCatalog())
+        self.cache.get_options_list([self.source, b"defaults"], self.build, OptionCatalog())
+        self.assertEqual(self.builds, 3)
+
+    def test_unreadable_cache_is_rebuilt(self):
+        key = self.cache.get_key([self.source])
+        os.makedirs(self.directory.name, exist_ok=True)
+        with open(self.cache.get_path(key), "wb") as file:
+            file.write(b"not a pickle")
+        self.cache.get_options_list([self.source], self.build, OptionCatalog())
+        self.assertEqual(self.builds, 1)
+        self.assertIsNotNone(self.cache.load(key, OptionCatalog()))
+
+    def test_failed_save_leaves_no_files(self):
+        class BrokenIndex:
+            def get_compiled(self):
+                raise RuntimeError("compile failed")
+
+        key = self.cache.get_key([self.source])
+        with self.assertRaises(RuntimeError):
+            self.cache.save(key, get_options_list(), BrokenIndex())
+        self.assertEqual(os.listdir(self.directory.name), ["options.csv"])
+
+    def test_registry_factories_share_cached_index(self):
+        catalog = OptionCatalog()
+        self.cache.get_options_list([self.source], self.build, catalog)
+        options_list, sampling_index = self.cache.get_options_list([self.source], self.build, catalog)
+        registry = FactoryRegistry(APPLICABLE_OPTION_TYPES, catalog)
+        registry.set_sampling_index(options_list, sampling_index)
+        factory = registry.get_factory(Location, options_list)
+        self.assertIs(factory.get_sampling_index(), sampling_index)
+        location = factory.create_random_entity(options_list)
+        self.assertIn(location.attributes[OptionTypes.NAME][0], options_list)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import os, pickle, shutil, subprocess, sys
+parentddir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+sys.path.append(parentddir)
+
+from entity_engine.entity_attributes import AttributeLayout, EntityAttributes
+from entity_engine.entity_graph import EntityGraph
+from entity_engine.entity_option import EntityOption, OptionTypes
+from entity_engine.location import Location
+from entity_engine.option_catalog import OptionCatalog
+from helpers import make_location
+
+class TestEntity(unittest.TestCase):
+    def test_default_constructed_entity_pickles(self):
+        location = make_location("Bron")
+        restored = pickle.loads(pickle.dumps(location))
+        self.assertEqual(restored, location)
+        self.assertEqual(dict(restored.applicable_option_types), {})
+
+        entities = EntityGraph()
+        entities.add(location)
+        restored_graph = pickle.loads(pickle.dumps(entities))
+        self.assertEqual(restored_graph.get_by_id(location.id), location)
+
+    def test_integer_id_is_its_own_cached_hash(self):
+        location = make_location("Bron")
+        self.assertIs(location._hash, location.id)
+        self.assertEqual(hash(location), hash(location.id))
+        self.assertEqual(hash(Location(id=-1, attributes=location.attributes)), hash(-1))
+
+    def test_compact_attributes_hold_ids_of_any_size(self):
+        catalog = OptionCatalog()
+        layout = AttributeLayout((OptionTypes.NAME, OptionTypes.TERRAIN), catalog)
+        attributes = EntityAttributes(layout, [3, 70_000, 5], [1, 2])
+        self.assertEqual(attributes.get_ids(OptionTypes.TERRAIN).tolist(), [70_000, 5])
+
+        options_list = [EntityOption(name=name, type=OptionTypes.TERRAIN) for name in ("Desert", "Marsh")]
+        attributes = EntityAttributes.from_options(layout, {OptionTypes.NAME: [EntityOption(name="Bron", type=OptionTypes.NAME)], 
+                                                            OptionTypes.TERRAIN: options_list})
+        self.assertIsInstance(attributes._values, bytes)
+        self.assertEqual(attributes[OptionTypes.TERRAIN], tuple(options_list))
+        self.assertEqual(pickle.loads(pickle.dumps(attributes)), attributes)
+
+    @unittest.skipUnless(shutil.which("python3.11"), "Python 3.11 is not installed")
+    def test_imports_on_python_3_11(self):
+        result = subprocess.run([shutil.which("python3.11"), "-c", "import entity_engine"], cwd=parentddir,
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import csv, io, json
+import unittest
+import os, sys
+parentddir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+sys.path.append(parentddir)
+
+from entity_engine.entity_export import EntityWriter, get_entity_record, get_entity_writer
+from helpers import make_location
+
+class TestEntityExport(unittest.TestCase):
+    def setUp(self):
+        self.bron = make_location("Bron", "Desert", "Coast")
+        self.zara = make_location("Zara")
+
+    def test_entity_record(self):
+        record = get_entity_record(self.bron)
+        self.assertEqual(record, {"id": self.bron.id, "type": "Location", "name": "Bron",
+                                  "attributes": {"Name": ["Bron"], "Terrain": ["Desert", "Coast"]}})
+
+    def test_json_lines_writer(self):
+        file = io.StringIO()
+        writer = get_entity_writer("JSONL", file)
+        writer.write_entities([self.bron, self.zara], [(self.bron, self.zara)])
+        lines = [json.loads(line) for line in file.getvalue().splitlines()]
+        self.assertEqual([line["name"] for line in lines[:2]], ["Bron", "Zara"])
+        self.assertEqual(lines[2], {"type": "Edge", "source": self.bron.id, "target": self.zara.id})
+        self.assertEqual((writer.entity_count, writer.edge_count), (2, 1))
+
+    def test_csv_writer(self):
+        file = io.StringIO()
+        get_entity_writer("CSV", file).write_entities([self.bron], [(self.bron, self.zara)])
+        rows = list(csv.DictReader(io.StringIO(file.getvalue())))
+        self.assertEqual(rows[0]["Terrain"], "Desert,Coast")
+        self.assertEqual(rows[0]["Climate"], "")
+        self.assertEqual((rows[1]["type"], rows[1]["source"], rows[1]["target"]), ("Edge", str(self.bron.id), str(self.zara.id)))
+
+    def test_markdown_writer(self):
+        file = io.StringIO()
+        get_entity_writer("MD", file).write_entity(self.bron)
+        self.assertIn(f"## Location {self.bron.id}: Bron", file.getvalue())
+        self.assertIn("- **Terrain**: Desert, Coast", file.getvalue())
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            get_entity_writer("HTML", io.StringIO())
+
+    def test_writer_must_implement_record_hooks(self):
+        class EntityOnlyWriter(EntityWriter):
+            def _write_entity_record(self, record: dict) -> None:
+                self.file.write(record["name"])
+
+        with self.assertRaises(TypeError):
+            EntityWriter(io.StringIO())
+        with self.assertRaises(TypeError):
+            EntityOnlyWriter(io.StringIO())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import unittest
+import os, sys
+parentddir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+sys.path.append(parentddir)
+
+from entity_engine.entity_factory import EntityFactory
+from entity_engine.entity_id import IdAllocator, get_id_allocator, set_id_allocator
+from entity_engine.entity_option import EntityOption, OptionTypes
+from entity_engine.factory_registry import FactoryRegistry
+from entity_engine.location import Location
+from entity_engine.option_catalog import OptionCatalog
+from entity_engine.option_index import OptionSamplingIndex
+from entity_engine.organization import Organization
+from entity_engine.person import Person
+
+class TestOptionSamplingIndex(unittest.TestCase):
+    options_list = [
+        EntityOption(name="Bron", type=OptionTypes.NAME, weight=10.0),
+        EntityOption(name="Zara", type=OptionTypes.NAME, weight=0.0),
+        EntityOption(name="Desert", type=OptionTypes.TERRAIN, weight=5.0),
+        EntityOption(name="Plains", type=OptionTypes.TERRAIN, weight=15.0),
+    ]
+
+    def test_groups_options_by_type(self):
+        index = OptionSamplingIndex(self.options_list)
+        self.assertEqual(index.get_option_types(), {OptionTypes.NAME, OptionTypes.TERRAIN})
+        self.assertEqual(index.get_options(OptionTypes.TERRAIN), tuple(self.options_list[2:]))
+        self.assertEqual(index.get_cum_weights(OptionTypes.TERRAIN), [5.0, 20.0])
+        self.assertEqual(index.get_options(OptionTypes.CLIMATE), ())
+
+    def test_sample_respects_weights(self):
+        index = OptionSamplingIndex(self.options_list)
+        names = index.sample(OptionTypes.NAME, k=200)
+        self.assertEqual(len(names), 200)
+        self.assertTrue(all(name.name == "Bron" for name in names))
+        self.assertEqual(index.sample(OptionTypes.CLIMATE, k=3), [])
+
+class TestEntityFactory(unittest.TestCase):
+    applicable_option_types = {
+        OptionTypes.NAME: (1, 1),
+        OptionTypes.TERRAIN: (1, 2),
+    }
+
+    def test_create_random_entity(self):
+        options_list = list(TestOptionSamplingIndex.options_list)
+        factory = EntityFactory(Location, self.applicable_option_types, options_list)
+        location = factory.create_random_entity(options_list)
+        self.assertEqual(location.name.name, "Bron")
+        self.assertIn(len(location.attributes[OptionTypes.TERRAIN]), (1, 2))
+
+    def test_sampling_index_tracks_options_list(self):
+        options_list = list(TestOptionSamplingIndex.options_list)
+        factory = EntityFactory(Location, self.applicable_option_types, options_list)
+        options_list.append(EntityOption(name="Arid", type=OptionTypes.CLIMATE))
+        self.assertIn(OptionTypes.CLIMATE, factory.get_sampling_index())
+
+    def test_create_random_entities(self):
+        options_list = list(TestOptionSamplingIndex.options_list)
+        factory = EntityFactory(Location, self.applicable_option_types, options_list)
+        locations = factory.create_random_entities(500, options_list, seed=7)
+        self.assertEqual(len(locations), 500)
+        self.assertTrue(all(location.name.name == "Bron" for location in locations))
+        terrain_counts = {len(location.attributes[OptionTypes.TERRAIN]) for location in locations}
+        self.assertEqual(terrain_counts, {1, 2})
+        plains = sum(terrain.name == "Plains" for location in locations for terrain in location.attributes[OptionTypes.TERRAIN])
+        total = sum(len(location.attributes[OptionTypes.TERRAIN]) for location in locations)
+        self.assertAlmostEqual(plains / total, 0.75, delta=0.06)
+
+    def test_seeded_batch_is_reproducible(self):
+        options_list = [EntityOption(name="Bron", type=OptionTypes.NAME), EntityOption(name="Stoneshield", type=OptionTypes.FAMILY_NAME),
+                        EntityOption(name="Adult", type=OptionTypes.AGE), EntityOption(name="Dwarf", type=OptionTypes.RACE, min=0, max=350)]
+        factory = EntityFactory(Person, {option.type: (1, 1) for option in options_list}, options_list)
+        describe = lambda people: [(person.id, person.age, dict(person.attributes)) for person in people]
+        previous_allocator = get_id_allocator()
+        try:
+            # Ids come from the counter of the world, so both batches start from a new world
+            set_id_allocator(IdAllocator())
+            first = describe(factory.create_random_entities(100, options_list, seed=3))
+            set_id_allocator(IdAllocator())
+            self.assertEqual(first, describe(factory.create_random_entities(100, options_list, seed=3)))
+        finally:
+            set_id_allocator(previous_allocator)
+
+    def test_batch_of_option_type_missing_from_factory_options(self):
+        options_list = list(TestOptionSamplingIndex.options_list)
+        factory = EntityFactory(Location, {**self.applicable_option_types, OptionTypes.CLIMATE: (1, 1)}, options_list)
+        # The passed options hold a type the factory's options list does not
+        options = options_list + [EntityOption(name="Arid", type=OptionTypes.CLIMATE)]
+        single = factory.create_random_entity(options)
+        batch = factory.create_random_entities(100, options, seed=1)
+        self.assertEqual(single.attributes[OptionTypes.CLIMATE], ())
+        self.assertTrue(all(location.attributes[OptionTypes.CLIMATE] == () for location in batch))
+
+    def test_compact_attributes(self):
+        options_list = list(TestOptionSamplingIndex.options_list)
+        factory = EntityFactory(Location, self.applicable_option_types, options_list)
+        location_a, location_b = factory.create_random_entities(2, options_list)
+        self.assertEqual(list(location_a.attributes), [OptionTypes.NAME, OptionTypes.TERRAIN])
+        self.assertEqual(location_a.attributes[OptionTypes.NAME], (options_list[0],))
+        self.assertIs(location_a.attributes._layout, location_b.attributes._layout)
+        self.assertEqual(dict(location_a.attributes), {option_type: location_a.attributes[option_type] for option_type in location_a.attributes})
+
+        plain = EntityFactory(Location, self.applicable_option_types, options_list, compact=False).create_random_entity(options_list)
+        self.assertIsInstance(plain.attributes, dict)
+        self.assertIsInstance(plain.attributes[OptionTypes.TERRAIN], tuple)
+
+class TestFactoryRegistry(unittest.TestCase):
+    def test_reuses_factory_until_options_change(self):
+        options_list = list(TestOptionSamplingIndex.options_list)
+        registry = FactoryRegistry({Location: TestEntityFactory.applicable_option_types}, catalog=OptionCatalog())
+        factory = registry.get_factory(Location, options_list)
+        self.assertIs(registry.get_factory(Location, options_list), factory)
+
+        # A new option bumps the catalog version; the same factory recompiles its sampling index
+        options_list.append(EntityOption(name="Marsh", type=OptionTypes.TERRAIN))
+        self.assertIs(registry.get_factory(Location, options_list), factory)
+        self.assertIn(options_list[-1], factory.get_sampling_index().get_options(OptionTypes.TERRAIN))
+
+        # Another options list gets a factory of its own
+        self.assertIsNot(registry.get_factory(Location, list(options_list)), factory)
+        with self.assertRaises(TypeError):
+            registry.get_factory(EntityOption, options_list)
+
+    def test_duplicate_options_do_not_recompile(self):
+        # Two options with the same type and name, e.g. from overlapping options files
+        options_list = list(TestOptionSamplingIndex.options_list) + [EntityOption(name="Bron", type=OptionTypes.NAME, weight=5.0)]
+        catalog = OptionCatalog()
+        applicable_option_types = TestEntityFactory.applicable_option_types
+        registry = FactoryRegistry({Location: applicable_option_types, Organization: applicable_option_types}, catalog=catalog)
+        factory = registry.get_factory(Location, options_list)
+        registry.get_factory(Organization, options_list)
+        version = catalog.version
+        # Factories of several types sharing the options list take turns, as during generation
+        for _ in range(3):
+            self.assertIs(registry.get_factory(Location, options_list), factory)
+            registry.get_factory(Organization, options_list)
+        # The catalog version is unchanged, so no sampling index was recompiled
+        self.assertEqual(catalog.version, version)
+        self.assertIs(catalog.resolve(options_list[-1].id), options_list[-1])
+        ids = factory.get_sampling_index().get_ids(OptionTypes.NAME)
+        self.assertEqual(ids[0], ids[-1])
+
+if __name__ == "__main__":
+    unittest.main()
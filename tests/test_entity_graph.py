@@ -0,0 +1,106 @@
+import unittest
+import os, sys
+parentddir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+sys.path.append(parentddir)
+
+from entity_engine.entity_graph import EntityGraph
+from entity_engine.entity_option import EntityOption, OptionTypes
+from entity_engine.entity_tracker import EntityTypes
+from entity_engine.location import Location
+from entity_engine.organization import Organization
+from helpers import make_location
+
+class TestEntityGraph(unittest.TestCase):
+    def test_get_by_id(self):
+        entities = EntityGraph()
+        location_a = entities.add(make_location("Bron"))
+        location_b = make_location("Zara")
+        self.assertIs(entities.get_by_id(location_a.id), location_a)
+        self.assertIsNone(entities.get_by_id(location_b.id))
+        self.assertFalse(entities.exists(location_b))
+
+    def test_add_node_returns_existing_node_with_same_id(self):
+        entities = EntityGraph()
+        location = entities.add(make_location("Bron"))
+        duplicate = Location(id=location.id, attributes={OptionTypes.NAME: [EntityOption(name="Zara", type=OptionTypes.NAME)]})
+        self.assertIs(entities.add(duplicate), location)
+        self.assertEqual(entities.count(), 1)
+
+    def test_remove_drops_id(self):
+        entities = EntityGraph()
+        location = entities.add(make_location("Bron"))
+        entities.remove(location)
+        self.assertIsNone(entities.get_by_id(location.id))
+        self.assertEqual(entities.count(), 0)
+
+    def test_metadata_is_indexed_per_node(self):
+        entities = EntityGraph()
+        location_a, location_b, location_c = (entities.add(make_location(name)) for name in ("Bron", "Zara", "Kael"))
+        entities.add_pair(location_a, location_b, metadata1={"type": "ally"}, metadata2={"type": "rival"})
+        entities.add_reciprocal_pair(location_b, location_c, metadata={"type": "neighbor"})
+        self.assertEqual(entities.get_metadata(location_a), [((location_a, location_b), {"type": "ally"}), 
+                                                             ((location_b, location_a), {"type": "rival"})])
+        self.assertEqual(len(entities.get_metadata(location_b)), 4)
+        self.assertEqual(entities.get_metadata(location_c), [((location_b, location_c), {"type": "neighbor"}), 
+                                                             ((location_c, location_b), {"type": "neighbor"})])
+
+    def test_remove_node_drops_edges_and_metadata(self):
+        entities = EntityGraph()
+        location_a, location_b, location_c = (entities.add(make_location(name)) for name in ("Bron", "Zara", "Kael"))
+        entities.add_pair(location_a, location_b, metadata1={"type": "ally"}, metadata2={"type": "rival"})
+        entities.add_pair(location_b, location_c, metadata1={"type": "neighbor"})
+        entities.remove(location_b)
+        self.assertEqual(entities.get_adjacent_nodes(location_a), [])
+        self.assertEqual(entities.get_adjacent_nodes(location_c), [])
+        self.assertEqual(entities.metadata, {})
+        self.assertEqual(entities.get_metadata(location_a), [])
+
+    def test_remove_edge_drops_edge_metadata(self):
+        entities = EntityGraph()
+        location_a, location_b, location_c = (entities.add(make_location(name)) for name in ("Bron", "Zara", "Kael"))
+        entities.add_pair(location_a, location_b, metadata1={"type": "ally"})
+        entities.add_pair(location_a, location_c, metadata1={"type": "rival"})
+        entities.remove_edge(location_a, location_b)
+        self.assertFalse(entities.edge_exists(location_a, location_b))
+        self.assertTrue(entities.edge_exists(location_a, location_c))
+        self.assertEqual(entities.get_metadata(location_a), [((location_a, location_c), {"type": "rival"})])
+
+    def test_count_and_iter_type(self):
+        entities = EntityGraph()
+        locations = [entities.add(make_location(name)) for name in ("Bron", "Zara", "Kael")]
+        organization = entities.add(Organization(attributes={OptionTypes.NAME: [EntityOption(name="Guild", type=OptionTypes.NAME)]}))
+        self.assertEqual(entities.count(EntityTypes.LOCATION), 3)
+        self.assertEqual(entities.count(EntityTypes.ORGANIZATION), 1)
+        self.assertEqual(entities.count(EntityTypes.PERSON), 0)
+        self.assertEqual(list(entities.iter_type(EntityTypes.LOCATION)), locations)
+        self.assertEqual(list(entities.iter_type(EntityTypes.ORGANIZATION)), [organization])
+        entities.remove(locations[1])
+        self.assertEqual(entities.count(EntityTypes.LOCATION), 2)
+        self.assertEqual(list(entities.iter_type(EntityTypes.LOCATION)), [locations[0], locations[2]])
+
+    def check_find_by_attributes(self, entities: EntityGraph):
+        smith, miner = (EntityOption(name=name, type=OptionTypes.PROFESSION) for name in ("Blacksmith", "Miner"))
+        dwarf, elf = (EntityOption(name=name, type=OptionTypes.RACE) for name in ("Dwarf", "Elf"))
+        location_a = entities.add(Location(attributes={OptionTypes.NAME: ["Bron"], OptionTypes.PROFESSION: [smith], OptionTypes.RACE: [dwarf]}))
+        location_b = entities.add(Location(attributes={OptionTypes.NAME: ["Zara"], OptionTypes.PROFESSION: [smith, miner], OptionTypes.RACE: [dwarf]}))
+        entities.add(Location(attributes={OptionTypes.NAME: ["Kael"], OptionTypes.PROFESSION: [smith], OptionTypes.RACE: [elf]}))
+        entities.add(Organization(attributes={OptionTypes.NAME: ["Guild"], OptionTypes.PROFESSION: [smith], OptionTypes.RACE: [dwarf]}))
+
+        found = entities.find_by_attributes({OptionTypes.PROFESSION: "Blacksmith", OptionTypes.RACE: "Dwarf"}, EntityTypes.LOCATION)
+        self.assertEqual(found, [location_a, location_b])
+        found = entities.find_by_attributes({OptionTypes.PROFESSION: ["Blacksmith", "Miner"]})
+        self.assertEqual(found, [location_b])
+        self.assertEqual(entities.find_by_attributes({OptionTypes.RACE: "Orc"}), [])
+
+        entities.remove(location_a)
+        found = entities.find_by_attributes({OptionTypes.PROFESSION: "Blacksmith", OptionTypes.RACE: "Dwarf"}, EntityTypes.LOCATION)
+        self.assertEqual(found, [location_b])
+
+    def test_find_by_attributes_with_index(self):
+        self.check_find_by_attributes(EntityGraph(index_attributes=True))
+
+    def test_find_by_attributes_without_index(self):
+        self.check_find_by_attributes(EntityGraph())
+
+if __name__ == "__main__":
+    unittest.main()
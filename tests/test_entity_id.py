@@ -0,0 +1,73 @@
+import unittest
+import os, sys
+parentddir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+sys.path.append(parentddir)
+
+from entity_engine.entity_graph import EntityGraph
+from entity_engine.entity_id import STREAM_ID_BITS, IdAllocator, get_id_allocator, get_stream_id, set_id_allocator
+from entity_engine.entity_option import EntityOption, OptionTypes
+from entity_engine.generation import generate_world
+from entity_engine.location import Location
+from helpers import make_location
+
+class TestIdAllocator(unittest.TestCase):
+    def setUp(self):
+        self.previous_allocator = get_id_allocator()
+
+    def tearDown(self):
+        set_id_allocator(self.previous_allocator)
+
+    def test_allocates_sequential_ids(self):
+        allocator = IdAllocator(start=5)
+        self.assertEqual([allocator.allocate() for _ in range(3)], [5, 6, 7])
+        self.assertEqual(allocator.reserve(10), 8)
+        self.assertEqual(allocator.allocate(), 18)
+        allocator.observe(100)
+        allocator.observe(50)
+        self.assertEqual(allocator.allocate(), 101)
+
+    def test_entities_draw_from_current_allocator(self):
+        set_id_allocator(IdAllocator(start=1))
+        self.assertEqual([make_location(name).id for name in ("Bron", "Zara")], [1, 2])
+        self.assertEqual(make_location("Kael", id=77).id, 77)
+
+        # Regenerating a world from the same starting counter reproduces its ids
+        set_id_allocator(IdAllocator(start=1))
+        self.assertEqual(make_location("Bron").id, 1)
+
+    def test_uuid_view_is_deterministic(self):
+        allocator = IdAllocator(seed=42)
+        self.assertEqual(allocator.to_uuid(3), IdAllocator(seed=42).to_uuid(3))
+        self.assertNotEqual(allocator.to_uuid(3), allocator.to_uuid(4))
+        self.assertNotEqual(allocator.to_uuid(3), IdAllocator(seed=7).to_uuid(3))
+        self.assertEqual(allocator.to_uuid(3).version, 4)
+
+    def test_reserve_ids_moves_past_graph_ids(self):
+        entities = EntityGraph()
+        entities.add(make_location("Bron", id=40))
+        allocator = IdAllocator()
+        entities.reserve_ids(allocator)
+        self.assertEqual(allocator.allocate(), 41)
+
+    def test_stream_ids_are_packed_counters(self):
+        self.assertEqual(get_stream_id("Person", 0), 1 << STREAM_ID_BITS)
+        self.assertEqual(get_stream_id("Person", 5) + 1, get_stream_id("Person", 6))
+        self.assertNotEqual(get_stream_id("Person", 5), get_stream_id("Location", 5))
+        self.assertLess(get_stream_id("GeoPoliticalEntity.Organization", (1 << STREAM_ID_BITS) - 1), 1 << 63)
+        with self.assertRaises(ValueError):
+            get_stream_id("Dragon", 0)
+        with self.assertRaises(ValueError):
+            get_stream_id("Person", 1 << STREAM_ID_BITS)
+
+    def test_seeded_world_ids_come_from_streams(self):
+        options_list = [EntityOption(name="Bron", type=OptionTypes.NAME), EntityOption(name="Desert", type=OptionTypes.TERRAIN)]
+        set_id_allocator(IdAllocator(start=1))
+        entities = EntityGraph()
+        generate_world(entities, {Location: 3}, options_list, seed=42, offsets={Location: 10})
+        self.assertEqual([location.id for location in entities.graph], [get_stream_id("Location", index) for index in range(10, 13)])
+        # The counter is neither used nor moved past the stream ids
+        entities.reserve_ids()
+        self.assertEqual(get_id_allocator().allocate(), 1)
+
+if __name__ == '__main__':
+    unittest.main()
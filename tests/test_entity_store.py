@@ -0,0 +1,113 @@
+import unittest
+from dataclasses import replace
+import os, sys
+parentddir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+sys.path.append(parentddir)
+
+from entity_engine.entity_graph import EntityGraph
+from entity_engine.entity_option import EntityOption, OptionTypes
+from entity_engine.entity_store import EntityStore
+from entity_engine.entity_tracker import EntityTypes
+from entity_engine.generation import generate_entities, generate_gpes
+from entity_engine.gpe import GeoPoliticalEntity
+from entity_engine.location import Location
+from entity_engine.person import Person
+from entity_engine.structure import Structure, StructureAttributes
+
+def get_options_list() -> list[EntityOption]:
+    options_list: list[EntityOption] = []
+    for option_type in OptionTypes:
+        for i in range(3):
+            options_list.append(EntityOption(name=f"{option_type.value} {i}", type=option_type, weight=i + 1))
+    options_list.append(EntityOption(name="Adult", type=OptionTypes.AGE))
+    options_list.append(EntityOption(name="Human", type=OptionTypes.RACE, min=0, max=90))
+    return [option for option in options_list if option.type not in (OptionTypes.AGE, OptionTypes.RACE) or option.name in ("Adult", "Human")]
+
+class TestEntityStore(unittest.TestCase):
+    def setUp(self):
+        self.options_list = get_options_list()
+
+    def test_large_ages_and_rejected_entities_keep_columns_aligned(self):
+        # Ages past the range of a 16-bit column, kept as is when passed to the constructor
+        people = [replace(person, age=40_000 + index) for index, person in enumerate(generate_entities(Person, 5, self.options_list, seed=1))]
+
+        store = EntityStore()
+        store.extend(people[:2])
+        location = Location(id=-5, attributes={OptionTypes.NAME: [self.options_list[0]]})
+        with self.assertRaises(ValueError):
+            store.append(location)
+        self.assertEqual(len(store), 2)
+
+        store.extend(people[2:])
+        self.assertEqual(len(store), 5)
+        for row, person in enumerate(people):
+            self.assertEqual(store.get(row), person)
+            self.assertEqual(store.get(row).age, person.age)
+        self.assertEqual([record["age"] for record in store.iter_records()], [person.age for person in people])
+
+    def test_materialized_entities_equal_stored_entities(self):
+        store = EntityStore()
+        people = generate_entities(Person, 20, self.options_list, seed=1)
+        store.extend(people)
+        self.assertEqual(len(store), 20)
+        for row, person in enumerate(people):
+            materialized = store.get(row)
+            self.assertIsNot(materialized, person)
+            self.assertEqual(materialized, person)
+            self.assertEqual(materialized.age, person.age)
+            self.assertEqual(dict(materialized.attributes), dict(person.attributes))
+
+    def test_gpe_references_rows_of_its_parts(self):
+        store = EntityStore()
+        generated, _ = generate_gpes(3, self.options_list, seed=1)
+        store.extend(generated)
+        self.assertEqual(store.count(EntityTypes.GPE), 3)
+        self.assertEqual(store.count(), 9)
+        gpe = store.get_by_id(generated[2].id)
+        self.assertIsInstance(gpe, GeoPoliticalEntity)
+        self.assertEqual(gpe.location, generated[0])
+        self.assertEqual(gpe.organization, generated[1])
+
+    def test_find_rows_and_remove(self):
+        store = EntityStore()
+        locations = generate_entities(Location, 50, self.options_list, seed=2)
+        store.extend(locations)
+        name = locations[0].attributes[OptionTypes.CLIMATE][0].name
+        expected = [row for row, location in enumerate(locations)
+                    if name in [option.name for option in location.attributes[OptionTypes.CLIMATE]]]
+        self.assertEqual(store.find_rows({OptionTypes.CLIMATE: name}), expected)
+        self.assertEqual(store.find_rows({OptionTypes.CLIMATE: "Unknown"}), [])
+
+        store.remove(locations[0].id)
+        self.assertEqual(store.find_rows({OptionTypes.CLIMATE: name}), expected[1:])
+        self.assertEqual(store.count(EntityTypes.LOCATION), 49)
+        self.assertNotIn(locations[0].id, store)
+        self.assertEqual(len(list(store.iter_records())), 49)
+
+    def test_rejects_non_option_attributes(self):
+        with self.assertRaises(TypeError):
+            EntityStore().append(Structure(attributes={StructureAttributes.MAGICAL: True}))
+
+    def test_graph_on_store(self):
+        entities = EntityGraph(store=EntityStore())
+        generated, edges = generate_gpes(2, self.options_list, seed=3)
+        people = generate_entities(Person, 5, self.options_list, seed=3)
+        entities.add_nodes(people)
+        entities.add_nodes(generated)
+        entities.add_edges(edges)
+
+        # Only the entities with relationships are materialized in the graph itself
+        self.assertEqual(len(entities.graph), 6)
+        self.assertEqual(entities.count(), 11)
+        self.assertEqual(entities.count(EntityTypes.PERSON), 5)
+        self.assertTrue(entities.exists(people[0]))
+        self.assertEqual(entities.get_by_id(people[1].id), people[1])
+        self.assertIs(entities.get_by_id(generated[0].id), generated[0])
+        self.assertEqual(list(entities.iter_type(EntityTypes.PERSON)), people)
+
+        entities.remove(generated[0])
+        self.assertEqual(entities.count(), 10)
+        self.assertNotIn(generated[0], entities.graph)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+import os, sys
+parentddir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+sys.path.append(parentddir)
+
+from entity_engine.entity_tracker import EntityTracker, EntityTypes
+from entity_engine.location import Location
+from entity_engine.person import Person
+
+class TestEntityTracker(unittest.TestCase):
+    def test_queue_holds_counts_not_entities(self):
+        tracker = EntityTracker()
+        tracker.queue(Person, 10_000_000)
+        tracker.queue(Person, 5)
+        tracker.add(Location)
+        self.assertEqual(len(tracker.work_queue), 2)
+        self.assertEqual(tracker.count(), 10_000_006)
+        self.assertEqual(tracker.count(EntityTypes.PERSON), 10_000_005)
+        self.assertEqual(tracker.count(EntityTypes.GPE), 0)
+
+    def test_take_and_drain(self):
+        tracker = EntityTracker()
+        tracker.queue(Person, 5)
+        tracker.queue(Location, 2)
+        tracker.queue(Person, 1)
+        self.assertEqual(tracker.take(3), (Person, 3))
+        self.assertEqual(tracker.count(EntityTypes.PERSON), 3)
+        self.assertEqual(tracker.drain(), {Person: 3, Location: 2})
+        self.assertEqual(tracker.count(), 0)
+        self.assertIsNone(tracker.take())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import unittest
+import os, random, sys
+parentddir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+sys.path.append(parentddir)
+
+from entity_engine.entity_graph import EntityGraph
+from entity_engine.entity_option import EntityOption, OptionTypes
+from entity_engine.entity_tracker import EntityTracker, EntityTypes
+from entity_engine.generation import generate_entity, generate_gpes, generate_world, iter_entities, stream_world
+from entity_engine.gpe import GeoPoliticalEntity
+from entity_engine.location import Location
+from entity_engine.organization import Organization
+from entity_engine.person import Person
+from entity_engine.scheduler import GenerationScheduler
+
+class TestGenerateWorld(unittest.TestCase):
+    options_list = [
+        EntityOption(name="Bron", type=OptionTypes.NAME),
+        EntityOption(name="Zara", type=OptionTypes.NAME),
+        EntityOption(name="Castle", type=OptionTypes.TYPE),
+        EntityOption(name="Desert", type=OptionTypes.TERRAIN),
+        EntityOption(name="Arid", type=OptionTypes.CLIMATE),
+        EntityOption(name="Leader", type=OptionTypes.ROLE),
+        EntityOption(name="Stoneshield", type=OptionTypes.FAMILY_NAME),
+        EntityOption(name="Adult", type=OptionTypes.AGE),
+        EntityOption(name="Dwarf", type=OptionTypes.RACE, min=0, max=350),
+        EntityOption(name="Blacksmith", type=OptionTypes.PROFESSION),
+        EntityOption(name="Smithing", type=OptionTypes.SKILL, weight=30.0),
+        EntityOption(name="Haggling", type=OptionTypes.SKILL),
+    ]
+    counts = {Person: 11, Location: 7, Organization: 3, GeoPoliticalEntity: 2}
+
+    def check_world(self, workers: int):
+        entities = EntityGraph()
+        generate_world(entities, {Location: 7, Organization: 3, GeoPoliticalEntity: 2}, self.options_list, workers=workers)
+        self.assertEqual(entities.count(EntityTypes.LOCATION), 9)
+        self.assertEqual(entities.count(EntityTypes.ORGANIZATION), 5)
+        self.assertEqual(entities.count(EntityTypes.GPE), 2)
+        for gpe in entities.graph:
+            if isinstance(gpe, GeoPoliticalEntity):
+                self.assertTrue(entities.edge_exists(gpe.location, gpe))
+                self.assertTrue(entities.edge_exists(gpe.location, gpe.organization))
+
+    def test_generate_world_serial(self):
+        self.check_world(workers=1)
+
+    def test_generate_world_parallel(self):
+        self.check_world(workers=3)
+
+    def test_generate_world_leaves_global_random_alone(self):
+        random.seed(5)
+        expected = random.random()
+        random.seed(5)
+        generate_world(EntityGraph(), {Person: 4, GeoPoliticalEntity: 2}, self.options_list, workers=1)
+        self.assertEqual(random.random(), expected)
+
+    def test_seeded_gpes_are_reproducible(self):
+        def describe(generated: list) -> list[tuple]:
+            return [(type(entity).__name__, repr(entity.attributes)) for entity in generated]
+        self.assertEqual(describe(generate_gpes(4, self.options_list, seed=3)[0]), describe(generate_gpes(4, self.options_list, seed=3)[0]))
+
+    def describe_world(self, entities: EntityGraph) -> list[tuple]:
+        return [(entity.id, type(entity).__name__, repr(entity.attributes), getattr(entity, "age", None)) 
+                for entity in entities.graph]
+
+    def test_seeded_world_is_independent_of_workers(self):
+        serial = EntityGraph()
+        generate_world(serial, self.counts, self.options_list, workers=1, seed=42)
+        parallel = EntityGraph()
+        generate_world(parallel, self.counts, self.options_list, workers=3, seed=42)
+        self.assertEqual(self.describe_world(serial), self.describe_world(parallel))
+
+    def test_generate_entity_regenerates_seeded_entity(self):
+        entities = EntityGraph()
+        generate_world(entities, {Person: 5}, self.options_list, seed=7, offsets={Person: 10})
+        person = list(entities.graph)[3]
+        regenerated = generate_entity(Person, 13, self.options_list, seed=7)
+        self.assertEqual(regenerated.id, person.id)
+        self.assertEqual(regenerated.attributes, person.attributes)
+        self.assertEqual(regenerated.age, person.age)
+
+    def describe_edges(self, edges: list[tuple]) -> set[tuple[int, int]]:
+        # Graph edges are undirected
+        return {tuple(sorted((node1.id, node2.id))) for node1, node2 in edges}
+
+    def test_stream_world_matches_scheduled_world(self):
+        entities = EntityGraph()
+        created_counts = GenerationScheduler().run(entities, self.counts, self.options_list, seed=42)
+        streamed: list = []
+        streamed_edges: list = []
+        for generated, edges in stream_world(self.counts, self.options_list, seed=42, chunk_size=sum(self.counts.values())):
+            streamed.extend(generated)
+            streamed_edges.extend(edges)
+        self.assertEqual(self.describe_world(entities), 
+                         [(entity.id, type(entity).__name__, repr(entity.attributes), getattr(entity, "age", None)) for entity in streamed])
+        self.assertEqual(self.describe_edges(streamed_edges), 
+                         self.describe_edges((node1, node2) for node1 in entities.graph for node2 in entities.get_adjacent_nodes(node1)))
+        self.assertEqual(sum(created_counts.values()), len(streamed))
+
+    def test_streamed_seeded_world_is_independent_of_workers(self):
+        streams = []
+        # Chunks hold chunk_size entities per worker
+        for workers, chunk_size in ((1, 6), (3, 2)):
+            streamed: list = []
+            for generated, edges in stream_world(self.counts, self.options_list, seed=42, chunk_size=chunk_size, workers=workers):
+                streamed.extend(generated)
+            streams.append(sorted((entity.id, type(entity).__name__, repr(entity.attributes)) for entity in streamed))
+        self.assertEqual(streams[0], streams[1])
+
+    def test_stream_world_wires_composites_per_chunk(self):
+        tracker = EntityTracker()
+        tracker.queue(GeoPoliticalEntity, 5)
+        streamed: list = []
+        for generated, edges in stream_world(tracker, self.options_list, seed=42, chunk_size=2):
+            nodes = set(generated)
+            # Every edge stays within its chunk
+            self.assertTrue(all(node1 in nodes and node2 in nodes for node1, node2 in edges))
+            for entity in generated:
+                if isinstance(entity, GeoPoliticalEntity):
+                    self.assertIn((entity.location, entity), edges)
+                    self.assertIn((entity.location, entity.organization), edges)
+                elif isinstance(entity, Organization):
+                    related = {type(node1) for node1, node2 in edges if node2 is entity}
+                    self.assertTrue({Location, Person} <= related)
+            streamed.extend(generated)
+        # No chunk plans any persons of its own, so each creates leaders for its organizations
+        self.assertEqual(tracker.generated_counts, {GeoPoliticalEntity: 5, Location: 5, Organization: 5, Person: 5})
+        self.assertEqual(sorted(entity.id for entity in streamed if isinstance(entity, Person)),
+                         sorted(generate_entity(Person, index, self.options_list, seed=42).id for index in range(5)))
+
+    def test_iter_entities_consumes_tracker_lazily(self):
+        tracker = EntityTracker()
+        tracker.queue(Person, 5)
+        tracker.queue(Location, 3)
+        entities = iter_entities(tracker, self.options_list, seed=42, chunk_size=2)
+        first = next(entities)
+        self.assertIsInstance(first, Person)
+        # Only the first chunk has been taken off the queue
+        self.assertEqual(tracker.count(), 6)
+        rest = list(entities)
+        self.assertEqual(tracker.count(), 0)
+        self.assertEqual(tracker.generated_counts, {Person: 5, Location: 3})
+        self.assertEqual(first.id, generate_entity(Person, 0, self.options_list, seed=42).id)
+        self.assertEqual(rest[-1].id, generate_entity(Location, 2, self.options_list, seed=42).id)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -80,6 +80,15 @@ class TestGraph(unittest.TestCase):
                 )
             except Exception as e:
                 return False        
+
+    def test_remove_node_with_self_loop(self):
+        graph = Graph()
+        graph.add_edge(0, 0)
+        graph.add_edge(0, 1)
+        graph.set_metadata(0, 0, {"type": "self"})
+        graph.remove(0)
+        self.assertEqual(dict(graph.graph), {1: {}})
+        self.assertEqual(graph.metadata, {})
               
 def test_graph_with_person():
     print(f"\n------------------------------------------------------------------------------------------\n")
@@ -0,0 +1,87 @@
+import unittest
+import configparser, logging, os, sys, tempfile
+parentddir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+sys.path.append(parentddir)
+
+from entity_engine.log_config import (EntityEventSampler, get_entity_sampler, get_logging_settings, log_entities,
+                                      set_entity_sampler, start_logging)
+from helpers import make_location
+
+class TestEntityEventSampler(unittest.TestCase):
+    def test_samples_every_rate_th_event(self):
+        sampler = EntityEventSampler(3)
+        self.assertEqual([sampler.sample() for _ in range(7)], [True, False, False, True, False, False, True])
+
+        # Batches continue the count of the events before them
+        sampler = EntityEventSampler(3)
+        self.assertEqual(sampler.sample_batch(list(range(4))), [0, 3])
+        self.assertEqual(sampler.sample_batch(list(range(10, 15))), [12])
+        self.assertEqual(sampler.count, 9)
+
+class TestLogConfig(unittest.TestCase):
+    def setUp(self):
+        self.previous_sampler = get_entity_sampler()
+
+    def tearDown(self):
+        set_entity_sampler(self.previous_sampler)
+
+    def test_log_entities_is_sampled_and_lazy(self):
+        logger = logging.getLogger("test_log_config.entities")
+        set_entity_sampler(EntityEventSampler(2))
+        entities = [make_location(name) for name in ("Bron", "Zara", "Kael")]
+
+        logger.setLevel(logging.WARNING)
+        log_entities(logger, entities)
+        self.assertEqual(get_entity_sampler().count, 0)
+
+        logger.setLevel(logging.DEBUG)
+        with self.assertLogs(logger, logging.DEBUG) as captured:
+            log_entities(logger, entities)
+        self.assertEqual(len(captured.records), 2)
+        self.assertIn("Kael", captured.output[1])
+
+    def test_settings_fall_back_to_defaults(self):
+        config = configparser.ConfigParser()
+        config.read_string("[logging]\nlevel = debug\nmax_bytes = 4096\n")
+        settings = get_logging_settings(config)
+        self.assertEqual(settings["level"], "debug")
+        self.assertEqual(settings["max_bytes"], "4096")
+        self.assertEqual(settings["backup_count"], "5")
+
+    def test_start_logging_writes_through_queue(self):
+        logger = logging.getLogger("test_log_config.queue")
+        logger.propagate = False
+        with tempfile.TemporaryDirectory() as directory:
+            log_path = os.path.join(directory, "app.log")
+            listener = start_logging({"level": "CRITICAL", "file": log_path, "file_level": "INFO", "sample_rate": "10"}, logger)
+            try:
+                self.assertEqual(logger.level, logging.INFO)
+                self.assertEqual(get_entity_sampler().rate, 10)
+                logger.debug("dropped")
+                logger.info("kept %d", 1)
+            finally:
+                listener.stop()
+                for handler in list(logger.handlers) + list(listener.handlers):
+                    logger.removeHandler(handler)
+                    handler.close()
+
+            with open(log_path) as file:
+                contents = file.read()
+        self.assertIn("INFO - kept 1", contents)
+        self.assertNotIn("dropped", contents)
+
+        with self.assertRaises(ValueError):
+            start_logging({"level": "LOUD"}, logging.getLogger("test_log_config.invalid"))
+
+    def test_invalid_settings_leave_logger_untouched(self):
+        logger = logging.getLogger("test_log_config.untouched")
+        sampler = get_entity_sampler()
+        for settings in ({"sample_rate": "often"}, {"max_bytes": "big"}, {"backup_count": "-"}):
+            with self.assertRaises(ValueError):
+                start_logging(settings, logger)
+            self.assertEqual(logger.handlers, [])
+            self.assertEqual(logger.level, logging.NOTSET)
+            self.assertIs(get_entity_sampler(), sampler)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+import json, os, sys, tempfile
+parentddir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+sys.path.append(parentddir)
+
+from entity_engine.entity_graph import EntityGraph
+from entity_engine.entity_option import EntityOption, OptionTypes
+from entity_engine.generation import generate_world, get_factory
+from entity_engine.location import Location
+from entity_engine.metrics import Metrics, ProfileCapture, StageStats, get_metrics, set_metrics, timed
+
+class TestMetrics(unittest.TestCase):
+    options_list = [
+        EntityOption(name="Bron", type=OptionTypes.NAME),
+        EntityOption(name="Castle", type=OptionTypes.TYPE),
+        EntityOption(name="Desert", type=OptionTypes.TERRAIN),
+        EntityOption(name="Arid", type=OptionTypes.CLIMATE),
+    ]
+
+    def tearDown(self):
+        set_metrics(None)
+
+    def test_stage_stats_histogram(self):
+        stats = StageStats()
+        stats.add(0.0000005)
+        stats.add(0.003, items=2)
+        self.assertEqual((stats.calls, stats.items), (2, 3))
+        self.assertEqual(stats.min_seconds, 0.0000005)
+        self.assertEqual(stats.max_seconds, 0.0015)
+        # 0.5 us falls in bucket 0, 1500 us in [1024, 2048) us
+        self.assertEqual(stats.histogram[0], 1)
+        self.assertEqual(stats.histogram[11], 1)
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(get_metrics())
+        with timed("io"):
+            pass
+        entities = EntityGraph()
+        entities.add_node(get_factory(Location, self.options_list).create_random_entity(self.options_list))
+        self.assertEqual(entities.count(), 1)
+
+    def test_records_stages_per_entity_type(self):
+        metrics = Metrics()
+        set_metrics(metrics)
+        factory = get_factory(Location, self.options_list)
+        entities = EntityGraph()
+        entities.add_node(factory.create_random_entity(self.options_list))
+        batch = factory.create_random_entities(100, self.options_list, seed=1)
+        entities.add_nodes(batch)
+        entities.add_edges([(batch[0], batch[1])])
+        with timed("io", "save", 2):
+            pass
+        metrics.increment("generated", "Location", 101)
+
+        self.assertEqual(metrics.stages[("sample", "Location")].items, 101)
+        self.assertEqual(metrics.stages[("construct", "Location")].calls, 2)
+        self.assertEqual(metrics.stages[("graph_insert", "Location")].items, 101)
+        self.assertEqual(metrics.stages[("graph_insert", "Edge")].items, 1)
+        self.assertEqual(metrics.stages[("io", "save")].items, 2)
+        self.assertEqual(metrics.counters[("generated", "Location")], 101)
+
+        table = metrics.format_table()
+        self.assertIn("construct", table)
+        self.assertIn("generated", table)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "metrics.json")
+            metrics.write_json(path)
+            with open(path) as file:
+                data = json.load(file)
+        self.assertIn({"counter": "generated", "entity_type": "Location", "count": 101}, data["counters"])
+        self.assertEqual(len(data["stages"]), len(metrics.stages))
+
+    def test_merge_adds_stages_and_counters(self):
+        metrics = Metrics()
+        metrics.record("sample", "Location", 0.002, items=2)
+        metrics.increment("generated", "Location", 2)
+        other = Metrics()
+        other.record("sample", "Location", 0.0000005)
+        other.record("construct", "Location", 0.001)
+        other.increment("generated", "Location", 1)
+        metrics.merge(other)
+
+        stats = metrics.stages[("sample", "Location")]
+        self.assertEqual((stats.calls, stats.items), (2, 3))
+        self.assertEqual((stats.min_seconds, stats.max_seconds), (0.0000005, 0.001))
+        self.assertEqual(sum(stats.histogram), 2)
+        self.assertEqual(metrics.stages[("construct", "Location")].calls, 1)
+        self.assertEqual(metrics.counters[("generated", "Location")], 3)
+
+    def test_parallel_generation_reports_worker_stages(self):
+        metrics = Metrics()
+        set_metrics(metrics)
+        generate_world(EntityGraph(), {Location: 20}, self.options_list, workers=2)
+        self.assertEqual(metrics.stages[("sample", "Location")].items, 20)
+        self.assertEqual(metrics.stages[("construct", "Location")].items, 20)
+
+    def test_profile_capture_writes_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            capture = ProfileCapture(os.path.join(directory, "log"), cprofile=True, tracemalloc=True)
+            capture.start()
+            [str(i) for i in range(1000)]
+            paths = capture.stop()
+            self.assertEqual(len(paths), 2)
+            self.assertTrue(all(os.path.exists(path) for path in paths))
+            self.assertGreater(capture.peak_bytes, 0)
+
+if __name__ == '__main__':
+    unittest.main()
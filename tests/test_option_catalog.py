@@ -0,0 +1,60 @@
+import pickle
+import unittest
+import os, sys
+parentddir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+sys.path.append(parentddir)
+
+from entity_engine.entity_factory import EntityFactory
+from entity_engine.entity_option import EntityOption, OptionTypes
+from entity_engine.location import Location
+from entity_engine.option_catalog import OptionCatalog
+
+def get_options_list() -> list[EntityOption]:
+    return [EntityOption(name=name, type=option_type) for option_type in (OptionTypes.NAME, OptionTypes.CLIMATE, OptionTypes.TERRAIN)
+            for name in ("Alpha", "Beta", "Gamma")]
+
+class TestOptionCatalog(unittest.TestCase):
+    def test_intern_assigns_stable_ids(self):
+        options_list = get_options_list()
+        catalog = OptionCatalog(options_list)
+        self.assertEqual([option.id for option in options_list], list(range(len(options_list))))
+
+        # An equal option gets the id of the option already interned
+        duplicate = EntityOption(name="Beta", type=OptionTypes.CLIMATE)
+        self.assertEqual(catalog.intern(duplicate), options_list[4].id)
+        self.assertIs(catalog.resolve(duplicate.id), options_list[4])
+        self.assertEqual(len(catalog), len(options_list))
+        self.assertEqual(catalog.find_id(OptionTypes.TERRAIN, "Gamma"), 8)
+        self.assertIsNone(catalog.find_id(OptionTypes.TERRAIN, "Delta"))
+
+    def test_encode_decode(self):
+        options_list = get_options_list()
+        catalog = OptionCatalog(options_list)
+        attributes = {OptionTypes.NAME: [options_list[0]], OptionTypes.TERRAIN: [options_list[6], options_list[8]]}
+        encoded = catalog.encode(attributes)
+        self.assertEqual(encoded, {OptionTypes.NAME: (0,), OptionTypes.TERRAIN: (6, 8)})
+        self.assertEqual(catalog.decode(encoded), {option_type: tuple(options) for option_type, options in attributes.items()})
+
+    def test_replace_keeps_id_and_bumps_version(self):
+        options_list = get_options_list()
+        catalog = OptionCatalog(options_list)
+        version = catalog.version
+        updated = EntityOption(name="Alpha", type=OptionTypes.NAME, weight=50)
+        self.assertEqual(catalog.replace(updated), 0)
+        self.assertIs(catalog.resolve(0), updated)
+        self.assertGreater(catalog.version, version)
+
+    def test_entity_attributes_store_ids(self):
+        options_list = get_options_list()
+        catalog = OptionCatalog()
+        factory = EntityFactory(Location, {OptionTypes.NAME: (1, 1), OptionTypes.TERRAIN: (1, 2)}, options_list, catalog=catalog)
+        location = factory.create_random_entity(options_list)
+        ids = location.attributes.get_ids(OptionTypes.TERRAIN)
+        self.assertEqual(location.attributes[OptionTypes.TERRAIN], tuple(catalog.resolve(id) for id in ids))
+
+        restored = pickle.loads(pickle.dumps(location))
+        self.assertEqual(restored, location)
+        self.assertEqual(dict(restored.attributes), dict(location.attributes))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import json, tempfile
+import unittest
+import os, sys
+parentddir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+sys.path.append(parentddir)
+
+from entity_engine.entity_option import EntityOption, EntityOptionListFlag, OptionTypes
+from entity_engine.option_catalog import OptionCatalog
+from entity_engine.option_loader import OptionRecordReader, load_options_file
+
+CSV_OPTIONS = """type,name,description,weight,min,max,exclusive,requirements,specializations
+PROFESSION,Blacksmith,Works metal,20,,,Scholar,"Strength,Forge",Weaponsmith
+PROFESSION,Scholar,Reads books,5,,,,,
+SPECIALIZATION,Weaponsmith,Makes weapons,,,,,,
+RACE,Dwarf,,,0,350,,,
+"""
+
+class TestOptionLoader(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_file(self, name: str, content: str) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as file:
+            file.write(content)
+        return path
+
+    def test_load_csv_resolves_forward_references(self):
+        options_list: list[EntityOption] = []
+        self.assertEqual(load_options_file(self.write_file("options.csv", CSV_OPTIONS), options_list), 4)
+        blacksmith, scholar, weaponsmith, dwarf = options_list
+        self.assertEqual(blacksmith.description, "Works metal")
+        self.assertEqual(blacksmith.weight, 20.0)
+        self.assertEqual(blacksmith.requirements, ["Strength", "Forge"])
+        self.assertEqual(blacksmith.mutually_exclusive, [scholar])
+        self.assertIs(blacksmith.specilizations[0], weaponsmith)
+        self.assertEqual((dwarf.min, dwarf.max), (0, 350))
+        self.assertEqual(scholar.weight, 5.0)
+
+    def test_load_json_upserts_existing_options(self):
+        existing = EntityOption(name="Blacksmith", type=OptionTypes.PROFESSION, weight=1.0)
+        options_list = [existing]
+        records = [{"type": "PROFESSION", "name": "Blacksmith", "weight": 40, "specializations": ["Armorsmith"]},
+                   {"type": "SKILL", "name": "Smithing"}]
+        load_options_file(self.write_file("options.json", json.dumps(records)), options_list)
+        self.assertEqual(len(options_list), 2)
+        self.assertIs(options_list[0], existing)
+        self.assertEqual(existing.weight, 40.0)
+        self.assertEqual(existing.specilizations, [EntityOption(name="Armorsmith", type=OptionTypes.SPECIALIZATION)])
+
+    def test_override_replaces_list_in_place(self):
+        options_list = [EntityOption(name="Bron", type=OptionTypes.NAME)]
+        load_options_file(self.write_file("options.csv", CSV_OPTIONS), options_list, EntityOptionListFlag.OVERRIDE)
+        self.assertEqual([option.name for option in options_list], ["Blacksmith", "Scholar", "Weaponsmith", "Dwarf"])
+
+    def test_invalid_records_raise_value_error(self):
+        with self.assertRaises(ValueError):
+            load_options_file(self.write_file("options.csv", "type,name\nWIZARDRY,Fireball\n"), [])
+        with self.assertRaises(ValueError):
+            load_options_file(self.write_file("options.json", '{"type": "NAME", "name": "Bron"}'), [])
+        with self.assertRaises(ValueError):
+            load_options_file(self.write_file("options.json", '[{"type": "NAME", "name": "Bron"}'), [])
+
+    def test_json_array_streams_across_buffer_boundaries(self):
+        records = [{"type": "NAME", "name": f"Name {i}", "description": "x" * (i % 13)} for i in range(200)]
+        path = self.write_file("options.json", json.dumps(records, indent=2))
+        # A buffer smaller than one record forces elements to be split across reads
+        self.assertEqual(list(OptionRecordReader(path, buffer_size=16)), records)
+
+    def test_load_json_lines_in_chunks_with_progress(self):
+        records = [{"type": "NAME", "name": f"Name {i}"} for i in range(25)]
+        path = self.write_file("options.jsonl", "\n".join(json.dumps(record) for record in records) + "\n\n")
+        reports: list[tuple[int, int, int]] = []
+        options_list: list[EntityOption] = []
+        catalog = OptionCatalog()
+        count = load_options_file(path, options_list, chunk_size=10, progress=lambda *report: reports.append(report), catalog=catalog)
+        self.assertEqual(count, 25)
+        self.assertEqual([report[0] for report in reports], [10, 20, 25])
+        self.assertEqual(reports[-1][2], os.path.getsize(path))
+        self.assertEqual(len(catalog), 25)
+        self.assertIs(catalog.resolve(options_list[3].id), options_list[3])
+        with self.assertRaises(ValueError):
+            load_options_file(self.write_file("options.json", '[{"type": "SKILL", "name": "Smithing", "weight": "heavy"}]'), [])
+        with self.assertRaises(ValueError):
+            load_options_file(self.write_file("options.txt", ""), [])
+
+if __name__ == '__main__':
+    unittest.main()
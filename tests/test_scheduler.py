@@ -0,0 +1,87 @@
+import unittest
+import os, sys
+parentddir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+sys.path.append(parentddir)
+
+from entity_engine.entity_graph import EntityGraph
+from entity_engine.entity_option import EntityOption, OptionTypes
+from entity_engine.entity_tracker import EntityTypes
+from entity_engine.gpe import GeoPoliticalEntity
+from entity_engine.location import Location
+from entity_engine.organization import Organization
+from entity_engine.person import Person
+from entity_engine.scheduler import EntityDependency, GenerationScheduler
+
+class TestGenerationScheduler(unittest.TestCase):
+    options_list = [
+        EntityOption(name="Bron", type=OptionTypes.NAME),
+        EntityOption(name="Zara", type=OptionTypes.NAME),
+        EntityOption(name="Castle", type=OptionTypes.TYPE),
+        EntityOption(name="Desert", type=OptionTypes.TERRAIN),
+        EntityOption(name="Arid", type=OptionTypes.CLIMATE),
+        EntityOption(name="Leader", type=OptionTypes.ROLE),
+        EntityOption(name="Stoneshield", type=OptionTypes.FAMILY_NAME),
+        EntityOption(name="Adult", type=OptionTypes.AGE),
+        EntityOption(name="Dwarf", type=OptionTypes.RACE, min=0, max=350),
+        EntityOption(name="Blacksmith", type=OptionTypes.PROFESSION),
+        EntityOption(name="Smithing", type=OptionTypes.SKILL),
+    ]
+
+    def test_levels_put_dependencies_first(self):
+        levels = GenerationScheduler().get_levels([GeoPoliticalEntity])
+        self.assertEqual([set(level) for level in levels], [{Location, Person}, {Organization}, {GeoPoliticalEntity}])
+
+        cyclic = GenerationScheduler({Location: (EntityDependency("owner", Person),), Person: (EntityDependency("home", Location),)})
+        with self.assertRaises(ValueError):
+            cyclic.get_levels([Person])
+
+    def test_plan_reuses_planned_and_existing_entities(self):
+        scheduler = GenerationScheduler()
+        # The locations of the GPEs double as the headquarters of their organizations
+        self.assertEqual(scheduler.plan({GeoPoliticalEntity: 3}), {Location: 3, Person: 3, Organization: 3, GeoPoliticalEntity: 3})
+        self.assertEqual(scheduler.plan({Organization: 4, Person: 2}), {Location: 4, Person: 2, Organization: 4})
+
+        entities = EntityGraph()
+        scheduler.run(entities, {Location: 1, Person: 1}, self.options_list)
+        self.assertEqual(scheduler.plan({Organization: 4}, entities), {Location: 0, Person: 0, Organization: 4})
+
+    def test_run_wires_composites(self):
+        entities = EntityGraph()
+        created = GenerationScheduler().run(entities, {GeoPoliticalEntity: 3, Organization: 2}, self.options_list)
+        self.assertEqual(created, {Location: 3, Person: 5, Organization: 5, GeoPoliticalEntity: 3})
+        self.assertEqual(entities.count(EntityTypes.GPE), 3)
+        self.assertEqual(entities.count(EntityTypes.ORGANIZATION), 5)
+
+        for gpe in entities.iter_type(EntityTypes.GPE):
+            self.assertTrue(entities.edge_exists(gpe.location, gpe))
+            self.assertTrue(entities.edge_exists(gpe.organization, gpe))
+            self.assertTrue(entities.edge_exists(gpe.location, gpe.organization))
+        for organization in entities.iter_type(EntityTypes.ORGANIZATION):
+            neighbours = entities.get_adjacent_nodes(organization)
+            self.assertTrue(any(isinstance(node, Location) for node in neighbours))
+            self.assertTrue(any(isinstance(node, Person) for node in neighbours))
+
+    def test_reuses_graph_entities(self):
+        entities = EntityGraph()
+        scheduler = GenerationScheduler()
+        scheduler.run(entities, {Location: 1, Person: 1}, self.options_list)
+        location = next(entities.iter_type(EntityTypes.LOCATION))
+        person = next(entities.iter_type(EntityTypes.PERSON))
+
+        self.assertEqual(scheduler.run(entities, {Organization: 2}, self.options_list), {Organization: 2})
+        self.assertEqual(entities.count(), 4)
+        for organization in entities.iter_type(EntityTypes.ORGANIZATION):
+            self.assertTrue(entities.edge_exists(location, organization))
+            self.assertTrue(entities.edge_exists(person, organization))
+
+    def test_seeded_run_is_reproducible(self):
+        def get_names(workers: int) -> list[str]:
+            entities = EntityGraph()
+            GenerationScheduler().run(entities, {GeoPoliticalEntity: 4, Person: 3}, self.options_list, workers=workers, seed=42)
+            return [str(entity.name) for entity in entities.iter_type()]
+
+        self.assertEqual(get_names(1), get_names(1))
+        self.assertEqual(get_names(1), get_names(2))
+
+if __name__ == '__main__':
+    unittest.main()
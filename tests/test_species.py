@@ -0,0 +1,43 @@
+import unittest
+import os, sys
+parentddir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+sys.path.append(parentddir)
+
+import random
+
+from entity_engine.entity_option import EntityOption, OptionTypes
+from entity_engine.person import Person
+from entity_engine.species import get_age_ranges
+
+def make_person(race: EntityOption, age: str = "Adult") -> Person:
+    return Person(attributes={
+        OptionTypes.NAME: [EntityOption(name="Bron", type=OptionTypes.NAME)],
+        OptionTypes.FAMILY_NAME: [EntityOption(name="Stoneshield", type=OptionTypes.FAMILY_NAME)],
+        OptionTypes.AGE: [EntityOption(name=age, type=OptionTypes.AGE)],
+        OptionTypes.RACE: [race],
+    }, rng=random.Random(1))
+
+class TestAgeRanges(unittest.TestCase):
+    def test_age_ranges_are_shared_integer_bounds(self):
+        dwarf = EntityOption(name="Dwarf", type=OptionTypes.RACE, min=0, max=350)
+        person_a, person_b = make_person(dwarf), make_person(EntityOption(name="Dwarf", type=OptionTypes.RACE, min=0, max=350))
+        self.assertIs(person_a.age_ranges, person_b.age_ranges)
+        self.assertEqual(person_a.age_ranges["adult"], (59, 210))
+        self.assertTrue(all(isinstance(bound, int) for bounds in person_a.age_ranges.values() for bound in bounds))
+        self.assertTrue(59 <= person_a.age <= 210)
+
+    def test_changed_option_gets_new_age_ranges(self):
+        elf = EntityOption(name="Elf", type=OptionTypes.RACE, min=0, max=750)
+        age_ranges = get_age_ranges(elf)
+        elf.max = 1000
+        self.assertIsNot(get_age_ranges(elf), age_ranges)
+        self.assertEqual(get_age_ranges(elf)["old"], (500, 1000))
+
+    def test_truncated_range_draws_within_bounds(self):
+        human = EntityOption(name="Human", type=OptionTypes.RACE, min=0, max=90)
+        person = make_person(human, "Baby")
+        self.assertEqual(person.age_ranges["baby"], (0, 0))
+        self.assertEqual(person.age, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import os, sys
+parentddir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+sys.path.append(parentddir)
+
+from entity_engine.entity_graph import EntityGraph
+from entity_engine.entity_option import EntityOption, OptionTypes
+from entity_engine.graph import Graph
+from entity_engine.location import Location
+from entity_engine.traversal import breadth_first_search, depth_first_search, ego_network, k_hop_neighborhood, shortest_path
+
+class TestTraversal(unittest.TestCase):
+    edges = [(0, 1), (0, 2), (1, 3), (2, 3), (3, 4), (5, 6)]
+
+    def make_graph(self) -> Graph:
+        graph = Graph()
+        for node1, node2 in self.edges:
+            graph.add_edge(node1, node2)
+        return graph
+
+    def test_breadth_first_search(self):
+        self.assertEqual(breadth_first_search(self.make_graph(), 0), [0, 1, 2, 3, 4])
+
+    def test_depth_first_search(self):
+        self.assertEqual(depth_first_search(self.make_graph(), 0), [0, 1, 3, 2, 4])
+
+    def test_depth_first_search_deep_chain(self):
+        graph = Graph()
+        for node in range(5000):
+            graph.add_edge(node, node + 1)
+        self.assertEqual(len(graph.depth_first_search(0)), 5001)
+
+    def test_shortest_path(self):
+        graph = self.make_graph()
+        self.assertEqual(shortest_path(graph, 0, 4), [0, 1, 3, 4])
+        self.assertEqual(shortest_path(graph, 4, 0), [4, 3, 1, 0])
+        self.assertEqual(shortest_path(graph, 2, 2), [2])
+        self.assertIsNone(shortest_path(graph, 0, 6))
+
+    def test_sort_adjacency(self):
+        graph = Graph()
+        for node1, node2 in [(0, 3), (0, 1), (0, 2)]:
+            graph.add_edge(node1, node2)
+        self.assertEqual(graph.breadth_first_search(0), [0, 3, 1, 2])
+        graph.sort_adjacency()
+        self.assertEqual(graph.breadth_first_search(0), [0, 1, 2, 3])
+
+    def test_k_hop_neighborhood(self):
+        self.assertEqual(k_hop_neighborhood(self.make_graph(), 0, 2), {0: 0, 1: 1, 2: 1, 3: 2})
+
+    def test_ego_network_of_entities(self):
+        entities = EntityGraph()
+        locations = [entities.add(Location(attributes={OptionTypes.NAME: [EntityOption(name=name, type=OptionTypes.NAME)]})) 
+                     for name in ("Bron", "Zara", "Kael")]
+        entities.add_pair(locations[0], locations[1], metadata1={"type": "ally"})
+        entities.add_pair(locations[1], locations[2], metadata1={"type": "rival"})
+        ego = ego_network(entities, locations[0], k=1)
+        self.assertIsInstance(ego, EntityGraph)
+        self.assertEqual(list(ego.graph), locations[:2])
+        self.assertTrue(ego.edge_exists(locations[0], locations[1]))
+        self.assertEqual(ego.metadata, {(locations[0], locations[1]): {"type": "ally"}})
+
+    def test_ego_network_keeps_metadata_of_equal_nodes(self):
+        # Equal but distinct node objects, e.g. names read from different files
+        center, copy = "".join(["Br", "on"]), "".join(["B", "ron"])
+        self.assertIsNot(center, copy)
+        graph = Graph()
+        graph.add_edge(center, "Zara")
+        graph.set_metadata(copy, "Zara", {"type": "ally"})
+        ego = ego_network(graph, center, k=1)
+        self.assertEqual(ego.metadata, {("Bron", "Zara"): {"type": "ally"}})
+
+if __name__ == "__main__":
+    unittest.main()